@@ -0,0 +1,4 @@
+"""
+Benchmark tooling for Bhasha Setu backend.
+Load generation, replay and microbenchmarks for the call pipeline.
+"""
@@ -0,0 +1,115 @@
+"""
+Audio fixtures for Bhasha Setu benchmarks.
+Loads WAV files as raw PCM and synthesizes speech-like test audio.
+"""
+from typing import Iterator, List
+
+import numpy as np
+
+from utils.wav import decode_wav
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+CHANNELS = 1
+
+# Matches Constants.Audio.CHUNK_SIZE on the Android client (0.2s of audio)
+FRAME_BYTES = 6400
+
+
+def bytes_per_second() -> int:
+    """Number of PCM bytes in one second of call audio"""
+    return SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS
+
+
+def load_wav(path: str) -> bytes:
+    """
+    Load a WAV file as 16 kHz mono 16-bit PCM.
+
+    Multi-channel files are downmixed to the first channel and other
+    sample rates are resampled linearly.
+
+    Args:
+        path: Path to WAV file
+
+    Returns:
+        Raw PCM bytes
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    try:
+        return decode_wav(data, SAMPLE_RATE)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}")
+
+
+def synthetic_speech(duration_seconds: float, seed: int = 0) -> bytes:
+    """
+    Generate speech-like PCM: voiced bursts separated by short pauses.
+
+    The bursts are loud enough to pass the backend VAD, which is all the
+    stub backends need. Use real recordings with real models.
+
+    Args:
+        duration_seconds: Length of audio to generate
+        seed: Random seed, so runs are reproducible
+
+    Returns:
+        Raw PCM bytes
+    """
+    rng = np.random.default_rng(seed)
+    total = int(duration_seconds * SAMPLE_RATE)
+    audio = np.zeros(total, dtype=np.float32)
+
+    pos = 0
+    while pos < total:
+        burst = int(rng.uniform(0.4, 1.6) * SAMPLE_RATE)
+        pause = int(rng.uniform(0.1, 0.5) * SAMPLE_RATE)
+        end = min(pos + burst, total)
+        t = np.arange(end - pos) / SAMPLE_RATE
+        pitch = rng.uniform(110, 220)
+        envelope = np.sin(np.pi * t / max(t[-1], 1e-3)) if len(t) else t
+        voiced = (
+            np.sin(2 * np.pi * pitch * t)
+            + 0.5 * np.sin(2 * np.pi * 2 * pitch * t)
+            + 0.1 * rng.standard_normal(len(t))
+        )
+        audio[pos:end] = 0.2 * envelope * voiced
+        pos = end + pause
+
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+
+
+def load_fixtures(paths: List[str], synthetic_seconds: float = 30.0) -> List[bytes]:
+    """
+    Load WAV fixtures, falling back to synthetic audio when none are given.
+
+    Args:
+        paths: WAV file paths
+        synthetic_seconds: Length of synthetic fixture if paths is empty
+
+    Returns:
+        List of PCM byte strings
+    """
+    if not paths:
+        return [synthetic_speech(synthetic_seconds, seed=i) for i in range(4)]
+    return [load_wav(path) for path in paths]
+
+
+def iter_frames(pcm: bytes, total_bytes: int, frame_bytes: int = FRAME_BYTES) -> Iterator[bytes]:
+    """
+    Cut PCM into client-sized frames, looping the fixture as needed.
+
+    Args:
+        pcm: Fixture audio
+        total_bytes: Total number of bytes to produce
+        frame_bytes: Frame size in bytes
+
+    Yields:
+        Frames of frame_bytes bytes
+    """
+    if not pcm:
+        raise ValueError("Fixture contains no audio")
+
+    looped = pcm * (total_bytes // len(pcm) + 2)
+    for start in range(0, total_bytes, frame_bytes):
+        yield looped[start:start + frame_bytes]
@@ -0,0 +1,476 @@
+"""
+WebSocket load generator for the Bhasha Setu call pipeline.
+
+Emulates the Android CallManager: each call leg connects to
+/ws/call/{call_id}/{source_lang}/{target_lang} and streams 6400-byte PCM
+frames at real-time pace. Transcripts coming back are matched to the audio
+chunk that produced them to measure end-to-end latency.
+
+Usage:
+    python -m benchmarks.load_generator --calls 8 --duration 60
+    python -m benchmarks.load_generator --sweep 1,2,4,8,16 --output sweep.json
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import websockets
+
+from benchmarks.fixtures import (
+    FRAME_BYTES,
+    bytes_per_second,
+    iter_frames,
+    load_fixtures,
+)
+
+# Mirrors settings.audio.buffer_threshold_bytes at default settings (2.5s)
+DEFAULT_CHUNK_BYTES = 80000
+
+# A schedule is a list of (offset_seconds, frame) pairs relative to call start
+Schedule = List[Tuple[float, bytes]]
+
+
+@dataclass
+class LegResult:
+    """Measurements for one connected call leg"""
+    call_id: str
+    source_lang: str
+    frames_sent: int = 0
+    bytes_sent: int = 0
+    chunks_sent: int = 0
+    transcripts: int = 0
+    unmatched_chunks: int = 0
+    relayed_bytes: int = 0
+    errors: int = 0
+    latencies: List[float] = field(default_factory=list)
+    # (seconds since leg start, latency) pairs, used for trend detection
+    latency_trace: List[Tuple[float, float]] = field(default_factory=list)
+    failure: Optional[str] = None
+
+
+@dataclass
+class LoadReport:
+    """Aggregated results of one load level"""
+    calls: int
+    legs: int
+    wall_seconds: float
+    audio_seconds: float
+    transcripts: int
+    chunks_sent: int
+    unmatched_chunks: int
+    errors: int
+    failed_legs: int
+    throughput_audio_x: float
+    throughput_transcripts_per_s: float
+    real_time_factor: Optional[float]
+    latency_p50: Optional[float]
+    latency_p95: Optional[float]
+    latency_p99: Optional[float]
+    latency_slope: Optional[float]
+    stable: bool
+
+
+def realtime_schedule(pcm: bytes, duration_seconds: float, frame_bytes: int = FRAME_BYTES) -> Schedule:
+    """
+    Build a real-time paced schedule from fixture audio.
+
+    Args:
+        pcm: Fixture audio
+        duration_seconds: Seconds of audio to send
+        frame_bytes: Frame size in bytes
+
+    Returns:
+        Schedule of frames spaced by their own audio duration
+    """
+    total_bytes = int(duration_seconds * bytes_per_second())
+    frame_seconds = frame_bytes / bytes_per_second()
+    return [
+        (i * frame_seconds, frame)
+        for i, frame in enumerate(iter_frames(pcm, total_bytes, frame_bytes))
+    ]
+
+
+class CallLeg:
+    """One emulated client connection"""
+
+    def __init__(
+        self,
+        url: str,
+        call_id: str,
+        source_lang: str,
+        target_lang: str,
+        schedule: Schedule,
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+        speed: float = 1.0,
+        match_timeout: float = 15.0,
+        drain_seconds: float = 5.0
+    ):
+        self.url = url.rstrip("/")
+        self.call_id = call_id
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self.schedule = schedule
+        self.chunk_bytes = chunk_bytes
+        self.speed = speed
+        self.match_timeout = match_timeout
+        self.drain_seconds = drain_seconds
+
+        self.result = LegResult(call_id=call_id, source_lang=source_lang)
+        # Send times of chunks the server has buffered but not yet answered
+        self._pending_chunks: Deque[float] = deque()
+        self._started = 0.0
+
+    @property
+    def endpoint(self) -> str:
+        return f"{self.url}/ws/call/{self.call_id}/{self.source_lang}/{self.target_lang}"
+
+    async def run(self) -> LegResult:
+        """Connect, stream the schedule and collect transcripts"""
+        try:
+            async with websockets.connect(self.endpoint, max_size=None) as ws:
+                receiver = asyncio.create_task(self._receive(ws))
+                try:
+                    await self._send(ws)
+                    await asyncio.sleep(self.drain_seconds)
+                finally:
+                    receiver.cancel()
+                    try:
+                        await receiver
+                    except asyncio.CancelledError:
+                        pass
+        except Exception as e:
+            self.result.failure = f"{type(e).__name__}: {e}"
+
+        self.result.unmatched_chunks += len(self._pending_chunks)
+        self._pending_chunks.clear()
+        return self.result
+
+    async def _send(self, ws) -> None:
+        loop = asyncio.get_running_loop()
+        self._started = loop.time()
+        buffered = 0
+
+        for offset, frame in self.schedule:
+            # Absolute schedule so pacing does not drift under load
+            delay = self._started + offset / self.speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            await ws.send(frame)
+            self.result.frames_sent += 1
+            self.result.bytes_sent += len(frame)
+
+            # Server flushes its buffer once it reaches the threshold
+            buffered += len(frame)
+            if buffered >= self.chunk_bytes:
+                buffered = 0
+                self.result.chunks_sent += 1
+                self._pending_chunks.append(loop.time())
+
+    async def _receive(self, ws) -> None:
+        loop = asyncio.get_running_loop()
+        async for message in ws:
+            if isinstance(message, bytes):
+                self.result.relayed_bytes += len(message)
+                continue
+
+            try:
+                data = json.loads(message)
+            except ValueError:
+                continue
+
+            msg_type = data.get("type")
+            if msg_type == "error":
+                self.result.errors += 1
+            elif msg_type == "transcription" and data.get("sender") == self.source_lang:
+                self._match_transcript(loop.time())
+
+    def _match_transcript(self, now: float) -> None:
+        self.result.transcripts += 1
+
+        # Chunks with no answer for too long were filtered (silence,
+        # hallucination, duplicate) and must not skew later matches
+        while self._pending_chunks and now - self._pending_chunks[0] > self.match_timeout:
+            self._pending_chunks.popleft()
+            self.result.unmatched_chunks += 1
+
+        if not self._pending_chunks:
+            return
+
+        sent_at = self._pending_chunks.popleft()
+        latency = now - sent_at
+        self.result.latencies.append(latency)
+        self.result.latency_trace.append((sent_at - self._started, latency))
+
+
+def percentile(values: Sequence[float], q: float) -> Optional[float]:
+    """Percentile of values, or None when there are none"""
+    if not values:
+        return None
+    return float(np.percentile(values, q))
+
+
+def latency_slope(trace: Sequence[Tuple[float, float]]) -> Optional[float]:
+    """
+    Least-squares slope of latency over send time.
+
+    A positive slope means work is queueing faster than it is served.
+
+    Args:
+        trace: (send time, latency) pairs
+
+    Returns:
+        Seconds of added latency per second of call, or None
+    """
+    if len(trace) < 3:
+        return None
+    x = np.array([t for t, _ in trace])
+    y = np.array([lat for _, lat in trace])
+    if np.ptp(x) == 0:
+        return None
+    return float(np.polyfit(x, y, 1)[0])
+
+
+def summarize(
+    legs: List[LegResult],
+    calls: int,
+    wall_seconds: float,
+    chunk_seconds: float,
+    max_p95_factor: float = 1.0,
+    max_slope: float = 0.05
+) -> LoadReport:
+    """
+    Aggregate leg results into a report.
+
+    A load level is stable when p95 latency stays within max_p95_factor
+    chunk durations and latency does not grow over the run.
+    """
+    latencies = [lat for leg in legs for lat in leg.latencies]
+    trace = [point for leg in legs for point in leg.latency_trace]
+    audio_seconds = sum(leg.bytes_sent for leg in legs) / bytes_per_second()
+    transcripts = sum(leg.transcripts for leg in legs)
+    failed = sum(1 for leg in legs if leg.failure)
+
+    p50 = percentile(latencies, 50)
+    p95 = percentile(latencies, 95)
+    slope = latency_slope(trace)
+
+    stable = (
+        failed == 0
+        and p95 is not None
+        and p95 <= chunk_seconds * max_p95_factor
+        and (slope is None or slope <= max_slope)
+    )
+
+    return LoadReport(
+        calls=calls,
+        legs=len(legs),
+        wall_seconds=wall_seconds,
+        audio_seconds=audio_seconds,
+        transcripts=transcripts,
+        chunks_sent=sum(leg.chunks_sent for leg in legs),
+        unmatched_chunks=sum(leg.unmatched_chunks for leg in legs),
+        errors=sum(leg.errors for leg in legs),
+        failed_legs=failed,
+        throughput_audio_x=audio_seconds / wall_seconds if wall_seconds else 0.0,
+        throughput_transcripts_per_s=transcripts / wall_seconds if wall_seconds else 0.0,
+        real_time_factor=p50 / chunk_seconds if p50 is not None else None,
+        latency_p50=p50,
+        latency_p95=p95,
+        latency_p99=percentile(latencies, 99),
+        latency_slope=slope,
+        stable=stable
+    )
+
+
+def parse_pair(pair: str) -> Tuple[str, str]:
+    """Parse a 'src:tgt' language pair"""
+    source, _, target = pair.partition(":")
+    if not source or not target:
+        raise argparse.ArgumentTypeError(f"Invalid language pair '{pair}', expected src:tgt")
+    return source, target
+
+
+async def run_load(
+    url: str,
+    calls: int,
+    schedules: List[Schedule],
+    pair: Tuple[str, str],
+    duplex: bool = False,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    speed: float = 1.0,
+    ramp_seconds: float = 0.0,
+    drain_seconds: float = 5.0,
+    call_prefix: str = "bench"
+) -> Tuple[List[LegResult], float]:
+    """
+    Run a number of concurrent calls against the server.
+
+    Args:
+        url: Server base URL (ws://host:port)
+        calls: Number of concurrent calls
+        schedules: Frame schedules, assigned to legs round-robin
+        pair: (source, target) language pair of the first leg
+        duplex: Add the reverse leg to every call
+        chunk_bytes: Server buffer threshold in bytes
+        speed: Playback speed multiplier
+        ramp_seconds: Spread call starts over this many seconds
+        drain_seconds: Time to wait for transcripts after sending
+        call_prefix: Prefix for generated call ids
+
+    Returns:
+        Leg results and wall-clock duration
+    """
+    run_id = f"{call_prefix}{int(time.time() * 1000) % 1000000}"
+    legs: List[CallLeg] = []
+    directions = [pair, (pair[1], pair[0])] if duplex else [pair]
+
+    for i in range(calls):
+        for source, target in directions:
+            legs.append(CallLeg(
+                url,
+                f"{run_id}-{i}",
+                source,
+                target,
+                schedules[len(legs) % len(schedules)],
+                chunk_bytes=chunk_bytes,
+                speed=speed,
+                drain_seconds=drain_seconds
+            ))
+
+    async def start(index: int, leg: CallLeg) -> LegResult:
+        if ramp_seconds and calls > 1:
+            await asyncio.sleep(ramp_seconds * (index // len(directions)) / calls)
+        return await leg.run()
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(start(i, leg) for i, leg in enumerate(legs)))
+    return list(results), time.perf_counter() - started
+
+
+def find_knee(reports: List[LoadReport]) -> Optional[int]:
+    """
+    Highest load level before latency first became unstable.
+
+    Returns:
+        Number of calls, or None if even the lowest level was unstable
+    """
+    knee = None
+    for report in sorted(reports, key=lambda r: r.calls):
+        if not report.stable:
+            break
+        knee = report.calls
+    return knee
+
+
+def format_report(report: LoadReport) -> str:
+    """Human-readable one-line summary of a report"""
+    def ms(value: Optional[float]) -> str:
+        return f"{value * 1000:.0f}ms" if value is not None else "n/a"
+
+    rtf = f"{report.real_time_factor:.2f}" if report.real_time_factor is not None else "n/a"
+    return (
+        f"calls={report.calls:<4} legs={report.legs:<4} "
+        f"audio={report.throughput_audio_x:.1f}x "
+        f"transcripts/s={report.throughput_transcripts_per_s:.2f} rtf={rtf} "
+        f"p50={ms(report.latency_p50)} p95={ms(report.latency_p95)} "
+        f"p99={ms(report.latency_p99)} unmatched={report.unmatched_chunks} "
+        f"errors={report.errors} failed={report.failed_legs} "
+        f"{'stable' if report.stable else 'UNSTABLE'}"
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Bhasha Setu call pipeline load generator")
+    parser.add_argument("--url", default="ws://127.0.0.1:8000", help="Server base URL")
+    parser.add_argument("--calls", type=int, default=4, help="Concurrent calls")
+    parser.add_argument("--sweep", default=None,
+                        help="Comma-separated call counts to run in sequence, e.g. 1,2,4,8")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of audio per leg")
+    parser.add_argument("--pair", type=parse_pair, default=("en", "hi"), help="Language pair src:tgt")
+    parser.add_argument("--duplex", action="store_true", help="Add the reverse leg to every call")
+    parser.add_argument("--fixtures", nargs="*", default=[],
+                        help="WAV fixtures (synthetic speech if omitted)")
+    parser.add_argument("--chunk-bytes", type=int, default=DEFAULT_CHUNK_BYTES,
+                        help="Server buffer threshold in bytes")
+    parser.add_argument("--ramp", type=float, default=2.5, help="Spread call starts over N seconds")
+    parser.add_argument("--drain", type=float, default=5.0,
+                        help="Seconds to wait for transcripts after sending")
+    parser.add_argument("--max-p95-factor", type=float, default=1.0,
+                        help="Stable if p95 <= factor * chunk duration")
+    parser.add_argument("--max-slope", type=float, default=0.05,
+                        help="Stable if latency grows slower than this (s/s)")
+    parser.add_argument("--stop-on-unstable", action="store_true",
+                        help="Stop a sweep at the first unstable level")
+    parser.add_argument("--output", default=None, help="Write JSON results to this file")
+    return parser
+
+
+async def main_async(args: argparse.Namespace) -> Dict:
+    fixtures = load_fixtures(args.fixtures, synthetic_seconds=max(args.duration, 10.0))
+    schedules = [realtime_schedule(pcm, args.duration) for pcm in fixtures]
+    chunk_seconds = args.chunk_bytes / bytes_per_second()
+
+    levels = [int(x) for x in args.sweep.split(",")] if args.sweep else [args.calls]
+    reports: List[LoadReport] = []
+
+    for calls in levels:
+        legs, wall = await run_load(
+            args.url,
+            calls,
+            schedules,
+            args.pair,
+            duplex=args.duplex,
+            chunk_bytes=args.chunk_bytes,
+            ramp_seconds=args.ramp,
+            drain_seconds=args.drain
+        )
+        report = summarize(
+            legs,
+            calls,
+            wall,
+            chunk_seconds,
+            max_p95_factor=args.max_p95_factor,
+            max_slope=args.max_slope
+        )
+        reports.append(report)
+        print(format_report(report), flush=True)
+
+        for leg in legs:
+            if leg.failure:
+                print(f"  leg {leg.call_id}/{leg.source_lang} failed: {leg.failure}")
+
+        if args.stop_on_unstable and not report.stable:
+            break
+
+    knee = find_knee(reports)
+    if len(reports) > 1:
+        print(f"Latency stable up to {knee} concurrent calls" if knee
+              else "Latency unstable at every load level")
+
+    return {
+        "url": args.url,
+        "duration": args.duration,
+        "chunk_seconds": chunk_seconds,
+        "reports": [asdict(r) for r in reports],
+        "stable_up_to_calls": knee,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    results = asyncio.run(main_async(args))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
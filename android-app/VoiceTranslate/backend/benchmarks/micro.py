@@ -0,0 +1,340 @@
+"""
+Microbenchmarks for the per-frame and per-chunk hot paths.
+
+Times the helpers that run on every received frame or every buffered chunk
+at realistic sizes (chunk lengths, duplicate windows, room sizes), writes
+the results as JSON and optionally compares them against a stored
+baseline. Runs against the stub STT backend, so no models are loaded.
+
+Usage:
+    python -m benchmarks.micro --output micro.json
+    python -m benchmarks.micro --compare micro_baseline.json --threshold 0.25
+    python -m benchmarks.micro --filter relay
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import wave
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+
+from config import settings
+
+settings.whisper.backend = "stub"
+settings.translation.backend = "stub"
+
+from benchmarks.fixtures import FRAME_BYTES, bytes_per_second, synthetic_speech  # noqa: E402
+from models import STTResult, TranscriptionMessage  # noqa: E402
+from services.audio_service import AudioService  # noqa: E402
+from services.stt_service import STTService  # noqa: E402
+from services.stub_backends import StubSegment  # noqa: E402
+from services.websocket_service import WebSocketService  # noqa: E402
+from utils.dedupe import TranscriptWindow  # noqa: E402
+
+# Realistic sizes
+CHUNK_SECONDS = [0.5, 2.5, 10.0]
+WINDOW_SIZES = [1, 10, 50]
+ROOM_SIZES = [2, 8, 32]
+
+
+class NullWebSocket:
+    """WebSocket stand-in whose sends complete immediately"""
+
+    async def send_bytes(self, data: bytes) -> None:
+        pass
+
+    async def send_json(self, data: Any) -> None:
+        pass
+
+
+class Benchmark:
+    """A named, parameterized timing case"""
+
+    def __init__(
+        self,
+        name: str,
+        params: Dict[str, Any],
+        func: Callable[[], Any] = None,
+        coro: Callable[[], Awaitable[Any]] = None,
+        number: int = 1000,
+        setup: Callable[[], None] = None,
+        teardown: Callable[[], None] = None
+    ):
+        self.name = name
+        self.params = params
+        self.func = func
+        self.coro = coro
+        self.number = number
+        self.setup = setup
+        self.teardown = teardown
+
+    @property
+    def key(self) -> str:
+        suffix = ",".join(f"{k}={v}" for k, v in self.params.items())
+        return f"{self.name}[{suffix}]" if suffix else self.name
+
+
+def _time_sync(func: Callable[[], Any], number: int) -> float:
+    started = time.perf_counter_ns()
+    for _ in range(number):
+        func()
+    return (time.perf_counter_ns() - started) / number / 1000
+
+
+def _time_async(loop: asyncio.AbstractEventLoop, coro: Callable[[], Awaitable[Any]], number: int) -> float:
+    async def run() -> int:
+        started = time.perf_counter_ns()
+        for _ in range(number):
+            await coro()
+        return time.perf_counter_ns() - started
+
+    return loop.run_until_complete(run()) / number / 1000
+
+
+def run_benchmark(bench: Benchmark, repeat: int, loop: asyncio.AbstractEventLoop) -> Dict[str, Any]:
+    """
+    Time a benchmark.
+
+    Returns:
+        Per-operation timings in microseconds
+    """
+    if bench.setup:
+        bench.setup()
+    try:
+        samples = []
+        for _ in range(repeat):
+            if bench.coro is not None:
+                samples.append(_time_async(loop, bench.coro, bench.number))
+            else:
+                samples.append(_time_sync(bench.func, bench.number))
+    finally:
+        if bench.teardown:
+            bench.teardown()
+
+    return {
+        "name": bench.name,
+        "params": bench.params,
+        "number": bench.number,
+        "repeat": repeat,
+        "median_us": statistics.median(samples),
+        "min_us": min(samples),
+    }
+
+
+def _write_wav(path: str, pcm: bytes) -> None:
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(settings.audio.channels)
+        wf.setsampwidth(settings.audio.sample_width)
+        wf.setframerate(settings.audio.sample_rate)
+        wf.writeframes(pcm)
+
+
+def build_benchmarks(workdir: str) -> List[Benchmark]:
+    """Construct all benchmark cases"""
+    benches: List[Benchmark] = []
+    audio_service = AudioService()
+    stt_service = STTService()
+
+    # AudioService: per-chunk VAD on the saved WAV
+    for seconds in CHUNK_SECONDS:
+        path = os.path.join(workdir, f"chunk_{seconds}.wav")
+        _write_wav(path, synthetic_speech(seconds, seed=1))
+        benches.append(Benchmark(
+            "audio.is_audio_silent",
+            {"chunk_s": seconds},
+            func=lambda p=path: audio_service.is_audio_silent(p),
+            number=200
+        ))
+
+    # AudioService: silence trimming before inference
+    for seconds in CHUNK_SECONDS:
+        pcm = synthetic_speech(seconds, seed=1)
+        benches.append(Benchmark(
+            "audio.compact_speech",
+            {"chunk_s": seconds},
+            func=lambda pcm=pcm: audio_service.compact_speech(pcm),
+            number=200
+        ))
+
+    rng = np.random.default_rng(0)
+    energies = rng.uniform(0.001, 0.05, size=1024)
+    counter = iter(range(10 ** 12))
+    benches.append(Benchmark(
+        "audio.update_audio_stats",
+        {},
+        func=lambda: audio_service.update_audio_stats(
+            energies[next(counter) % 1024], energies[next(counter) % 1024] * 4
+        ),
+        number=5000
+    ))
+
+    # STTService: duplicate suppression against a session's recent window
+    for entries in WINDOW_SIZES:
+        texts = [f"utterance number {i} from the caller" for i in range(64)]
+        seq = iter(range(10 ** 12))
+        window = TranscriptWindow(3600, max_entries=entries)
+
+        def setup(entries=entries, window=window):
+            window.clear()
+            for j in range(entries):
+                window.check(f"previous line {j} said earlier")
+
+        benches.append(Benchmark(
+            "stt.is_duplicate_transcript",
+            {"window": entries},
+            func=lambda texts=texts, seq=seq, window=window: stt_service.is_duplicate_transcript(
+                texts[next(seq) % len(texts)], window
+            ),
+            number=5000,
+            setup=setup
+        ))
+
+    for label, text in (
+        ("filler", "Thank you."),
+        ("sentence", "The train to Pune was late again this morning, please call me."),
+    ):
+        benches.append(Benchmark(
+            "stt.is_hallucination",
+            {"text": label},
+            func=lambda t=text: stt_service.is_hallucination(t, "en"),
+            number=20000
+        ))
+
+    segment = StubSegment(0, 0.0, 2.5, " The train to Pune was late again this morning.")
+    benches.append(Benchmark(
+        "stt.get_rejection_reason",
+        {},
+        func=lambda: stt_service.get_rejection_reason(segment),
+        number=20000
+    ))
+
+    # WebSocketService: per-frame relay and per-transcript fan-out
+    frame = synthetic_speech(FRAME_BYTES / bytes_per_second(), seed=2)
+    for size in ROOM_SIZES:
+        ws_service = WebSocketService()
+        ws_service.rooms["call0"] = {f"user{i}": NullWebSocket() for i in range(size)}
+        payload = TranscriptionMessage(
+            source="how are you", translated="आप कैसे हैं", sender="en"
+        ).model_dump()
+
+        benches.append(Benchmark(
+            "ws.relay_audio",
+            {"room": size},
+            coro=lambda s=ws_service: s.relay_audio(frame, "call0", "user0"),
+            number=5000
+        ))
+        benches.append(Benchmark(
+            "ws._broadcast_json",
+            {"room": size},
+            coro=lambda s=ws_service, p=payload: s._broadcast_json("call0", p),
+            number=5000
+        ))
+
+    # Pydantic message models built for every result
+    benches.append(Benchmark(
+        "models.TranscriptionMessage.model_dump",
+        {},
+        func=lambda: TranscriptionMessage(
+            source="how are you", translated="आप कैसे हैं", sender="en"
+        ).model_dump(),
+        number=20000
+    ))
+    benches.append(Benchmark(
+        "models.STTResult",
+        {},
+        func=lambda: STTResult(success=True, source_text="how are you"),
+        number=20000
+    ))
+
+    return benches
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """
+    Compare results against a baseline.
+
+    Args:
+        results: Current results keyed by benchmark key
+        baseline: Baseline results keyed by benchmark key
+        threshold: Allowed relative slowdown (0.25 = 25%)
+
+    Returns:
+        Keys of benchmarks that regressed beyond the threshold
+    """
+    regressions = []
+    print(f"\n{'benchmark':<55} {'baseline':>10} {'current':>10} {'change':>8}")
+    for key, current in results.items():
+        base = baseline.get(key)
+        if base is None:
+            print(f"{key:<55} {'-':>10} {current['median_us']:>9.2f}u {'new':>8}")
+            continue
+
+        change = current["median_us"] / base["median_us"] - 1 if base["median_us"] else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(key)
+            flag = "  REGRESSION"
+        print(
+            f"{key:<55} {base['median_us']:>9.2f}u {current['median_us']:>9.2f}u "
+            f"{change * 100:>+7.1f}%{flag}"
+        )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bhasha Setu hot-path microbenchmarks")
+    parser.add_argument("--output", default="micro_results.json", help="Write JSON results here")
+    parser.add_argument("--compare", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Relative slowdown counted as a regression")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions per case")
+    parser.add_argument("--filter", default=None, help="Only run benchmarks whose name contains this")
+    args = parser.parse_args(argv)
+
+    loop = asyncio.new_event_loop()
+    results: Dict[str, Dict] = {}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for bench in build_benchmarks(workdir):
+            if args.filter and args.filter not in bench.name:
+                continue
+            result = run_benchmark(bench, args.repeat, loop)
+            results[bench.key] = result
+            print(f"{bench.key:<55} median={result['median_us']:>9.2f}us min={result['min_us']:>9.2f}us")
+
+    loop.close()
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "meta": {
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "machine": platform.machine(),
+                "cpu_count": os.cpu_count(),
+                "timestamp": time.time(),
+            },
+            "results": results,
+        }, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            return 1
+        print("\nNo regressions")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
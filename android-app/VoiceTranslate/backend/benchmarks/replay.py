@@ -0,0 +1,147 @@
+"""
+Time-accurate replay of captured call sessions.
+
+Drives the server from capture logs written with SERVER__CAPTURE_DIR set,
+preserving the original inter-frame timing. Legs that belonged to the same
+call are replayed into the same room.
+
+Usage:
+    python -m benchmarks.replay captures/*.bscap
+    python -m benchmarks.replay captures/*.bscap --speed 2 --copies 16 --output replay.json
+"""
+import argparse
+import asyncio
+import json
+import time
+from dataclasses import asdict
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.load_generator import (
+    DEFAULT_CHUNK_BYTES,
+    CallLeg,
+    Schedule,
+    format_report,
+    summarize,
+)
+from benchmarks.fixtures import bytes_per_second
+from utils.traffic_capture import read_capture
+
+
+def load_sessions(paths: List[str]) -> List[Tuple[Dict, Schedule]]:
+    """
+    Load capture logs as replay schedules.
+
+    Each schedule starts at the first frame, so connection setup time
+    in the original session is not replayed as silence.
+
+    Args:
+        paths: Capture file paths
+
+    Returns:
+        List of (header, schedule) pairs
+    """
+    sessions = []
+    for path in paths:
+        header, frames = read_capture(path)
+        if not frames:
+            continue
+        first = frames[0][0]
+        sessions.append((header, [(offset - first, data) for offset, data in frames]))
+    return sessions
+
+
+async def replay(
+    url: str,
+    sessions: List[Tuple[Dict, Schedule]],
+    copies: int = 1,
+    speed: float = 1.0,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    drain_seconds: float = 5.0
+):
+    """
+    Replay every session the given number of times, all at once.
+
+    Args:
+        url: Server base URL (ws://host:port)
+        sessions: Loaded capture sessions
+        copies: Concurrent copies of the whole capture set
+        speed: Playback speed multiplier (2.0 replays twice as fast)
+        chunk_bytes: Server buffer threshold in bytes
+        drain_seconds: Time to wait for transcripts after sending
+
+    Returns:
+        Leg results and wall-clock duration
+    """
+    run_id = f"replay{int(time.time() * 1000) % 1000000}"
+    legs = [
+        CallLeg(
+            url,
+            f"{run_id}-{copy}-{header['call_id']}",
+            header["source_lang"],
+            header["target_lang"],
+            schedule,
+            chunk_bytes=chunk_bytes,
+            speed=speed,
+            drain_seconds=drain_seconds
+        )
+        for copy in range(copies)
+        for header, schedule in sessions
+    ]
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(leg.run() for leg in legs))
+    return list(results), time.perf_counter() - started
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay captured Bhasha Setu call sessions")
+    parser.add_argument("captures", nargs="+", help="Capture files (.bscap)")
+    parser.add_argument("--url", default="ws://127.0.0.1:8000", help="Server base URL")
+    parser.add_argument("--speed", type=float, default=1.0, help="Playback speed multiplier")
+    parser.add_argument("--copies", type=int, default=1, help="Concurrent copies of the capture set")
+    parser.add_argument("--chunk-bytes", type=int, default=DEFAULT_CHUNK_BYTES,
+                        help="Server buffer threshold in bytes")
+    parser.add_argument("--drain", type=float, default=5.0,
+                        help="Seconds to wait for transcripts after sending")
+    parser.add_argument("--output", default=None, help="Write JSON results to this file")
+    args = parser.parse_args(argv)
+
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+
+    sessions = load_sessions(args.captures)
+    if not sessions:
+        parser.error("No frames found in the given captures")
+
+    calls = len({header["call_id"] for header, _ in sessions}) * args.copies
+    legs, wall = asyncio.run(replay(
+        args.url,
+        sessions,
+        copies=args.copies,
+        speed=args.speed,
+        chunk_bytes=args.chunk_bytes,
+        drain_seconds=args.drain
+    ))
+
+    # Latency budget scales with playback speed
+    chunk_seconds = args.chunk_bytes / bytes_per_second() / args.speed
+    report = summarize(legs, calls, wall, chunk_seconds)
+    print(format_report(report))
+
+    for leg in legs:
+        if leg.failure:
+            print(f"  leg {leg.call_id}/{leg.source_lang} failed: {leg.failure}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "captures": args.captures,
+                "speed": args.speed,
+                "copies": args.copies,
+                "report": asdict(report),
+            }, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
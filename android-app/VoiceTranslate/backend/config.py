@@ -3,7 +3,7 @@ Configuration management for Bhasha Setu backend.
 Supports environment variables and multiple deployment environments.
 """
 import os
-from typing import List
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 
@@ -17,6 +17,7 @@ class AudioConfig(BaseSettings):
     # Chunk sizes for processing
     min_chunk_duration_ms: int = Field(default=300, description="Minimum audio chunk duration in ms")
     buffer_threshold_duration_ms: int = Field(default=2500, description="Buffer threshold duration in ms")
+    overlap_duration_ms: int = Field(default=0, description="Audio shared by consecutive STT windows in ms (0 = hard cuts)")
     
     @property
     def min_chunk_size_bytes(self) -> int:
@@ -27,6 +28,14 @@ class AudioConfig(BaseSettings):
     def buffer_threshold_bytes(self) -> int:
         """Calculate buffer threshold in bytes"""
         return int(self.buffer_threshold_duration_ms / 1000 * self.sample_rate * self.sample_width)
+    
+    @property
+    def overlap_bytes(self) -> int:
+        """Calculate window overlap in bytes, aligned to whole samples"""
+        frame = self.sample_width * self.channels
+        # Capped at half a window so every chunk still advances the stream
+        duration_ms = min(self.overlap_duration_ms, self.buffer_threshold_duration_ms // 2)
+        return int(duration_ms / 1000 * self.sample_rate) * frame
 
 
 class VADConfig(BaseSettings):
@@ -34,23 +43,163 @@ class VADConfig(BaseSettings):
     base_threshold: float = Field(default=0.003, description="Base energy threshold for VAD")
     min_duration_seconds: float = Field(default=0.3, description="Minimum speech duration in seconds")
     duplicate_window_seconds: int = Field(default=10, description="Window for duplicate detection in seconds")
+    duplicate_max_entries: int = Field(default=32, description="Maximum transcripts kept per session for duplicate detection")
+    near_duplicate_threshold: float = Field(default=0.8, description="Shingle similarity treated as a duplicate (1.0 disables)")
+    near_duplicate_shingle_size: int = Field(default=3, description="Character shingle length for near-duplicate detection")
+    trim_silence: bool = Field(default=False, description="Trim silence and shorten pauses before inference")
+    trim_frame_ms: int = Field(default=20, description="Frame length for silence trimming energy")
+    trim_padding_ms: int = Field(default=200, description="Audio kept around speech when trimming")
+    pause_max_ms: int = Field(default=600, description="Internal pauses longer than this are shortened")
+    pause_keep_ms: int = Field(default=300, description="Length a shortened pause is cut to")
+
+
+class SessionConfig(BaseSettings):
+    """Call session lifecycle configuration"""
+    idle_timeout_seconds: int = Field(default=300, description="Reclaim sessions idle for this long")
+    reap_interval_seconds: int = Field(default=30, description="Interval between idle session sweeps")
+    resume_grace_seconds: int = Field(default=30, description="Hold a dropped session this long for resumption (0 = off)")
 
 
 class WhisperConfig(BaseSettings):
     """Whisper model configuration"""
+    backend: str = Field(default="whisper", description="STT backend (whisper, stub)")
     model_size: str = Field(default="small", description="Whisper model size (tiny, base, small, medium, large)")
     device: str = Field(default="cpu", description="Device to run model on (cpu, cuda)")
     compute_type: str = Field(default="int8", description="Compute type (int8, float16, float32)")
+    pool_size: int = Field(default=0, description="Model replicas per model size (0 = cores / cpu_threads)")
+    cpu_threads: int = Field(default=0, description="Intra-op CPU threads per replica (0 = min(4, cores))")
     beam_size: int = Field(default=5, description="Beam size for decoding")
     no_speech_threshold: float = Field(default=0.6, description="Threshold for no speech detection")
+    segment_max_no_speech_prob: float = Field(default=0.6, description="Drop segments more likely than this to be non-speech, if also below segment_min_avg_logprob")
+    segment_min_avg_logprob: float = Field(default=-1.0, description="Average token log probability below which a likely non-speech segment is dropped")
+    segment_max_compression_ratio: float = Field(default=2.4, description="Drop segments more repetitive than this gzip ratio")
+    language_candidates: List[str] = Field(default=[], description="Languages 'auto' sessions may detect (empty = any)")
+    language_detect_chunks: int = Field(default=3, description="Speech chunks voted on before an 'auto' language locks")
+    language_early_lock_probability: float = Field(default=0.95, description="Single-chunk confidence that locks the language at once")
+    language_recheck_chunks: int = Field(default=40, description="Chunks between background language re-checks (0 = never)")
+    language_switch_probability: float = Field(default=0.8, description="Re-check confidence needed to count a language switch")
+    result_cache_size: int = Field(default=256, description="Chunk transcriptions cached by audio content (0 = off)")
+    result_cache_ttl_seconds: float = Field(default=120.0, description="Serve cached transcriptions for this long")
     vad_filter: bool = Field(default=True, description="Enable internal Silero VAD")
     vad_min_silence_duration_ms: int = Field(default=500, description="Minimum silence duration for VAD in ms")
 
 
+class QualityConfig(BaseSettings):
+    """Load-adaptive STT quality configuration"""
+    enabled: bool = Field(default=False, description="Step decoding quality down under load")
+    tiers: List[str] = Field(
+        default=["small:5", "small:1", "base:1", "tiny:1"],
+        description="Decoding tiers as model_size:beam_size, best first"
+    )
+    step_down_queue_depth: int = Field(default=8, description="Pending STT jobs that trigger a step down")
+    step_down_latency_ms: int = Field(default=2000, description="Smoothed STT latency that triggers a step down")
+    step_up_queue_depth: int = Field(default=2, description="Pending STT jobs at or below which quality steps up")
+    step_up_latency_ms: int = Field(default=1000, description="Smoothed STT latency at or below which quality steps up")
+    min_dwell_seconds: float = Field(default=10.0, description="Minimum time between tier changes")
+    latency_smoothing: float = Field(default=0.2, description="Weight of the newest sample in the latency average")
+
+
 class TranslationConfig(BaseSettings):
     """Translation model configuration"""
+    backend: str = Field(default="marian", description="Translation backend (marian, stub)")
     model_prefix: str = Field(default="Helsinki-NLP/opus-mt", description="Translation model prefix")
     cache_models: bool = Field(default=True, description="Cache loaded models")
+    workers: int = Field(default=0, description="Translation worker processes (0 = translate in the API process)")
+    batch_size: int = Field(default=8, description="Maximum requests sent to a worker in one batch")
+    batch_wait_ms: int = Field(default=5, description="Time to wait for more requests before sending a batch")
+    rebalance_interval_seconds: int = Field(default=30, description="Interval between pair-to-worker rebalancing passes")
+    request_timeout_seconds: float = Field(default=30.0, description="Give up on a worker translation after this long")
+    worker_restart_backoff_seconds: float = Field(default=1.0, description="Delay before restarting a worker that crashed soon after its last start")
+    worker_restart_max_backoff_seconds: float = Field(default=60.0, description="Cap of the doubling restart delay; a worker up this long restarts at once")
+    incremental: bool = Field(default=False, description="Translate completed sentences across chunk edges")
+    tail_hold_ms: int = Field(default=3000, description="Hold an unfinished sentence this long for more words (exceed the buffer duration)")
+    max_batch_tokens: int = Field(default=400, description="Token limit per generate call (MarianMT accepts 512)")
+    sentence_cache_size: int = Field(default=256, description="Translated sentences cached per session")
+
+
+class ThreadsConfig(BaseSettings):
+    """CPU thread budget configuration"""
+    total_cores: int = Field(default=0, description="Cores the backend may use (0 = all available)")
+    stt_share: float = Field(default=0.6, description="Fraction of cores for Whisper inference")
+    mt_share: float = Field(default=0.3, description="Fraction of cores for translation; the rest serves the web tier")
+    blas_threads: int = Field(default=1, description="Threads for NumPy/BLAS/OpenMP outside the model runtimes")
+    pin_affinity: bool = Field(default=False, description="Pin each tier's threads to its own cores")
+
+
+class AdmissionConfig(BaseSettings):
+    """Admission control and ingress limits"""
+    max_calls: int = Field(default=0, description="Concurrent calls per node (0 = unlimited)")
+    max_room_size: int = Field(default=0, description="Participants per call (0 = unlimited)")
+    max_bytes_per_second: int = Field(default=0, description="Sustained audio bytes/s per connection (0 = unlimited)")
+    burst_seconds: float = Field(default=5.0, description="Audio a connection may send at once, in seconds of the byte rate")
+    max_buffered_mb: int = Field(default=0, description="Audio held in buffers and in-flight chunks per node (0 = unlimited)")
+
+
+class ReadinessConfig(BaseSettings):
+    """Readiness and capacity reporting"""
+    max_load: float = Field(default=0.85, description="Report not-ready above this load (1.0 = saturated)")
+    recover_load: float = Field(default=0.7, description="Report ready again below this load")
+    stt_queue_per_replica: float = Field(default=2.0, description="In-flight STT chunks per replica counted as full load")
+    mt_queue_limit: int = Field(default=16, description="In-flight translations counted as full load")
+    mt_latency_budget_ms: int = Field(default=1000, description="Translation p95 latency counted as full load")
+    latency_window_seconds: float = Field(default=60.0, description="Window of latency samples for percentiles")
+
+
+class DrainConfig(BaseSettings):
+    """Graceful drain for deploys"""
+    deadline_seconds: int = Field(default=120, description="Time live calls get to end before they are disconnected")
+    flush_timeout_seconds: int = Field(default=15, description="Time in-flight utterances get to finish after the deadline")
+    poll_interval_seconds: float = Field(default=1.0, description="Interval between checks for remaining calls")
+    signal: Optional[str] = Field(default="SIGUSR1", description="Signal that starts a drain (empty = none)")
+    admin_token: Optional[str] = Field(default=None, description="Token for /admin endpoints (unset = local requests only)")
+    exit_when_drained: bool = Field(default=True, description="Stop the server once drained")
+
+
+class BulkConfig(BaseSettings):
+    """Bulk file transcription configuration"""
+    max_file_mb: int = Field(default=200, description="Largest accepted upload in MB")
+    max_segment_seconds: float = Field(default=20.0, description="Longest segment sent to Whisper (at most 30)")
+    min_pause_ms: int = Field(default=500, description="Shortest pause a file is split at")
+    max_parallel: int = Field(default=0, description="Segments transcribed at once per request (0 = STT replicas - 1, at least 1)")
+    translation_batch: int = Field(default=8, description="Segments translated per batch")
+
+
+class TranscriptStoreConfig(BaseSettings):
+    """Transcript history configuration"""
+    db_path: Optional[str] = Field(default=None, description="SQLite database for transcript history (disabled if unset)")
+    flush_interval_seconds: float = Field(default=1.0, description="Longest time a transcript waits before being written")
+    batch_size: int = Field(default=200, description="Transcripts written per transaction; a full batch is flushed early")
+    max_pending: int = Field(default=10000, description="Transcripts queued in memory before the oldest are dropped")
+    page_size: int = Field(default=50, description="Default page size of transcript queries")
+    max_page_size: int = Field(default=500, description="Largest page size of transcript queries")
+
+
+class ArchiveConfig(BaseSettings):
+    """Per-call audio archive configuration"""
+    dir: Optional[str] = Field(default=None, description="Directory for per-call audio archives (disabled if unset: temp WAV per chunk)")
+    max_file_mb: int = Field(default=256, description="Size at which a call moves on to a new archive file")
+    retention_hours: float = Field(default=24.0, description="Age after which an archive file is deleted")
+    max_total_mb: int = Field(default=4096, description="Archive size beyond which the oldest files are deleted")
+    max_pending_mb: int = Field(default=64, description="Audio queued for writing before new utterances are not archived")
+    idle_close_seconds: float = Field(default=300.0, description="Close a call's archive file after this long without audio")
+    sweep_interval_seconds: float = Field(default=60.0, description="Interval between retention checks")
+
+
+class StubConfig(BaseSettings):
+    """Stub backend configuration for offline benchmarks and tests"""
+    stt_latency_ms: int = Field(default=0, description="Simulated wait per STT call in ms")
+    stt_cpu_ms: int = Field(default=0, description="CPU burned per STT call in ms")
+    translation_latency_ms: int = Field(default=0, description="Simulated wait per translation in ms")
+    translation_cpu_ms: int = Field(default=0, description="CPU burned per translation in ms")
+    seed: int = Field(default=0, description="Seed mixed into generated transcripts")
+
+
+class LoggingConfig(BaseSettings):
+    """Logging pipeline configuration"""
+    format: str = Field(default="text", description="Log output format (text, json)")
+    levels: Dict[str, str] = Field(default={}, description="Per-logger level overrides, e.g. {\"services.stt_service\": \"DEBUG\"}")
+    queue_size: int = Field(default=10000, description="Records buffered for the writer thread before new ones are dropped")
+    sample_interval_seconds: float = Field(default=5.0, description="Minimum time between records of one sampled hot-path event")
 
 
 class ServerConfig(BaseSettings):
@@ -61,6 +210,7 @@ class ServerConfig(BaseSettings):
     log_level: str = Field(default="INFO", description="Logging level")
     temp_dir: str = Field(default="temp_audio", description="Temporary audio directory")
     cleanup_delay_seconds: int = Field(default=1, description="Delay before cleaning up temp files")
+    capture_dir: Optional[str] = Field(default=None, description="Directory for traffic capture logs (disabled if unset)")
 
 
 class Settings(BaseSettings):
@@ -79,9 +229,20 @@ class Settings(BaseSettings):
     # Sub-configurations
     audio: AudioConfig = Field(default_factory=AudioConfig)
     vad: VADConfig = Field(default_factory=VADConfig)
+    session: SessionConfig = Field(default_factory=SessionConfig)
     whisper: WhisperConfig = Field(default_factory=WhisperConfig)
+    quality: QualityConfig = Field(default_factory=QualityConfig)
     translation: TranslationConfig = Field(default_factory=TranslationConfig)
+    threads: ThreadsConfig = Field(default_factory=ThreadsConfig)
+    admission: AdmissionConfig = Field(default_factory=AdmissionConfig)
+    readiness: ReadinessConfig = Field(default_factory=ReadinessConfig)
+    drain: DrainConfig = Field(default_factory=DrainConfig)
+    bulk: BulkConfig = Field(default_factory=BulkConfig)
+    transcripts: TranscriptStoreConfig = Field(default_factory=TranscriptStoreConfig)
+    archive: ArchiveConfig = Field(default_factory=ArchiveConfig)
     server: ServerConfig = Field(default_factory=ServerConfig)
+    logging: LoggingConfig = Field(default_factory=LoggingConfig)
+    stub: StubConfig = Field(default_factory=StubConfig)
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
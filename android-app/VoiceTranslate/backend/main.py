@@ -3,28 +3,115 @@ Main FastAPI application for Bhasha Setu backend.
 Handles WebSocket endpoints and orchestrates services.
 """
 import asyncio
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+import json
+import os
+import signal
+import struct
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Coroutine, List, Optional, Set, Union
+from fastapi import FastAPI, File, Header, HTTPException, Request, UploadFile, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 from config import settings
+from utils.logger import configure_logging, get_logger, get_logging_stats, LogSampler
+
+# One queued pipeline for every logger, before any module logs
+configure_logging(
+    settings.server.log_level,
+    settings.logging.format,
+    settings.logging.levels,
+    settings.logging.queue_size
+)
+
+from utils.thread_budget import apply_thread_budget, pin_current_thread
+
+# Split the cores before NumPy, torch or CTranslate2 load and size their pools
+thread_budget = apply_thread_budget()
+
+import numpy as np
+
+from services.admission_control import CLOSE_TRY_AGAIN_LATER, get_admission_controller
+from services.audio_archive import AudioArchive, to_wav
 from services.audio_service import AudioService
+from services.bulk_service import BulkTranscriptionService
+from services.capacity import CapacityMonitor
+from services.drain_service import DrainController
+from services.language_detector import AUTO_LANGUAGE
+from services.quality_controller import QualityController, QualityTier
+from services.session_service import CallSession, SessionService
 from services.stt_service import STTService
 from services.translation_service import TranslationService
+from services.transcript_store import TranscriptStore
+from services.translation_workers import TranslationWorkerPool
 from services.websocket_service import WebSocketService
-from utils.logger import setup_logger, get_logger
 from utils.file_utils import safe_delete
+from utils.stage_metrics import StageMetrics
+from utils.traffic_capture import open_capture
+
+logger = get_logger(__name__)
+# Per-frame events are logged at most once per interval per connection
+frame_log = LogSampler(logger, settings.logging.sample_interval_seconds)
+
+# Sequence number prefixed to each binary frame by sequenced clients
+FRAME_SEQ = struct.Struct(">I")
+
+# Minimum seconds between throttling / overload notices to one client
+ADMISSION_WARNING_INTERVAL = 5.0
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background maintenance tasks"""
+    # The event loop and the default executor (file I/O, small blocking
+    # calls) make up the web tier and stay off the STT and MT cores
+    pin_current_thread(thread_budget.web_cpus)
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(
+            max_workers=thread_budget.web_threads,
+            thread_name_prefix="web",
+            initializer=pin_current_thread,
+            initargs=(thread_budget.web_cpus,)
+        )
+    )
+    if translation_workers is not None:
+        await translation_workers.start()
+    if transcript_store.enabled:
+        await transcript_store.start()
+    if audio_archive.enabled:
+        await audio_archive.start()
+    reaper = asyncio.create_task(session_service.run_reaper())
+    
+    # Drain on a signal, leaving SIGTERM/SIGINT to the server's own shutdown
+    drain_signal = getattr(signal, settings.drain.signal, None) if settings.drain.signal else None
+    if drain_signal is not None:
+        try:
+            asyncio.get_running_loop().add_signal_handler(
+                drain_signal, drain.begin, settings.drain.signal
+            )
+        except (NotImplementedError, RuntimeError, ValueError) as e:
+            logger.warning(f"Cannot install {settings.drain.signal} drain handler: {e}")
+    
+    yield
+    reaper.cancel()
+    if translation_workers is not None:
+        await translation_workers.stop()
+    if transcript_store.enabled:
+        await transcript_store.stop()
+    if audio_archive.enabled:
+        await audio_archive.stop()
 
-# Setup logging
-setup_logger("uvicorn", level=settings.server.log_level)
-setup_logger("fastapi", level=settings.server.log_level)
-logger = setup_logger(__name__, level=settings.server.log_level)
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Bhasha Setu API",
     description="Real-time voice translation backend",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -40,59 +127,392 @@ app.add_middleware(
 audio_service = AudioService()
 stt_service = STTService()
 translation_service = TranslationService()
+translation_workers = (
+    TranslationWorkerPool(settings.translation.workers)
+    if settings.translation.workers > 0 else None
+)
 websocket_service = WebSocketService()
+session_service = SessionService()
+quality_controller = QualityController()
+admission = get_admission_controller()
+stage_metrics = StageMetrics(settings.readiness.latency_window_seconds)
+capacity = CapacityMonitor(
+    stage_metrics,
+    stt_service.replicas,
+    lambda: len(session_service.call_sizes),
+    admission.max_calls
+)
+bulk_service = BulkTranscriptionService(audio_service, stt_service, stage_metrics)
+transcript_store = TranscriptStore()
+audio_archive = AudioArchive()
+
+# Untracked background work (temp file cleanup) a drain waits for
+background_tasks: Set[asyncio.Task] = set()
+
+
+def spawn_background(coro: Coroutine) -> asyncio.Task:
+    """
+    Run a coroutine in the background, keeping a reference until it ends.
+    
+    Args:
+        coro: Coroutine to run
+    
+    Returns:
+        Created task
+    """
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+
+def submit_chunk(session: CallSession, chunk: bytes, final: bool = False) -> None:
+    """
+    Start STT and translation of a chunk taken from a session's buffer.
+    
+    The chunk counts against the audio memory budget until its task ends.
+    
+    Args:
+        session: Session the chunk was taken from
+        chunk: PCM chunk
+        final: Last chunk of the session (e.g. flushed by a drain)
+    """
+    admission.charge(len(chunk), force=True)
+    task = asyncio.create_task(
+        process_stt(chunk, session, session.chunks_submitted - 1, final)
+    )
+    task.add_done_callback(lambda _, size=len(chunk): admission.credit(size))
+    session.track_task(task)
+
+
+def flush_session(session: CallSession) -> None:
+    """Submit whatever audio a session still has buffered"""
+    if len(session.audio_buffer) >= settings.audio.min_chunk_size_bytes:
+        submit_chunk(session, session.take_chunk(), final=True)
+
+
+def finish_drain() -> None:
+    """Log final metrics and stop the server once drained"""
+    logger.info(f"Final metrics: {json.dumps(get_health(), default=str)}")
+    if settings.drain.exit_when_drained:
+        # Same path as an operator's SIGTERM: the server shuts down cleanly
+        os.kill(os.getpid(), signal.SIGTERM)
+
+
+drain = DrainController(session_service, flush_session, background_tasks, finish_drain)
 
 logger.info("Bhasha Setu backend initialized")
 logger.info(f"Environment: {settings.environment}")
 logger.info(f"Whisper model: {settings.whisper.model_size}")
 
 
-async def process_stt(
-    audio_data: bytes,
-    call_id: str,
+async def translate_texts(
+    texts: List[str],
     source_lang: str,
     target_lang: str
-) -> None:
+) -> List[str]:
     """
-    Background task to handle STT and Translation.
+    Translate texts of one language pair.
+    
+    Runs in a worker process, or on the MT thread so the event loop stays
+    responsive.
     
     Args:
-        audio_data: Raw PCM audio data
-        call_id: Call identifier
+        texts: Texts to translate
         source_lang: Source language code
         target_lang: Target language code
+    
+    Returns:
+        Translations in input order
+    """
+    with stage_metrics.measure("mt"):
+        if translation_workers is not None:
+            return await translation_workers.translate_batch(texts, source_lang, target_lang)
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            translation_service.executor,
+            translation_service.translate_batch,
+            texts,
+            source_lang,
+            target_lang
+        )
+
+
+async def emit_sentences(
+    session: CallSession,
+    sentences: List[str],
+    tier: Optional[str]
+) -> None:
+    """
+    Translate completed sentences and broadcast them as one transcript.
+    
+    Args:
+        session: Session the speech was received on
+        sentences: Completed source sentences
+        tier: STT tier that produced them
     """
-    logger.debug(
-        f"Received audio chunk: {len(audio_data)} bytes for call {call_id}"
+    source_lang = session.source_lang
+    target_lang = session.target_lang
+    
+    translations = await session.sentences.translate(
+        sentences,
+        lambda batch: translate_texts(batch, source_lang, target_lang)
     )
+    if session.cancelled:
+        return
     
-    # Save audio chunk to file
-    temp_filename = audio_service.save_audio_chunk(
-        audio_data,
-        call_id,
-        source_lang
+    source_text = " ".join(sentences)
+    translated_text = " ".join(translations)
+    logger.info(
+        "[%s] %s: %s -> %s: %s",
+        session.call_id, source_lang, source_text, target_lang, translated_text,
+        extra={"call_id": session.call_id}
     )
+    await websocket_service.broadcast_transcription(
+        session.call_id,
+        source_text,
+        translated_text,
+        source_lang,
+        tier
+    )
+    session.transcripts_sent += 1
+    transcript_store.record(
+        session.call_id,
+        session.user_id,
+        source_lang,
+        target_lang,
+        source_text,
+        translated_text,
+        tier
+    )
+
+
+async def flush_tail(session: CallSession) -> None:
+    """
+    Translate a held-back unfinished sentence once the speaker pauses.
+    
+    Args:
+        session: Session holding the tail
+    """
+    await asyncio.sleep(settings.translation.tail_hold_ms / 1000)
     
-    if temp_filename is None:
+    sentences = session.sentences
+    # A chunk still in flight may finish the sentence; it reschedules
+    if sentences.busy(session.chunks_submitted):
         return
     
-    try:
-        logger.info(f"Processing audio file: {temp_filename}")
-        
-        # Check if audio is silent
-        if audio_service.is_audio_silent(temp_filename):
-            logger.debug("Audio is silent, skipping transcription")
+    # Past this point a new chunk must not cancel the flush
+    sentences.flush_task = None
+    
+    # Hold the stage until the tail is broadcast, so a chunk arriving
+    # meanwhile emits its sentences after it
+    async with sentences.emit_lock:
+        # A chunk that got in first owns the tail now and has scheduled
+        # its own flush, or is still in flight
+        if sentences.flush_task is not None or sentences.busy(session.chunks_submitted):
             return
-        
-        # Run STT in thread pool
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            None,
-            stt_service.process,
-            temp_filename,
-            source_lang,
-            call_id
+        tail, tier = sentences.take_tail()
+        if tail:
+            await emit_sentences(session, [tail], tier)
+
+
+def schedule_tail_flush(session: CallSession) -> None:
+    """Restart the hold timer for the session's unfinished sentence"""
+    sentences = session.sentences
+    if sentences.flush_task is not None:
+        sentences.flush_task.cancel()
+        sentences.flush_task = None
+    
+    if sentences.tail and not session.cancelled:
+        sentences.flush_task = asyncio.create_task(flush_tail(session))
+        session.track_task(sentences.flush_task)
+
+
+async def announce_language(session: CallSession) -> None:
+    """
+    Tell an "auto" speaker which language was locked for them.
+    
+    Args:
+        session: Session with language detection
+    """
+    language = session.language.take_announcement()
+    if language is None or session.websocket is None:
+        return
+    
+    logger.info(
+        f"Locked language {language} for {session.call_id}/{session.user_id} "
+        f"(confidence {session.language.confidence:.2f})"
+    )
+    try:
+        await websocket_service.send_status(
+            session.websocket,
+            f"Language detected: {language}",
+            {"language": language, "confidence": round(session.language.confidence, 3)}
+        )
+    except Exception as e:
+        logger.debug(f"Failed to announce language: {e}")
+
+
+async def recheck_language(
+    session: CallSession,
+    audio: Union[str, np.ndarray],
+    tier: Optional[QualityTier]
+) -> None:
+    """
+    Background language re-check for a locked "auto" session.
+    
+    Owns the audio file, if any, and deletes it when done.
+    
+    Args:
+        session: Session with a locked language
+        audio: Chunk to run language identification on (WAV path or samples)
+        tier: Quality tier whose model to use
+    """
+    try:
+        loop = asyncio.get_running_loop()
+        info = await loop.run_in_executor(
+            stt_service.executor,
+            stt_service.detect_language,
+            audio,
+            tier
+        )
+        if session.language.recheck(info):
+            session.source_lang = session.language.best_guess
+    except Exception as e:
+        logger.error(f"Language re-check failed: {e}")
+    finally:
+        if isinstance(audio, str):
+            await safe_delete(audio, delay=settings.server.cleanup_delay_seconds)
+
+
+async def process_stt(
+    audio_data: bytes,
+    session: CallSession,
+    seq: int = 0,
+    final: bool = False
+) -> None:
+    """
+    Background task to handle STT and Translation.
+    
+    Args:
+        audio_data: Raw PCM audio data
+        session: Session the audio was received on
+        seq: Submission index of the chunk within the session
+        final: Last chunk of the session, with no window after it
+    """
+    call_id = session.call_id
+    source_lang = session.source_lang
+    target_lang = session.target_lang
+    
+    logger.debug("Received audio chunk: %d bytes for call %s", len(audio_data), call_id)
+    
+    # With overlapping windows this chunk owns the audio from the middle
+    # of the leading overlap to the middle of the trailing one. The overlap
+    # is the one the buffer actually keeps (capped at half a window), so
+    # the owned windows tile the stream.
+    window = None
+    bytes_per_second = (
+        settings.audio.sample_rate * settings.audio.sample_width * settings.audio.channels
+    )
+    overlap = settings.audio.overlap_bytes / bytes_per_second
+    if overlap > 0:
+        duration = len(audio_data) / bytes_per_second
+        window = (
+            0.0 if seq == 0 else overlap / 2,
+            duration if final else duration - overlap / 2
         )
+    
+    # Tier chosen once, so a result is cached under the tier that decoded it
+    tier = quality_controller.current_tier
+    
+    # Retransmitted audio is looked up by content before any decoding.
+    # "auto" sessions are cached only once their language is locked.
+    cache_key = None
+    cached = None
+    if stt_service.result_cache.enabled:
+        language = session.language.locked if session.language is not None else source_lang
+        if language is not None:
+            cache_key = stt_service.result_cache.make_key(
+                audio_data, language, tier.name, window
+            )
+            cached = stt_service.lookup_cached(cache_key, session)
+    
+    # The archive keeps the chunk as received, minus the leading overlap
+    # the previous record already holds
+    received = audio_data if seq == 0 else audio_data[settings.audio.overlap_bytes:]
+    
+    # Cut silence so Whisper only decodes speech
+    offset_map = None
+    if settings.vad.trim_silence and cached is None:
+        audio_data, offset_map = audio_service.compact_speech(audio_data)
+    
+    # Set once a language re-check takes over deleting the file
+    recheck_task = None
+    
+    # "auto" sessions label their audio with the language detected so far
+    chunk_lang = (
+        session.language.best_guess if session.language is not None else None
+    ) or source_lang
+    
+    # Save audio chunk to file, or with an archive, append it to the
+    # call's archive and decode straight from memory
+    temp_filename = None
+    utterance_id = None
+    audio_input = None
+    if audio_data and cached is None:
+        if audio_archive.enabled:
+            if len(audio_data) >= settings.audio.min_chunk_size_bytes:
+                utterance_id = audio_archive.append(
+                    call_id, session.user_id, chunk_lang, seq, received
+                )
+                audio_input = audio_service.pcm_to_samples(audio_data)
+        else:
+            temp_filename = audio_service.save_audio_chunk(
+                audio_data,
+                call_id,
+                chunk_lang
+            )
+            audio_input = temp_filename
+    
+    if audio_input is None and cached is None:
+        if session.sentences is not None:
+            session.sentences.done(seq)
+        return
+    
+    try:
+        if cached is not None:
+            result = cached
+        else:
+            logger.info(
+                "Processing audio: %s", temp_filename or utterance_id or f"chunk {seq}",
+                extra={"call_id": call_id}
+            )
+            
+            # Check if audio is silent
+            if audio_service.is_audio_silent(audio_input, session.vad_stats):
+                logger.debug("Audio is silent, skipping transcription")
+                return
+            
+            # Run STT on a free model replica at the tier picked above
+            loop = asyncio.get_event_loop()
+            quality_controller.begin()
+            started = time.perf_counter()
+            try:
+                with stage_metrics.measure("stt"):
+                    result = await loop.run_in_executor(
+                        stt_service.executor,
+                        stt_service.process,
+                        audio_input,
+                        source_lang,
+                        session,
+                        tier,
+                        window,
+                        offset_map,
+                        cache_key
+                    )
+            finally:
+                quality_controller.end(time.perf_counter() - started)
         
         # Check if transcription succeeded and has content
         if not result.success:
@@ -108,26 +528,67 @@ async def process_stt(
             logger.debug("Transcription returned empty (filtered or silent)")
             return
         
-        # Translate
-        translated_text = translation_service.translate(
-            result.source_text,
+        # Nobody left in the call to receive the result
+        if session.cancelled:
+            return
+        
+        # Language of this chunk: fixed, locked, or detected with it
+        source_lang = result.language or session.source_lang
+        if session.language is not None:
+            await announce_language(session)
+            if session.language.tick() and audio_input is not None:
+                recheck_task = asyncio.create_task(
+                    recheck_language(session, audio_input, tier)
+                )
+                session.track_task(recheck_task)
+        
+        # Incremental mode: translate only sentences this chunk completes,
+        # in the order the chunks were spoken
+        if session.sentences is not None:
+            await session.sentences.wait_turn(seq)
+            async with session.sentences.emit_lock:
+                sentences = session.sentences.feed(result.source_text, result.tier)
+                if sentences:
+                    await emit_sentences(session, sentences, result.tier)
+            return
+        
+        translated_text = (await translate_texts(
+            [result.source_text],
             source_lang,
             target_lang
-        )
+        ))[0]
         
         # Broadcast result
         logger.info(
-            f"[{call_id}] {source_lang}: {result.source_text} "
-            f"-> {target_lang}: {translated_text}"
+            "[%s] %s: %s -> %s: %s",
+            call_id, source_lang, result.source_text, target_lang, translated_text,
+            extra={"call_id": call_id}
         )
         
         await websocket_service.broadcast_transcription(
             call_id,
             result.source_text,
             translated_text,
-            source_lang
+            source_lang,
+            result.tier,
+            utterance_id
+        )
+        session.transcripts_sent += 1
+        transcript_store.record(
+            call_id,
+            session.user_id,
+            source_lang,
+            target_lang,
+            result.source_text,
+            translated_text,
+            result.tier,
+            utterance_id
         )
     
+    except asyncio.CancelledError:
+        logger.debug("STT task cancelled for call %s", call_id)
+        raise
+    
     except Exception as e:
         logger.error(f"STT processing error: {e}", exc_info=True)
         await websocket_service.broadcast_error(
@@ -137,10 +598,15 @@ async def process_stt(
         )
     
     finally:
+        if session.sentences is not None:
+            session.sentences.done(seq)
+            schedule_tail_flush(session)
+        
         # Schedule file cleanup
-        asyncio.create_task(
-            safe_delete(temp_filename, delay=settings.server.cleanup_delay_seconds)
-        )
+        if recheck_task is None and temp_filename is not None:
+            spawn_background(
+                safe_delete(temp_filename, delay=settings.server.cleanup_delay_seconds)
+            )
 
 
 @app.websocket("/ws/call/{call_id}/{source_lang}/{target_lang}")
@@ -153,62 +619,304 @@ async def websocket_endpoint(
     """
     WebSocket endpoint for real-time voice call with translation.
     
+    Query parameters:
+        resume: Resume token from an earlier connect status, to continue
+            a dropped session with its buffered audio
+        seq: "1" if every binary frame starts with a 4-byte big-endian
+            sequence number; frames already received are skipped
+    
     Args:
         websocket: WebSocket connection
         call_id: Unique call identifier
         source_lang: Source language code
         target_lang: Target language code
     """
-    user_id = source_lang  # Use source language as user identifier
+    sequenced = websocket.query_params.get("seq") == "1"
+    resume_token = websocket.query_params.get("resume")
     
-    await websocket_service.connect(websocket, call_id, user_id)
+    session = None
+    replaced = None
+    if resume_token and settings.session.resume_grace_seconds > 0:
+        previous = session_service.tokens.get(resume_token)
+        replaced = previous.websocket if previous is not None else None
+        session = session_service.resume(resume_token, call_id, websocket)
+    
+    resumed = session is not None
+    if resumed:
+        user_id = session.user_id
+        source_lang = session.source_lang
+        target_lang = session.target_lang
+    else:
+        # Use source language as user identifier; "auto" speakers get their own
+        if source_lang == AUTO_LANGUAGE:
+            user_id = f"{AUTO_LANGUAGE}-{uuid.uuid4().hex[:8]}"
+        else:
+            user_id = source_lang
+        
+        # A participant replacing their own stale session is already counted
+        rejoining = session_service.get(call_id, user_id) is not None
+        error_code = "CAPACITY"
+        if drain.draining:
+            reason = "Server is restarting, please reconnect"
+            error_code = "DRAINING"
+        else:
+            reason = admission.check_call(call_id, session_service.call_sizes, rejoining)
+        if reason is not None:
+            logger.warning(f"Rejected {call_id}/{user_id}: {reason}")
+            await websocket_service.reject(websocket, reason, error_code, CLOSE_TRY_AGAIN_LATER)
+            return
+        
+        session = session_service.open(call_id, user_id, source_lang, target_lang, websocket)
+    
+    await websocket_service.connect(
+        websocket,
+        call_id,
+        user_id,
+        {
+            "resume_token": session.resume_token,
+            "resumed": resumed,
+            "last_seq": session.last_seq,
+            "received_bytes": session.stream_position + len(session.audio_buffer),
+        }
+    )
+    
+    # The old connection of a resumed session may not have noticed the drop
+    if resumed and replaced is not None:
+        try:
+            await replaced.close(code=1000, reason="Session resumed")
+        except Exception as e:
+            logger.debug(f"Failed to close replaced websocket: {e}")
     
     logger.info(
         f"WebSocket connected: call_id={call_id}, user_id={user_id}, "
         f"source={source_lang}, target={target_lang}"
     )
     
-    # Audio buffer for accumulating chunks
-    audio_buffer = bytearray()
+    # Optional traffic capture for offline replay
+    capture = open_capture(
+        settings.server.capture_dir,
+        call_id,
+        user_id,
+        source_lang,
+        target_lang,
+        settings.audio.sample_rate
+    )
+    
     threshold = settings.audio.buffer_threshold_bytes
+    overlap_bytes = settings.audio.overlap_bytes
     
     logger.info(
         f"Audio buffer threshold: {threshold} bytes "
         f"({threshold / (settings.audio.sample_rate * settings.audio.sample_width):.2f} seconds)"
     )
     
+    # Per-connection ingress limit; over-rate frames are delayed, which
+    # pushes back on the client through TCP flow control
+    bucket = admission.make_bucket()
+    # Last time the client was told about throttling or dropped audio
+    warned_at = 0.0
+    
+    # Sampling keys of this connection's per-frame log events
+    frame_key = f"{call_id}/{user_id}"
+    throttle_key = f"throttle:{frame_key}"
+    drop_key = f"drop:{frame_key}"
+    
+    dropped = False
     try:
         while True:
             # Receive audio data
             data = await websocket.receive_bytes()
-            logger.debug(f"Received {len(data)} bytes from {user_id}")
+            # Arrival time for the capture, before any throttling delay
+            received_at = time.monotonic()
+            frame_log.debug(frame_key, "Received %d bytes from %s", len(data), user_id)
+            
+            if bucket is not None:
+                delay = bucket.consume(len(data))
+                if delay > 0:
+                    admission.throttled_frames += 1
+                    frame_log.warning(
+                        throttle_key, "Throttling %s: %.2fs over its byte rate", frame_key, delay
+                    )
+                    if time.monotonic() - warned_at > ADMISSION_WARNING_INTERVAL:
+                        warned_at = time.monotonic()
+                        await websocket_service.send_status(
+                            websocket,
+                            "Rate limited",
+                            {"max_bytes_per_second": bucket.rate}
+                        )
+                    await asyncio.sleep(delay)
+            
+            if sequenced:
+                if len(data) < FRAME_SEQ.size:
+                    continue
+                (frame_seq,) = FRAME_SEQ.unpack_from(data)
+                data = data[FRAME_SEQ.size:]
+                # Resent after a reconnect but already buffered or processed
+                if not session.accept_seq(frame_seq):
+                    continue
+            
+            if capture is not None:
+                capture.write(data, received_at)
             
             # 1. Immediate relay for real-time audio
             await websocket_service.relay_audio(data, call_id, user_id)
             
-            # 2. Accumulate for STT
-            audio_buffer.extend(data)
+            # 2. Accumulate for STT, unless the node's audio memory is full
+            if not session.add_frame(data):
+                admission.dropped_frames += 1
+                frame_log.warning(
+                    drop_key, "Dropped frame from %s: audio memory budget exhausted", frame_key
+                )
+                if time.monotonic() - warned_at > ADMISSION_WARNING_INTERVAL:
+                    warned_at = time.monotonic()
+                    await websocket_service.send_status(
+                        websocket,
+                        "Server overloaded, audio dropped",
+                        {"max_buffered_bytes": admission.max_buffered_bytes}
+                    )
+                continue
             
-            if len(audio_buffer) >= threshold:
-                chunk = bytes(audio_buffer)
+            if len(session.audio_buffer) >= threshold:
+                # Take the buffer, keeping only the overlap for the next window
+                chunk = session.take_chunk(overlap_bytes)
                 logger.info(
-                    f"Buffer threshold reached: {len(chunk)} bytes, "
-                    f"sending for STT processing"
+                    "Buffer threshold reached: %d bytes, sending for STT processing",
+                    len(chunk),
+                    extra={"call_id": call_id}
                 )
-                audio_buffer.clear()  # Clear buffer to prevent contamination
                 
                 # Process in background
-                asyncio.create_task(
-                    process_stt(chunk, call_id, source_lang, target_lang)
-                )
+                submit_chunk(session, chunk)
     
-    except WebSocketDisconnect:
-        logger.info(f"WebSocket disconnected: call_id={call_id}, user_id={user_id}")
-        websocket_service.disconnect(call_id, user_id)
+    except WebSocketDisconnect as e:
+        logger.info(
+            f"WebSocket disconnected: call_id={call_id}, user_id={user_id}, code={e.code}"
+        )
+        websocket_service.disconnect(call_id, user_id, websocket)
+        # A clean hang-up ends the session; a dropped connection may resume
+        dropped = e.code != 1000
     
     except Exception as e:
         logger.error(f"WebSocket error: {e}", exc_info=True)
-        websocket_service.disconnect(call_id, user_id)
+        websocket_service.disconnect(call_id, user_id, websocket)
+        dropped = True
+    
+    finally:
+        # Unless a resumed connection has taken the session over
+        if session.websocket is websocket:
+            if dropped and settings.session.resume_grace_seconds > 0 and not drain.draining:
+                session_service.suspend(session)
+            else:
+                session_service.close(session)
+        if capture is not None:
+            capture.close()
+
+
+@app.post("/transcribe/{source_lang}/{target_lang}")
+async def transcribe_file(
+    source_lang: str,
+    target_lang: str,
+    file: UploadFile = File(...)
+):
+    """
+    Transcribe and translate a recorded audio file.
+    
+    The file is split at pauses and its segments are transcribed in
+    parallel; results stream back as NDJSON in spoken order.
+    
+    Args:
+        source_lang: Source language code, or "auto" to detect it
+        target_lang: Target language code
+        file: WAV file (16-bit PCM, any sample rate and channel count)
+    
+    Returns:
+        Streaming NDJSON response
+    """
+    max_bytes = settings.bulk.max_file_mb * 1024 * 1024
+    data = await file.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise HTTPException(status_code=413, detail=f"File exceeds {settings.bulk.max_file_mb} MB")
+    
+    try:
+        pcm = await asyncio.get_running_loop().run_in_executor(
+            None, audio_service.decode_wav, data
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    logger.info(
+        f"Bulk transcription of {file.filename}: {len(pcm)} bytes PCM, "
+        f"{source_lang} -> {target_lang}"
+    )
+    
+    # Bulk work uses the live tier and counts towards readiness, but not
+    # towards the quality controller, so an upload cannot push calls to a
+    # cheaper tier
+    return StreamingResponse(
+        bulk_service.run(
+            pcm,
+            source_lang,
+            target_lang,
+            quality_controller.current_tier,
+            translate_texts
+        ),
+        media_type="application/x-ndjson"
+    )
+
+
+@app.get("/calls/{call_id}/transcripts")
+async def call_transcripts(
+    call_id: str,
+    request: Request,
+    after: int = 0,
+    limit: Optional[int] = None,
+    x_admin_token: Optional[str] = Header(default=None)
+):
+    """
+    Page through a call's transcript history.
+    
+    Args:
+        call_id: Call identifier
+        after: Cursor from the previous page's next_after (0 = from the start)
+        limit: Page size (default TRANSCRIPTS__PAGE_SIZE)
+    
+    Returns:
+        Transcripts in spoken order and the next page's cursor
+    """
+    check_admin(request, x_admin_token)
+    if not transcript_store.enabled:
+        raise HTTPException(status_code=404, detail="Transcript history is disabled")
+    return await transcript_store.query(call_id, after, limit)
+
+
+@app.get("/calls/{call_id}/utterances")
+async def call_utterances(
+    call_id: str,
+    request: Request,
+    x_admin_token: Optional[str] = Header(default=None)
+):
+    """List a call's archived utterances"""
+    check_admin(request, x_admin_token)
+    if not audio_archive.enabled:
+        raise HTTPException(status_code=404, detail="Audio archive is disabled")
+    return {"call_id": call_id, "utterances": await audio_archive.list_utterances(call_id)}
+
+
+@app.get("/utterances/{utterance_id}")
+async def get_utterance(
+    utterance_id: str,
+    request: Request,
+    x_admin_token: Optional[str] = Header(default=None)
+):
+    """Archived audio of one utterance as WAV"""
+    check_admin(request, x_admin_token)
+    if not audio_archive.enabled:
+        raise HTTPException(status_code=404, detail="Audio archive is disabled")
+    found = await audio_archive.read(utterance_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired utterance")
+    _, pcm = found
+    return Response(to_wav(pcm), media_type="audio/wav")
 
 
 @app.get("/")
@@ -222,14 +930,101 @@ async def root():
     }
 
 
+def get_health() -> dict:
+    """Collect node state and service metrics"""
+    return {
+        "status": "draining" if drain.draining else "healthy",
+        "environment": settings.environment,
+        "active_rooms": len(websocket_service.get_active_rooms()),
+        "active_sessions": session_service.get_active_count(),
+        "suspended_sessions": session_service.get_suspended_count(),
+        "admission": admission.get_stats(),
+        "stt_quality": quality_controller.get_stats(),
+        "stt_pools": stt_service.get_pool_stats(),
+        "stages": stage_metrics.get_stats(),
+        "stt_cache": stt_service.result_cache.get_stats(),
+        "audio_compaction": (
+            audio_service.get_compaction_stats() if settings.vad.trim_silence else None
+        ),
+        "bulk": bulk_service.get_stats(),
+        "thread_budget": thread_budget.to_dict(),
+        "translation_workers": (
+            translation_workers.get_stats() if translation_workers is not None else None
+        ),
+        "drain": drain.get_stats(),
+        "transcripts": transcript_store.get_stats() if transcript_store.enabled else None,
+        "audio_archive": audio_archive.get_stats() if audio_archive.enabled else None,
+        "logging": get_logging_stats()
+    }
+
+
 @app.get("/health")
 async def health():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "environment": settings.environment,
-        "active_rooms": len(websocket_service.get_active_rooms())
+    return get_health()
+
+
+@app.get("/ready")
+async def ready():
+    """
+    Readiness endpoint for load-balancer routing.
+    
+    Returns 200 while the node has headroom for new calls and 503 once its
+    most loaded resource passes READINESS__MAX_LOAD.
+    """
+    report = capacity.evaluate()
+    report["models"] = {
+        "stt": list(stt_service.pools.keys()),
+        "translation": translation_service.get_cached_models(),
     }
+    # Without a loaded Whisper model the node cannot serve a call at all
+    if not stt_service.pools or drain.draining:
+        report["ready"] = False
+    
+    if drain.draining:
+        report["status"] = "draining"
+    else:
+        report["status"] = "ready" if report["ready"] else "not_ready"
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+
+def check_admin(request: Request, token: Optional[str]) -> None:
+    """
+    Authorize an admin request.
+    
+    With DRAIN__ADMIN_TOKEN set the X-Admin-Token header must match it;
+    otherwise only local requests are allowed.
+    
+    Raises:
+        HTTPException: If the request is not authorized
+    """
+    expected = settings.drain.admin_token
+    if expected:
+        if token != expected:
+            raise HTTPException(status_code=403, detail="Invalid admin token")
+    elif request.client is None or request.client.host not in ("127.0.0.1", "::1"):
+        raise HTTPException(status_code=403, detail="Admin endpoints are local-only without a token")
+
+
+@app.post("/admin/drain")
+async def start_drain(
+    request: Request,
+    x_admin_token: Optional[str] = Header(default=None)
+):
+    """Stop accepting calls, finish live ones and exit"""
+    check_admin(request, x_admin_token)
+    started = drain.begin("admin")
+    return {"started": started, **drain.get_stats()}
+
+
+@app.get("/admin/drain")
+async def drain_status(
+    request: Request,
+    x_admin_token: Optional[str] = Header(default=None)
+):
+    """Drain progress"""
+    check_admin(request, x_admin_token)
+    return drain.get_stats()
 
 
 if __name__ == "__main__":
@@ -237,5 +1032,7 @@ if __name__ == "__main__":
         app,
         host=settings.server.host,
         port=settings.server.port,
-        log_level=settings.server.log_level.lower()
+        log_level=settings.server.log_level.lower(),
+        # Keep uvicorn's loggers on the queued root handler
+        log_config=None
     )
@@ -11,6 +11,8 @@ class TranscriptionMessage(BaseModel):
     source: str = Field(description="Original transcribed text")
     translated: str = Field(description="Translated text")
     sender: str = Field(description="Language code of the sender")
+    tier: Optional[str] = Field(default=None, description="STT quality tier that produced the transcript")
+    utterance_id: Optional[str] = Field(default=None, description="Archived audio of the transcript, when archiving is enabled")
 
 
 class ErrorMessage(BaseModel):
@@ -33,6 +35,8 @@ class STTResult(BaseModel):
     source_text: str = ""
     translated_text: str = ""
     error: Optional[str] = None
+    tier: Optional[str] = None
+    language: Optional[str] = None
 
 
 class AudioChunkMetadata(BaseModel):
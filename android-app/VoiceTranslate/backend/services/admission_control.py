@@ -0,0 +1,162 @@
+"""
+Admission control for Bhasha Setu backend.
+Limits how many calls a node accepts, how fast each connection may push
+audio and how much audio the node holds in memory, so one misbehaving
+client cannot degrade every call on the node.
+"""
+import time
+from typing import Dict, Optional
+from config import settings
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# WebSocket close code for over-limit connections ("Try Again Later")
+CLOSE_TRY_AGAIN_LATER = 1013
+
+
+class TokenBucket:
+    """Byte-rate limiter; a frame beyond the budget is delayed, never lost"""
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, burst_seconds: float):
+        """
+        Args:
+            rate: Sustained bytes per second
+            burst_seconds: Seconds of audio that may arrive at once
+        """
+        self.rate = rate
+        self.capacity = rate * burst_seconds
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def consume(self, size: int) -> float:
+        """
+        Take tokens for a frame.
+
+        The balance may go negative; the caller waits off the debt before
+        reading the next frame, which pushes back on the client.
+
+        Args:
+            size: Frame size in bytes
+
+        Returns:
+            Seconds to wait before accepting more data (0 if within budget)
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= size
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+class AdmissionController:
+    """Node-wide call limits and audio memory budget"""
+
+    def __init__(self):
+        config = settings.admission
+        self.max_calls = config.max_calls
+        self.max_room_size = config.max_room_size
+        self.max_buffered_bytes = config.max_buffered_mb * 1024 * 1024
+
+        # Audio held in session buffers and in-flight STT chunks
+        self.buffered_bytes = 0
+        self.peak_buffered_bytes = 0
+
+        self.rejected: Dict[str, int] = {"max_calls": 0, "room_full": 0}
+        self.throttled_frames = 0
+        self.dropped_frames = 0
+
+    def check_call(
+        self,
+        call_id: str,
+        call_sizes: Dict[str, int],
+        rejoining: bool = False
+    ) -> Optional[str]:
+        """
+        Decide whether a new participant may join a call.
+
+        Args:
+            call_id: Call the participant wants to join
+            call_sizes: Live participants per call
+            rejoining: The participant replaces their own stale session
+
+        Returns:
+            Reason for rejection, or None to admit
+        """
+        if rejoining:
+            return None
+        size = call_sizes.get(call_id, 0)
+        if size == 0 and self.max_calls > 0 and len(call_sizes) >= self.max_calls:
+            self.rejected["max_calls"] += 1
+            return f"Node is at its limit of {self.max_calls} calls"
+        if self.max_room_size > 0 and size >= self.max_room_size:
+            self.rejected["room_full"] += 1
+            return f"Call {call_id} is full ({self.max_room_size} participants)"
+        return None
+
+    def make_bucket(self) -> Optional[TokenBucket]:
+        """Get a per-connection rate limiter, or None if unlimited"""
+        config = settings.admission
+        if config.max_bytes_per_second <= 0:
+            return None
+        return TokenBucket(config.max_bytes_per_second, config.burst_seconds)
+
+    def charge(self, size: int, force: bool = False) -> bool:
+        """
+        Account for audio entering memory.
+
+        Args:
+            size: Bytes of audio
+            force: Charge even beyond the budget (audio already in memory)
+
+        Returns:
+            False if the memory budget has no room; nothing is charged
+        """
+        if (not force and self.max_buffered_bytes > 0
+                and self.buffered_bytes + size > self.max_buffered_bytes):
+            return False
+        self.buffered_bytes += size
+        if self.buffered_bytes > self.peak_buffered_bytes:
+            self.peak_buffered_bytes = self.buffered_bytes
+        return True
+
+    def credit(self, size: int) -> None:
+        """
+        Account for audio leaving memory.
+
+        Args:
+            size: Bytes of audio released
+        """
+        self.buffered_bytes = max(0, self.buffered_bytes - size)
+
+    def get_stats(self) -> dict:
+        """Get limits and counters"""
+        return {
+            "max_calls": self.max_calls or None,
+            "max_room_size": self.max_room_size or None,
+            "buffered_bytes": self.buffered_bytes,
+            "peak_buffered_bytes": self.peak_buffered_bytes,
+            "max_buffered_bytes": self.max_buffered_bytes or None,
+            "rejected": dict(self.rejected),
+            "throttled_frames": self.throttled_frames,
+            "dropped_frames": self.dropped_frames,
+        }
+
+
+_admission: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """
+    Get the process-wide admission controller, creating it on first use.
+
+    Returns:
+        AdmissionController
+    """
+    global _admission
+    if _admission is None:
+        _admission = AdmissionController()
+    return _admission
@@ -0,0 +1,458 @@
+"""
+Per-call audio archive for Bhasha Setu backend.
+Appends every utterance of a call to one file instead of writing a temp
+WAV per chunk, keeps an offset index so any utterance can be read back by
+ID through a memory map, and enforces retention by deleting whole files.
+
+File layout:
+    magic        6 bytes   b"BSARC\\x01"
+    header_len   uint32    little endian
+    header       JSON      call_id, sample_rate, created_at
+    records      repeated  uint32 meta_len, uint32 pcm_len, meta JSON, PCM
+
+An utterance ID is "<file name>.<record offset>".
+"""
+import asyncio
+import io
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import wave
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, List, Optional, Tuple
+from config import settings
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ARCHIVE_MAGIC = b"BSARC\x01"
+ARCHIVE_EXTENSION = ".bsarc"
+
+_RECORD = struct.Struct("<II")
+_HEADER_LEN = struct.Struct("<I")
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_-]")
+_UTTERANCE_ID = re.compile(r"^([A-Za-z0-9_-]+)\.(\d+)$")
+
+
+class ArchiveFile:
+    """One archive file and the index of its utterances"""
+
+    __slots__ = (
+        "name", "path", "call_id", "created_at", "size", "written", "broken",
+        "last_write", "handle", "index",
+    )
+
+    def __init__(self, name: str, path: str, call_id: str, created_at: float, size: int):
+        self.name = name
+        self.path = path
+        self.call_id = call_id
+        self.created_at = created_at
+        self.size = size
+        # Bytes known to be on disk; records past this never landed
+        self.written = size
+        # Set after a failed write or once deleted; the file takes no
+        # more records
+        self.broken = False
+        self.last_write = created_at
+        # Open for appending while it is its call's current file
+        self.handle: Optional[BinaryIO] = None
+        # (record offset, PCM bytes, meta); None until read from disk
+        self.index: Optional[List[Tuple[int, int, dict]]] = []
+
+
+def to_wav(pcm: bytes) -> bytes:
+    """
+    Wrap PCM in a WAV container with the configured format.
+
+    Args:
+        pcm: Raw PCM audio data
+
+    Returns:
+        WAV file contents
+    """
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wf:
+        wf.setnchannels(settings.audio.channels)
+        wf.setsampwidth(settings.audio.sample_width)
+        wf.setframerate(settings.audio.sample_rate)
+        wf.writeframes(pcm)
+    return buffer.getvalue()
+
+
+class AudioArchive:
+    """
+    Append-only audio archive with one file per call.
+
+    append() assigns the utterance its offset and hands the write to a
+    single I/O thread, so the event loop never touches the disk. Reads go
+    through the same thread and therefore see every earlier append. A call
+    moves to a new file once its current one reaches ARCHIVE__MAX_FILE_MB;
+    files older than ARCHIVE__RETENTION_HOURS, or the oldest ones beyond
+    ARCHIVE__MAX_TOTAL_MB, are deleted whole.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Args:
+            directory: Archive directory (None = ARCHIVE__DIR)
+        """
+        config = settings.archive
+        self.directory = directory or config.dir
+        self.max_file_bytes = config.max_file_mb * 1024 * 1024
+        self.max_pending_bytes = config.max_pending_mb * 1024 * 1024
+
+        # name -> file, oldest first
+        self.files: "OrderedDict[str, ArchiveFile]" = OrderedDict()
+        # call_id -> file being appended to
+        self.current: Dict[str, ArchiveFile] = {}
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="archive")
+        self._task: Optional[asyncio.Task] = None
+        # Guards pending_bytes, which the I/O thread decrements
+        self._lock = threading.Lock()
+
+        self.pending_bytes = 0
+        self.utterances = 0
+        self.dropped = 0
+        self.errors = 0
+        self.rotated = 0
+        self.deleted = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    async def start(self) -> None:
+        """Index existing archive files and start the retention task"""
+        loop = asyncio.get_running_loop()
+        for archive in await loop.run_in_executor(self._io, self._scan):
+            self.files[archive.name] = archive
+        self._task = asyncio.create_task(self.run())
+        logger.info(f"Audio archive at {self.directory} ({len(self.files)} file(s))")
+
+    async def stop(self) -> None:
+        """Stop the retention task and close open files"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for archive in self.current.values():
+            self._io.submit(self._close, archive)
+        self.current.clear()
+        await asyncio.get_running_loop().run_in_executor(None, self._io.shutdown, True)
+
+    def _scan(self) -> List[ArchiveFile]:
+        """Find archive files left by earlier runs (I/O thread)"""
+        os.makedirs(self.directory, exist_ok=True)
+        found = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(ARCHIVE_EXTENSION):
+                continue
+            try:
+                with open(entry.path, "rb") as f:
+                    if f.read(len(ARCHIVE_MAGIC)) != ARCHIVE_MAGIC:
+                        continue
+                    (header_len,) = _HEADER_LEN.unpack(f.read(_HEADER_LEN.size))
+                    header = json.loads(f.read(header_len))
+                archive = ArchiveFile(
+                    entry.name[:-len(ARCHIVE_EXTENSION)],
+                    entry.path,
+                    header["call_id"],
+                    header["created_at"],
+                    entry.stat().st_size
+                )
+            except (OSError, ValueError, struct.error, KeyError, TypeError) as e:
+                logger.warning(f"Skipping unreadable archive {entry.path}: {e}")
+                continue
+            archive.index = None
+            found.append(archive)
+        found.sort(key=lambda archive: archive.created_at)
+        return found
+
+    def _create(self, call_id: str) -> ArchiveFile:
+        """Start a new file for a call (event loop; the write is queued)"""
+        created_at = time.time()
+        name = f"{_UNSAFE_CHARS.sub('_', call_id)}_{int(created_at * 1000)}"
+        while name in self.files:
+            name += "_"
+        header = json.dumps({
+            "call_id": call_id,
+            "sample_rate": settings.audio.sample_rate,
+            "created_at": created_at,
+        }).encode("utf-8")
+        preamble = ARCHIVE_MAGIC + _HEADER_LEN.pack(len(header)) + header
+
+        archive = ArchiveFile(
+            name,
+            os.path.join(self.directory, name + ARCHIVE_EXTENSION),
+            call_id,
+            created_at,
+            len(preamble)
+        )
+        self.files[name] = archive
+        self.current[call_id] = archive
+        self._io.submit(self._open, archive, preamble)
+        return archive
+
+    def _open(self, archive: ArchiveFile, preamble: bytes) -> None:
+        """Create a file and write its header (I/O thread)"""
+        try:
+            archive.handle = open(archive.path, "wb")
+            archive.handle.write(preamble)
+        except OSError as e:
+            self.errors += 1
+            logger.error(f"Failed to create archive {archive.path}: {e}")
+            archive.written = 0
+            self._break(archive)
+
+    def _append(self, archive: ArchiveFile, offset: int, record: bytes) -> None:
+        """Write one record at the offset append() assigned it (I/O thread)"""
+        try:
+            if archive.broken:
+                return
+            handle = archive.handle
+            if handle is None:
+                raise OSError("file is not open")
+            if handle.tell() != offset:
+                raise OSError(f"expected offset {offset}, file is at {handle.tell()}")
+            written = handle.write(record)
+            if written != len(record):
+                raise OSError(f"short write ({written} of {len(record)} bytes)")
+            archive.written = offset + len(record)
+        except OSError as e:
+            self.errors += 1
+            logger.error(f"Failed to append to archive {archive.path}: {e}")
+            self._break(archive)
+        finally:
+            with self._lock:
+                self.pending_bytes -= len(record)
+
+    def _break(self, archive: ArchiveFile) -> None:
+        """
+        Stop writing to a file after a failed write (I/O thread).
+
+        The file is cut back to its last complete record, so it stays
+        readable, and append() moves the call to a new file.
+        """
+        try:
+            self._close(archive)
+        except OSError:
+            archive.handle = None
+        if archive.written:
+            try:
+                os.truncate(archive.path, archive.written)
+            except OSError as e:
+                logger.warning(f"Failed to truncate archive {archive.path}: {e}")
+        archive.broken = True
+
+    def _close(self, archive: ArchiveFile) -> None:
+        """Close a file's handle (I/O thread)"""
+        if archive.handle is not None:
+            archive.handle.close()
+            archive.handle = None
+
+    def _delete(self, archive: ArchiveFile) -> None:
+        """Close and remove a file (I/O thread)"""
+        self._close(archive)
+        try:
+            os.remove(archive.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.errors += 1
+            logger.error(f"Failed to delete archive {archive.path}: {e}")
+
+    def append(
+        self,
+        call_id: str,
+        user_id: str,
+        source_lang: str,
+        seq: int,
+        pcm: bytes
+    ) -> Optional[str]:
+        """
+        Archive one utterance. Never blocks.
+
+        Args:
+            call_id: Call identifier
+            user_id: Participant who spoke
+            source_lang: Language of the session
+            seq: Submission index of the chunk within the session
+            pcm: Audio sent to STT
+
+        Returns:
+            Utterance ID, or None if writes are too far behind to queue more
+        """
+        if self._task is None:
+            return None
+        meta = {"user_id": user_id, "source_lang": source_lang, "seq": seq, "at": time.time()}
+        meta_bytes = json.dumps(meta).encode("utf-8")
+        record = _RECORD.pack(len(meta_bytes), len(pcm)) + meta_bytes + pcm
+
+        with self._lock:
+            if self.pending_bytes + len(record) > self.max_pending_bytes:
+                self.dropped += 1
+                return None
+            self.pending_bytes += len(record)
+
+        archive = self.current.get(call_id)
+        if archive is None:
+            archive = self._create(call_id)
+        elif archive.broken or archive.size + len(record) > self.max_file_bytes:
+            if archive.broken:
+                # Records queued behind the failed write never landed
+                archive.size = archive.written
+            self._io.submit(self._close, archive)
+            archive = self._create(call_id)
+            self.rotated += 1
+
+        offset = archive.size
+        archive.size += len(record)
+        archive.last_write = time.time()
+        archive.index.append((offset, len(pcm), meta))
+        self._io.submit(self._append, archive, offset, record)
+        self.utterances += 1
+        return f"{archive.name}.{offset}"
+
+    def _read_record(self, archive: ArchiveFile, offset: int) -> Tuple[dict, bytes]:
+        """Read a record through a memory map (I/O thread)"""
+        if archive.handle is not None:
+            archive.handle.flush()
+        with open(archive.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            meta_len, pcm_len = _RECORD.unpack_from(m, offset)
+            start = offset + _RECORD.size
+            if start + meta_len + pcm_len > len(m):
+                raise ValueError(f"Truncated record at offset {offset}")
+            meta = json.loads(m[start:start + meta_len])
+            return meta, m[start + meta_len:start + meta_len + pcm_len]
+
+    def _load_index(self, archive: ArchiveFile) -> List[Tuple[int, int, dict]]:
+        """Rebuild a file's index by walking its records (I/O thread)"""
+        index = []
+        with open(archive.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            (header_len,) = _HEADER_LEN.unpack_from(m, len(ARCHIVE_MAGIC))
+            offset = len(ARCHIVE_MAGIC) + _HEADER_LEN.size + header_len
+            while offset + _RECORD.size <= len(m):
+                meta_len, pcm_len = _RECORD.unpack_from(m, offset)
+                start = offset + _RECORD.size
+                if start + meta_len + pcm_len > len(m):
+                    break
+                index.append((offset, pcm_len, json.loads(m[start:start + meta_len])))
+                offset = start + meta_len + pcm_len
+        return index
+
+    async def read(self, utterance_id: str) -> Optional[Tuple[dict, bytes]]:
+        """
+        Read an utterance back.
+
+        Args:
+            utterance_id: ID returned by append()
+
+        Returns:
+            (meta, PCM), or None if the ID is unknown or its file was
+            deleted by retention
+        """
+        match = _UTTERANCE_ID.match(utterance_id)
+        archive = self.files.get(match.group(1)) if match else None
+        if archive is None:
+            return None
+        offset = int(match.group(2))
+        loop = asyncio.get_running_loop()
+        try:
+            record = await loop.run_in_executor(self._io, self._read_record, archive, offset)
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning(f"Failed to read utterance {utterance_id}: {e}")
+            return None
+        # Checked after the read, which waits for every earlier write
+        if archive.broken and offset >= archive.written:
+            return None
+        return record
+
+    async def list_utterances(self, call_id: str) -> List[dict]:
+        """
+        List a call's archived utterances in the order they were received.
+
+        Args:
+            call_id: Call identifier
+
+        Returns:
+            Utterance IDs with their speaker, language, sequence number,
+            time and duration
+        """
+        loop = asyncio.get_running_loop()
+        bytes_per_second = (
+            settings.audio.sample_rate * settings.audio.sample_width * settings.audio.channels
+        )
+        utterances = []
+        for archive in [a for a in self.files.values() if a.call_id == call_id]:
+            if archive.index is None:
+                try:
+                    archive.index = await loop.run_in_executor(self._io, self._load_index, archive)
+                except (OSError, ValueError, struct.error) as e:
+                    logger.warning(f"Failed to index archive {archive.path}: {e}")
+                    continue
+            for offset, pcm_len, meta in archive.index:
+                if archive.broken and offset >= archive.written:
+                    continue
+                utterances.append({
+                    "utterance_id": f"{archive.name}.{offset}",
+                    **meta,
+                    "seconds": round(pcm_len / bytes_per_second, 2),
+                })
+        return utterances
+
+    def enforce_retention(self) -> None:
+        """Close idle files and delete files past the age or size limit"""
+        config = settings.archive
+        now = time.time()
+
+        for call_id, archive in list(self.current.items()):
+            if now - archive.last_write > config.idle_close_seconds:
+                del self.current[call_id]
+                self._io.submit(self._close, archive)
+
+        max_age = config.retention_hours * 3600
+        max_total = config.max_total_mb * 1024 * 1024
+        total = sum(archive.size for archive in self.files.values())
+        for archive in list(self.files.values()):
+            if now - archive.created_at <= max_age and total <= max_total:
+                break
+            del self.files[archive.name]
+            if self.current.get(archive.call_id) is archive:
+                del self.current[archive.call_id]
+            total -= archive.size
+            self.deleted += 1
+            # Appends still queued for the file are skipped quietly
+            archive.broken = True
+            self._io.submit(self._delete, archive)
+            logger.debug("Archive %s expired (%d bytes)", archive.name, archive.size)
+
+    async def run(self) -> None:
+        """Apply retention periodically"""
+        while True:
+            await asyncio.sleep(settings.archive.sweep_interval_seconds)
+            try:
+                self.enforce_retention()
+            except Exception as e:
+                logger.error(f"Archive retention failed: {e}")
+
+    def get_stats(self) -> dict:
+        """Get archive size and counters"""
+        return {
+            "files": len(self.files),
+            "open_files": len(self.current),
+            "bytes": sum(archive.size for archive in self.files.values()),
+            "pending_bytes": self.pending_bytes,
+            "utterances": self.utterances,
+            "dropped": self.dropped,
+            "rotated": self.rotated,
+            "deleted": self.deleted,
+            "errors": self.errors,
+        }
@@ -5,13 +5,58 @@ Handles audio file operations, VAD, and audio analysis.
 import os
 import wave
 import uuid
+from bisect import bisect_right
 import numpy as np
-from typing import Tuple, Optional
+from collections import deque
+from typing import List, Tuple, Optional, Union
 from config import settings
 from utils.logger import get_logger
+from utils.wav import decode_wav
 
 logger = get_logger(__name__)
 
+# Number of recent chunks the adaptive VAD baseline is computed from
+VAD_HISTORY_SIZE = 20
+
+
+class VADStats:
+    """Rolling audio statistics for dynamic VAD, kept per speaker"""
+    __slots__ = ("recent_energies", "recent_peaks", "baseline_energy", "baseline_peak")
+    
+    def __init__(self):
+        self.recent_energies = deque(maxlen=VAD_HISTORY_SIZE)
+        self.recent_peaks = deque(maxlen=VAD_HISTORY_SIZE)
+        self.baseline_energy = 0.005
+        self.baseline_peak = 0.01
+
+
+class OffsetMap:
+    """
+    Maps times in compacted audio back to the original chunk.
+    
+    Each span is a stretch of original audio kept verbatim, stored as
+    (compacted start, original start) in seconds.
+    """
+    __slots__ = ("compact_starts", "original_starts")
+    
+    def __init__(self, spans: Optional[List[Tuple[float, float]]] = None):
+        spans = spans or [(0.0, 0.0)]
+        self.compact_starts = [c for c, _ in spans]
+        self.original_starts = [o for _, o in spans]
+    
+    def to_original(self, t: float) -> float:
+        """
+        Convert a time in the compacted audio to the original chunk.
+        
+        Args:
+            t: Seconds into the compacted audio
+        
+        Returns:
+            Seconds into the original chunk
+        """
+        i = max(0, bisect_right(self.compact_starts, t) - 1)
+        return self.original_starts[i] + (t - self.compact_starts[i])
+
 
 class AudioService:
     """Service for audio processing operations"""
@@ -20,14 +65,218 @@ class AudioService:
         self.temp_dir = settings.server.temp_dir
         os.makedirs(self.temp_dir, exist_ok=True)
         
-        # Audio statistics for dynamic VAD
-        self.audio_stats = {
-            'recent_energies': [],
-            'recent_peaks': [],
-            'baseline_energy': 0.005,
-            'baseline_peak': 0.01
+        # Fallback VAD statistics for callers without a session
+        self.audio_stats = VADStats()
+        
+        # Silence trimming totals, in seconds of audio
+        self.compaction_input_seconds = 0.0
+        self.compaction_output_seconds = 0.0
+    
+    def compact_speech(self, audio_data: bytes) -> Tuple[bytes, OffsetMap]:
+        """
+        Trim leading/trailing silence and shorten long pauses.
+        
+        Frames are voiced when their RMS energy exceeds both the VAD base
+        threshold and twice the chunk's noise floor. Voiced regions are
+        padded so soft onsets survive; pauses longer than pause_max_ms are
+        cut to pause_keep_ms so Whisper still sees a boundary.
+        
+        Args:
+            audio_data: Raw 16-bit mono PCM
+        
+        Returns:
+            Tuple of (compacted PCM, map from compacted to original time);
+            the PCM is empty if no frame is voiced
+        """
+        config = settings.vad
+        sample_rate = settings.audio.sample_rate
+        samples = np.frombuffer(audio_data, dtype=np.int16)
+        frame_len = max(1, sample_rate * config.trim_frame_ms // 1000)
+        n_frames = len(samples) // frame_len
+        self.compaction_input_seconds += len(samples) / sample_rate
+        
+        if n_frames == 0:
+            self.compaction_output_seconds += len(samples) / sample_rate
+            return audio_data, OffsetMap()
+        
+        runs = self.find_speech_runs(samples, frame_len)
+        if not runs:
+            return b"", OffsetMap()
+        starts = [start for start, _ in runs]
+        ends = [end for _, end in runs]
+        
+        # Kept sample ranges: voiced runs, plus the head of each long pause
+        max_gap = config.pause_max_ms // config.trim_frame_ms
+        keep_gap = config.pause_keep_ms // config.trim_frame_ms
+        ranges: List[Tuple[int, int]] = []
+        for i, (start, end) in enumerate(zip(starts, ends)):
+            if i > 0:
+                gap = start - ends[i - 1]
+                if gap > max_gap:
+                    gap_start = ends[i - 1]
+                    ranges.append((gap_start, gap_start + keep_gap))
+                else:
+                    ranges.append((ends[i - 1], start))
+            ranges.append((start, end))
+        
+        pieces = []
+        spans: List[Tuple[float, float]] = []
+        position = 0
+        for start, end in ranges:
+            first = start * frame_len
+            # A run reaching the last whole frame keeps the remainder too
+            last = len(samples) if end >= n_frames else end * frame_len
+            if last <= first:
+                continue
+            if spans and first == spans[-1][2]:
+                # Contiguous with the previous range: extend it
+                spans[-1] = (spans[-1][0], spans[-1][1], last)
+            else:
+                spans.append((position, first, last))
+            pieces.append(samples[first:last])
+            position += last - first
+        
+        compacted = np.concatenate(pieces).tobytes()
+        self.compaction_output_seconds += position / sample_rate
+        offset_map = OffsetMap([
+            (compact / sample_rate, first / sample_rate)
+            for compact, first, _ in spans
+        ])
+        return compacted, offset_map
+    
+    def find_speech_runs(self, samples: np.ndarray, frame_len: int) -> List[Tuple[int, int]]:
+        """
+        Find padded voiced runs by frame-level energy.
+        
+        Frames are voiced when their RMS energy exceeds both the VAD base
+        threshold and twice the noise floor of the audio.
+        
+        Args:
+            samples: 16-bit PCM samples
+            frame_len: Frame length in samples
+        
+        Returns:
+            Voiced runs as [start, end) frame index ranges
+        """
+        config = settings.vad
+        n_frames = len(samples) // frame_len
+        if n_frames == 0:
+            return []
+        
+        frames = samples[:n_frames * frame_len].reshape(n_frames, frame_len).astype(np.float32) / 32768.0
+        rms = np.sqrt(np.mean(frames ** 2, axis=1))
+        threshold = max(config.base_threshold, float(np.percentile(rms, 10)) * 2)
+        voiced = rms > threshold
+        
+        if not voiced.any():
+            return []
+        
+        # Pad voiced regions on both sides
+        pad = config.trim_padding_ms // config.trim_frame_ms
+        if pad > 0:
+            voiced = np.convolve(voiced, np.ones(2 * pad + 1), mode="same") > 0
+        
+        edges = np.diff(np.concatenate(([0], voiced.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1).tolist()
+        ends = np.flatnonzero(edges == -1).tolist()
+        return list(zip(starts, ends))
+    
+    def split_at_pauses(
+        self,
+        audio_data: bytes,
+        max_segment_seconds: float,
+        min_pause_ms: int
+    ) -> List[Tuple[float, bytes]]:
+        """
+        Split long audio into speech segments at pauses.
+        
+        Voiced runs separated by less than min_pause_ms stay together;
+        segments are cut at pauses so none exceeds max_segment_seconds
+        (unbroken speech longer than that is cut hard). Silence between
+        segments is dropped.
+        
+        Args:
+            audio_data: Raw 16-bit mono PCM
+            max_segment_seconds: Longest segment to produce
+            min_pause_ms: Shortest pause a segment may be cut at
+        
+        Returns:
+            List of (start time in seconds, segment PCM)
+        """
+        sample_rate = settings.audio.sample_rate
+        samples = np.frombuffer(audio_data, dtype=np.int16)
+        frame_len = max(1, sample_rate * settings.vad.trim_frame_ms // 1000)
+        frame_seconds = frame_len / sample_rate
+        max_frames = max(1, int(max_segment_seconds / frame_seconds))
+        min_gap = max(1, min_pause_ms // settings.vad.trim_frame_ms)
+        
+        # Merge runs across short pauses
+        regions: List[List[int]] = []
+        for start, end in self.find_speech_runs(samples, frame_len):
+            if regions and start - regions[-1][1] < min_gap:
+                regions[-1][1] = end
+            else:
+                regions.append([start, end])
+        
+        # Pack neighbouring regions into segments up to the length limit,
+        # cutting over-long regions hard
+        segments: List[Tuple[int, int]] = []
+        for start, end in regions:
+            while end - start > max_frames:
+                segments.append((start, start + max_frames))
+                start += max_frames
+            if segments and end - segments[-1][0] <= max_frames:
+                segments[-1] = (segments[-1][0], end)
+            else:
+                segments.append((start, end))
+        
+        n_frames = len(samples) // frame_len
+        result = []
+        for start, end in segments:
+            last = len(samples) if end >= n_frames else end * frame_len
+            result.append((start * frame_seconds, samples[start * frame_len:last].tobytes()))
+        return result
+    
+    def decode_wav(self, data: bytes) -> bytes:
+        """
+        Decode an uploaded WAV file to PCM in the configured format.
+        
+        Args:
+            data: WAV file contents
+        
+        Returns:
+            Raw PCM bytes
+        
+        Raises:
+            ValueError: If the data is not 16-bit PCM WAV
+        """
+        return decode_wav(data, settings.audio.sample_rate)
+    
+    def get_compaction_stats(self) -> dict:
+        """Get silence trimming totals"""
+        seconds_in = self.compaction_input_seconds
+        seconds_out = self.compaction_output_seconds
+        return {
+            "input_seconds": round(seconds_in, 1),
+            "output_seconds": round(seconds_out, 1),
+            "ratio": round(seconds_out / seconds_in, 3) if seconds_in else None,
         }
     
+    def pcm_to_samples(self, audio_data: bytes) -> np.ndarray:
+        """
+        Convert 16-bit PCM to float32 samples in [-1, 1].
+        
+        Whisper and the VAD check take these directly, so a chunk can be
+        processed without a WAV file.
+        
+        Args:
+            audio_data: Raw PCM audio data
+        
+        Returns:
+            Float32 samples
+        """
+        return np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
+    
     def save_audio_chunk(
         self,
         audio_data: bytes,
@@ -49,8 +298,7 @@ class AudioService:
         min_size = settings.audio.min_chunk_size_bytes
         if len(audio_data) < min_size:
             logger.debug(
-                f"Skipping chunk: too small ({len(audio_data)} bytes, "
-                f"minimum: {min_size})"
+                "Skipping chunk: too small (%d bytes, minimum: %d)", len(audio_data), min_size
             )
             return None
         
@@ -66,114 +314,127 @@ class AudioService:
                 wf.setframerate(settings.audio.sample_rate)
                 wf.writeframes(audio_data)
             
-            logger.debug(f"Saved audio to {filepath} ({len(audio_data)} bytes)")
+            logger.debug("Saved audio to %s (%d bytes)", filepath, len(audio_data))
             return filepath
         
         except Exception as e:
             logger.error(f"Failed to save audio chunk: {e}")
             return None
     
-    def update_audio_stats(self, energy: float, peak: float) -> None:
+    def update_audio_stats(
+        self,
+        energy: float,
+        peak: float,
+        stats: Optional[VADStats] = None
+    ) -> None:
         """
         Update rolling statistics for dynamic VAD threshold adjustment.
         
         Args:
             energy: RMS energy of audio
             peak: Peak amplitude of audio
+            stats: Speaker's VAD statistics (shared fallback if None)
         """
-        self.audio_stats['recent_energies'].append(energy)
-        self.audio_stats['recent_peaks'].append(peak)
+        if stats is None:
+            stats = self.audio_stats
         
-        # Keep only last 20 samples
-        if len(self.audio_stats['recent_energies']) > 20:
-            self.audio_stats['recent_energies'].pop(0)
-            self.audio_stats['recent_peaks'].pop(0)
+        # Bounded deques keep only the last VAD_HISTORY_SIZE samples
+        stats.recent_energies.append(energy)
+        stats.recent_peaks.append(peak)
         
         # Update baseline (median of recent values)
-        if len(self.audio_stats['recent_energies']) >= 5:
-            self.audio_stats['baseline_energy'] = np.median(
-                self.audio_stats['recent_energies']
-            )
-            self.audio_stats['baseline_peak'] = np.median(
-                self.audio_stats['recent_peaks']
-            )
+        if len(stats.recent_energies) >= 5:
+            stats.baseline_energy = float(np.median(stats.recent_energies))
+            stats.baseline_peak = float(np.median(stats.recent_peaks))
     
-    def is_audio_silent(self, file_path: str) -> bool:
+    def is_audio_silent(
+        self,
+        audio: Union[str, np.ndarray],
+        stats: Optional[VADStats] = None
+    ) -> bool:
         """
         Dynamic VAD with adaptive thresholds and peak checks for soft speech detection.
         
         Args:
-            file_path: Path to audio file
+            audio: Path to a WAV file, or float32 samples at the configured rate
+            stats: Speaker's VAD statistics (shared fallback if None)
         
         Returns:
             True if audio is silent, False if speech detected
         """
+        if stats is None:
+            stats = self.audio_stats
+        
         try:
-            with wave.open(file_path, 'rb') as wf:
-                frames = wf.readframes(wf.getnframes())
-                sample_rate = wf.getframerate()
-                audio = np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
-                
-                # Check minimum duration
-                duration = len(audio) / sample_rate
-                min_duration = settings.vad.min_duration_seconds
-                
-                if duration < min_duration:
-                    logger.debug(f"Skipping audio: too short ({duration:.2f}s)")
-                    return True
-                
-                if len(audio) == 0:
-                    return True
-                
-                # Calculate RMS energy
-                energy = np.sqrt(np.mean(audio**2))
-                
-                # Calculate peak amplitude
-                peak = np.max(np.abs(audio))
-                
-                # Update statistics for adaptive thresholds
-                self.update_audio_stats(energy, peak)
-                
-                # Dynamic threshold adjustment
-                base_threshold = settings.vad.base_threshold
-                adaptive_energy_threshold = min(
-                    base_threshold,
-                    self.audio_stats['baseline_energy'] * 0.5
-                )
-                adaptive_peak_threshold = min(
-                    base_threshold * 2,
-                    self.audio_stats['baseline_peak'] * 0.5
-                )
-                
-                # Soft speech detection: pass if EITHER energy OR peak exceeds threshold
-                has_energy = energy > adaptive_energy_threshold
-                has_peak = peak > adaptive_peak_threshold
-                
-                is_silent = not (has_energy or has_peak)
-                
-                # Log analysis
-                logger.debug(
-                    f"Audio analysis: duration={duration:.2f}s, "
-                    f"energy={energy:.4f}, peak={peak:.4f}"
-                )
-                logger.debug(
-                    f"Thresholds: energy={adaptive_energy_threshold:.4f}, "
-                    f"peak={adaptive_peak_threshold:.4f}"
-                )
-                logger.debug(
-                    f"Baseline: energy={self.audio_stats['baseline_energy']:.4f}, "
-                    f"peak={self.audio_stats['baseline_peak']:.4f}"
+            if isinstance(audio, np.ndarray):
+                samples = audio
+                sample_rate = settings.audio.sample_rate
+            else:
+                with wave.open(audio, 'rb') as wf:
+                    frames = wf.readframes(wf.getnframes())
+                    sample_rate = wf.getframerate()
+                samples = np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+            
+            # Check minimum duration
+            duration = len(samples) / sample_rate
+            min_duration = settings.vad.min_duration_seconds
+            
+            if duration < min_duration:
+                logger.debug("Skipping audio: too short (%.2fs)", duration)
+                return True
+            
+            if len(samples) == 0:
+                return True
+            
+            # Calculate RMS energy
+            energy = np.sqrt(np.mean(samples**2))
+            
+            # Calculate peak amplitude
+            peak = np.max(np.abs(samples))
+            
+            # Update statistics for adaptive thresholds
+            self.update_audio_stats(energy, peak, stats)
+            
+            # Dynamic threshold adjustment
+            base_threshold = settings.vad.base_threshold
+            adaptive_energy_threshold = min(
+                base_threshold,
+                stats.baseline_energy * 0.5
+            )
+            adaptive_peak_threshold = min(
+                base_threshold * 2,
+                stats.baseline_peak * 0.5
+            )
+            
+            # Soft speech detection: pass if EITHER energy OR peak exceeds threshold
+            has_energy = energy > adaptive_energy_threshold
+            has_peak = peak > adaptive_peak_threshold
+            
+            is_silent = not (has_energy or has_peak)
+            
+            # Log analysis
+            logger.debug(
+                "Audio analysis: duration=%.2fs, energy=%.4f, peak=%.4f",
+                duration, energy, peak
+            )
+            logger.debug(
+                "Thresholds: energy=%.4f, peak=%.4f",
+                adaptive_energy_threshold, adaptive_peak_threshold
+            )
+            logger.debug(
+                "Baseline: energy=%.4f, peak=%.4f",
+                stats.baseline_energy, stats.baseline_peak
+            )
+            
+            if is_silent:
+                logger.debug("Audio rejected as silent")
+            else:
+                logger.info(
+                    "Audio passed VAD check (energy=%s, peak=%s)", has_energy, has_peak
                 )
-                
-                if is_silent:
-                    logger.debug("Audio rejected as silent")
-                else:
-                    logger.info(
-                        f"Audio passed VAD check (energy={has_energy}, peak={has_peak})"
-                    )
-                
-                return is_silent
-        
+            
+            return is_silent
+    
         except Exception as e:
             logger.error(f"VAD Error: {e}")
             return True
@@ -0,0 +1,235 @@
+"""
+Bulk file transcription for Bhasha Setu backend.
+Splits a recording at pauses, transcribes the segments in parallel on the
+STT replicas, translates them in batches and yields NDJSON lines in order.
+"""
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+from config import settings
+from services.audio_service import AudioService
+from services.language_detector import AUTO_LANGUAGE
+from services.quality_controller import QualityTier
+from services.stt_service import STTService, TranscriptionCancelled
+from utils.file_utils import safe_delete
+from utils.logger import get_logger
+from utils.stage_metrics import StageMetrics
+
+logger = get_logger(__name__)
+
+# Translates texts of one pair: (texts, source_lang, target_lang) -> translations
+TranslatePair = Callable[[List[str], str, str], Awaitable[List[str]]]
+
+
+class BulkTranscriptionService:
+    """Offline transcription and translation of whole audio files"""
+
+    def __init__(
+        self,
+        audio_service: AudioService,
+        stt_service: STTService,
+        stage_metrics: StageMetrics
+    ):
+        self.audio_service = audio_service
+        self.stt_service = stt_service
+        # Bulk segments share the "stt" stage with live chunks, so /ready
+        # sees the load an upload puts on the replicas
+        self.stage_metrics = stage_metrics
+        self.jobs_active = 0
+        self.jobs_completed = 0
+        self.audio_seconds = 0.0
+        self.elapsed_seconds = 0.0
+
+    def transcribe_segment(
+        self,
+        file_path: str,
+        source_lang: Optional[str],
+        tier: QualityTier,
+        is_cancelled: Callable[[], bool]
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Transcribe one segment on an STT worker thread.
+
+        Args:
+            file_path: Segment WAV file
+            source_lang: Source language code (None = detect per segment)
+            tier: Quality tier to decode with
+            is_cancelled: Polled between Whisper segments
+
+        Returns:
+            Tuple of (text, language); text is empty if filtered
+        """
+        detected: List[Any] = []
+        text = self.stt_service.transcribe(
+            file_path,
+            source_lang,
+            is_cancelled=is_cancelled,
+            tier=tier,
+            on_info=detected.append if source_lang is None else None
+        )
+        language = source_lang or (detected[0].language if detected else None)
+        if self.stt_service.is_hallucination(text, language):
+            return "", language
+        return text, language
+
+    async def run(
+        self,
+        pcm: bytes,
+        source_lang: str,
+        target_lang: str,
+        tier: QualityTier,
+        translate: TranslatePair
+    ) -> AsyncIterator[str]:
+        """
+        Process a recording and yield NDJSON lines.
+
+        One "segment" line is yielded per transcribed segment, in spoken
+        order, as soon as it and every earlier segment are done; a final
+        "summary" line follows. Closing the iterator (e.g. on client
+        disconnect) stops outstanding work and removes temp files.
+
+        Args:
+            pcm: 16 kHz mono 16-bit PCM of the whole recording
+            source_lang: Source language code, or "auto" to detect it
+            target_lang: Target language code
+            tier: Quality tier to decode with
+            translate: Translates a batch of texts of one language pair
+
+        Yields:
+            NDJSON lines
+        """
+        config = settings.bulk
+        job_id = f"bulk-{uuid.uuid4().hex[:8]}"
+        language = None if source_lang == AUTO_LANGUAGE else source_lang
+        sample_rate = settings.audio.sample_rate
+        audio_seconds = len(pcm) / (sample_rate * settings.audio.sample_width)
+        started = time.perf_counter()
+
+        loop = asyncio.get_running_loop()
+        segments = await loop.run_in_executor(
+            None,
+            self.audio_service.split_at_pauses,
+            pcm,
+            min(config.max_segment_seconds, 30.0),
+            config.min_pause_ms
+        )
+        logger.info(
+            f"[{job_id}] {audio_seconds:.1f}s of audio split into {len(segments)} segment(s)"
+        )
+
+        cancelled = False
+        # Leave at least one replica to live calls by default
+        parallel = config.max_parallel or max(1, self.stt_service.replicas - 1)
+        semaphore = asyncio.Semaphore(parallel)
+
+        async def transcribe(data: bytes) -> Tuple[str, Optional[str]]:
+            async with semaphore:
+                file_path = self.audio_service.save_audio_chunk(data, job_id, source_lang)
+                if file_path is None:
+                    return "", language
+                try:
+                    with self.stage_metrics.measure("stt"):
+                        return await loop.run_in_executor(
+                            self.stt_service.executor,
+                            self.transcribe_segment,
+                            file_path,
+                            language,
+                            tier,
+                            lambda: cancelled
+                        )
+                except TranscriptionCancelled:
+                    raise
+                except Exception as e:
+                    # One bad segment must not abort the whole file
+                    logger.error(f"[{job_id}] Segment transcription failed: {e}")
+                    return "", language
+                finally:
+                    await safe_delete(file_path, delay=0)
+
+        tasks = [asyncio.ensure_future(transcribe(data)) for _, data in segments]
+        self.jobs_active += 1
+        emitted = 0
+        try:
+            index = 0
+            while index < len(tasks):
+                # Wait for the next segment in order, then take every
+                # contiguous segment already done with it as one batch
+                await tasks[index]
+                end = index + 1
+                while (end < len(tasks) and end - index < config.translation_batch
+                       and tasks[end].done()):
+                    end += 1
+
+                batch = []
+                for i in range(index, end):
+                    text, segment_lang = tasks[i].result()
+                    if text:
+                        batch.append((i, text, segment_lang))
+
+                # One translate call per run of same-language segments
+                translations: List[str] = []
+                start = 0
+                while start < len(batch):
+                    segment_lang = batch[start][2]
+                    stop = start
+                    while stop < len(batch) and batch[stop][2] == segment_lang:
+                        stop += 1
+                    texts = [text for _, text, _ in batch[start:stop]]
+                    if segment_lang is None:
+                        translations += texts
+                    else:
+                        translations += await translate(texts, segment_lang, target_lang)
+                    start = stop
+
+                for (i, text, segment_lang), translated in zip(batch, translations):
+                    offset, data = segments[i]
+                    yield json.dumps({
+                        "type": "segment",
+                        "index": emitted,
+                        "start": round(offset, 2),
+                        "end": round(offset + len(data) / (sample_rate * settings.audio.sample_width), 2),
+                        "source": text,
+                        "translated": translated,
+                        "language": segment_lang,
+                        "tier": tier.name,
+                    }, ensure_ascii=False) + "\n"
+                    emitted += 1
+                index = end
+
+            elapsed = time.perf_counter() - started
+            self.jobs_completed += 1
+            self.audio_seconds += audio_seconds
+            self.elapsed_seconds += elapsed
+            logger.info(
+                f"[{job_id}] Done: {emitted} segment(s), {audio_seconds:.1f}s of audio "
+                f"in {elapsed:.1f}s"
+            )
+            yield json.dumps({
+                "type": "summary",
+                "segments": emitted,
+                "audio_seconds": round(audio_seconds, 2),
+                "elapsed_seconds": round(elapsed, 2),
+                "speedup": round(audio_seconds / elapsed, 2) if elapsed > 0 else None,
+            }) + "\n"
+
+        finally:
+            # Stop decoding and queued segments if the client went away
+            cancelled = True
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.jobs_active -= 1
+
+    def get_stats(self) -> dict:
+        """Get bulk job counters"""
+        return {
+            "active_jobs": self.jobs_active,
+            "completed_jobs": self.jobs_completed,
+            "audio_seconds": round(self.audio_seconds, 1),
+            "speedup": (
+                round(self.audio_seconds / self.elapsed_seconds, 2)
+                if self.elapsed_seconds > 0 else None
+            ),
+        }
@@ -0,0 +1,102 @@
+"""
+Capacity and readiness for Bhasha Setu backend.
+Turns STT/MT queue depth, recent stage latency and call counts into a
+headroom score a load balancer can route on.
+"""
+from typing import Callable, Dict, Optional
+from config import settings
+from utils.logger import get_logger
+from utils.stage_metrics import StageMetrics
+
+logger = get_logger(__name__)
+
+
+class CapacityMonitor:
+    """
+    Node readiness from its most loaded resource.
+
+    Every signal is scaled to a load in [0, 1] where 1 means the resource
+    cannot keep up with real time; headroom is one minus the highest load.
+    The node goes not-ready above READINESS__MAX_LOAD and becomes ready
+    again only below READINESS__RECOVER_LOAD, so it does not flap.
+    """
+
+    def __init__(
+        self,
+        metrics: StageMetrics,
+        stt_replicas: int,
+        active_calls: Callable[[], int],
+        max_calls: int = 0
+    ):
+        """
+        Args:
+            metrics: Stage metrics with "stt" and "mt" stages
+            stt_replicas: Whisper replicas serving live calls
+            active_calls: Returns the number of live calls
+            max_calls: Admission limit on calls (0 = not a capacity signal)
+        """
+        self.metrics = metrics
+        self.stt_replicas = max(1, stt_replicas)
+        self.active_calls = active_calls
+        self.max_calls = max_calls
+        self.ready = True
+        self.transitions = 0
+
+    def get_loads(self) -> Dict[str, Optional[float]]:
+        """
+        Load of each resource.
+
+        Returns:
+            Dict of signal name to load (None if there is no data yet)
+        """
+        config = settings.readiness
+        chunk_seconds = settings.audio.buffer_threshold_duration_ms / 1000
+
+        stt_p95 = self.metrics.percentiles("stt")["p95"]
+        mt_p95 = self.metrics.percentiles("mt")["p95"]
+
+        return {
+            "stt_queue": self.metrics.in_flight("stt") / (self.stt_replicas * config.stt_queue_per_replica),
+            "mt_queue": self.metrics.in_flight("mt") / config.mt_queue_limit,
+            # STT slower than the audio arrives means falling behind real time
+            "stt_latency": stt_p95 / chunk_seconds if stt_p95 is not None else None,
+            "mt_latency": (
+                mt_p95 * 1000 / config.mt_latency_budget_ms if mt_p95 is not None else None
+            ),
+            "calls": self.active_calls() / self.max_calls if self.max_calls > 0 else None,
+        }
+
+    def evaluate(self) -> dict:
+        """
+        Compute headroom and update readiness.
+
+        Returns:
+            Readiness report
+        """
+        config = settings.readiness
+        loads = self.get_loads()
+        known = {name: load for name, load in loads.items() if load is not None}
+        bottleneck = max(known, key=known.get) if known else None
+        load = min(1.0, known[bottleneck]) if bottleneck else 0.0
+
+        if self.ready and load > config.max_load:
+            self.ready = False
+            self.transitions += 1
+            logger.warning(f"Node not ready: {bottleneck} load {load:.2f}")
+        elif not self.ready and load < config.recover_load:
+            self.ready = True
+            self.transitions += 1
+            logger.info(f"Node ready again (load {load:.2f})")
+
+        return {
+            "ready": self.ready,
+            "headroom": round(1.0 - load, 3),
+            "load": round(load, 3),
+            "bottleneck": bottleneck,
+            "loads": {
+                name: round(value, 3) if value is not None else None
+                for name, value in loads.items()
+            },
+            "active_calls": self.active_calls(),
+            "stages": self.metrics.get_stats(),
+        }
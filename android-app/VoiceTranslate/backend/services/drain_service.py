@@ -0,0 +1,126 @@
+"""
+Graceful drain for Bhasha Setu backend.
+Takes a node out of rotation for a deploy: new calls are turned away, live
+calls get until a deadline to end, in-flight utterances are finished and
+the process exits once the last room is empty.
+"""
+import asyncio
+import time
+from typing import Callable, Optional, Set
+from config import settings
+from services.session_service import CallSession, SessionService
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# WebSocket close code telling clients to reconnect elsewhere
+CLOSE_SERVICE_RESTART = 1012
+
+
+class DrainController:
+    """Drain state and sequence"""
+
+    def __init__(
+        self,
+        session_service: SessionService,
+        flush_session: Callable[[CallSession], None],
+        background_tasks: Set[asyncio.Task],
+        on_drained: Callable[[], None]
+    ):
+        """
+        Args:
+            session_service: Registry of live sessions
+            flush_session: Submits a session's remaining buffered audio
+            background_tasks: Untracked work (e.g. temp file cleanup) to
+                wait for before exiting
+            on_drained: Called once the node is empty (flushes metrics,
+                stops the server)
+        """
+        self.session_service = session_service
+        self.flush_session = flush_session
+        self.background_tasks = background_tasks
+        self.on_drained = on_drained
+
+        self.draining = False
+        self.reason: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.phase = "serving"
+        self.task: Optional[asyncio.Task] = None
+
+    def begin(self, reason: str) -> bool:
+        """
+        Start draining; later calls are ignored.
+
+        Args:
+            reason: What triggered the drain (signal, admin endpoint)
+
+        Returns:
+            True if this call started the drain
+        """
+        if self.draining:
+            return False
+        self.draining = True
+        self.reason = reason
+        self.started_at = time.monotonic()
+        logger.warning(
+            f"Draining ({reason}): {len(self.session_service.call_sizes)} call(s) live, "
+            f"deadline {settings.drain.deadline_seconds}s"
+        )
+        self.task = asyncio.create_task(self.run())
+        return True
+
+    async def run(self) -> None:
+        """Drain sequence"""
+        config = settings.drain
+        sessions = self.session_service
+
+        # 1. Let calls end on their own until the deadline
+        self.phase = "waiting_for_calls"
+        deadline = self.started_at + config.deadline_seconds
+        while sessions.call_sizes and time.monotonic() < deadline:
+            await asyncio.sleep(config.poll_interval_seconds)
+
+        # 2. Past the deadline: transcribe what is still buffered and let
+        # in-flight utterances finish before disconnecting
+        live = list(sessions.sessions.values())
+        if live:
+            self.phase = "flushing"
+            logger.warning(f"Drain deadline reached with {len(live)} session(s) live")
+            for session in live:
+                if not session.closed and not session.cancelled:
+                    self.flush_session(session)
+
+            pending = [t for s in live for t in s.tasks if not t.done()]
+            if pending:
+                await asyncio.wait(pending, timeout=config.flush_timeout_seconds)
+
+            for session in live:
+                websocket = session.websocket
+                sessions.close(session)
+                if websocket is not None:
+                    try:
+                        await websocket.close(code=CLOSE_SERVICE_RESTART, reason="Server restarting")
+                    except Exception as e:
+                        logger.debug(f"Failed to close websocket while draining: {e}")
+
+        # 3. Finish file cleanup and other untracked work
+        self.phase = "finishing"
+        pending = [t for t in self.background_tasks if not t.done()]
+        if pending:
+            await asyncio.wait(pending, timeout=config.flush_timeout_seconds)
+
+        self.phase = "drained"
+        logger.warning(f"Drained in {time.monotonic() - self.started_at:.1f}s")
+        self.on_drained()
+
+    def get_stats(self) -> dict:
+        """Get drain state"""
+        return {
+            "draining": self.draining,
+            "reason": self.reason,
+            "phase": self.phase,
+            "elapsed_seconds": (
+                round(time.monotonic() - self.started_at, 1) if self.started_at else None
+            ),
+            "live_calls": len(self.session_service.call_sizes),
+        }
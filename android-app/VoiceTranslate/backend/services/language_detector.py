@@ -0,0 +1,183 @@
+"""
+Spoken-language detection for Bhasha Setu backend.
+Identifies a speaker's language from the first chunks of speech with a
+confidence-weighted vote, then locks it so later chunks decode with a fixed
+language. A rare background re-check unlocks it if the speaker switched.
+"""
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from config import settings
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Source language path segment that requests detection
+AUTO_LANGUAGE = "auto"
+
+
+class LanguageDetector:
+    """Per-session language vote and lock; safe to use from STT worker threads"""
+    __slots__ = (
+        "candidates", "votes", "observed", "locked", "confidence", "announced",
+        "chunks_since_check", "strikes", "checks", "_lock",
+    )
+
+    def __init__(self, candidates: Optional[List[str]] = None):
+        """
+        Args:
+            candidates: Languages the speaker may use (empty = any)
+        """
+        if candidates is None:
+            candidates = settings.whisper.language_candidates
+        self.candidates = set(candidates)
+
+        # Summed detection probability per language
+        self.votes: Dict[str, float] = {}
+        self.observed = 0
+        self.locked: Optional[str] = None
+        # Share of the vote the locked language won
+        self.confidence = 0.0
+        # Last locked language reported to the client
+        self.announced: Optional[str] = None
+
+        self.chunks_since_check = 0
+        # Consecutive re-checks that disagreed with the locked language
+        self.strikes = 0
+        self.checks = 0
+        self._lock = threading.Lock()
+
+    @property
+    def best_guess(self) -> Optional[str]:
+        """Locked language, or the current vote leader"""
+        if self.locked is not None:
+            return self.locked
+        if not self.votes:
+            return None
+        return max(self.votes, key=self.votes.get)
+
+    def pick(self, info: Any) -> Tuple[str, float]:
+        """
+        Choose the most probable allowed language from detection output.
+
+        Args:
+            info: faster-whisper TranscriptionInfo
+
+        Returns:
+            Tuple of (language, probability)
+        """
+        if self.candidates:
+            all_probs = getattr(info, "all_language_probs", None) or []
+            allowed = [(lang, prob) for lang, prob in all_probs if lang in self.candidates]
+            if allowed:
+                return max(allowed, key=lambda item: item[1])
+            if info.language not in self.candidates:
+                return info.language, 0.0
+        return info.language, info.language_probability
+
+    def observe(self, info: Any) -> Optional[str]:
+        """
+        Add one chunk's detection to the vote and lock once decided.
+
+        Args:
+            info: TranscriptionInfo of a chunk decoded with language=None
+
+        Returns:
+            The language just locked, or None if still voting
+        """
+        language, probability = self.pick(info)
+        config = settings.whisper
+
+        with self._lock:
+            if self.locked is not None:
+                return None
+
+            self.observed += 1
+            if probability > 0:
+                self.votes[language] = self.votes.get(language, 0.0) + probability
+
+            decided = (
+                probability >= config.language_early_lock_probability
+                or self.observed >= config.language_detect_chunks
+            )
+            if not decided or not self.votes:
+                return None
+
+            leader = max(self.votes, key=self.votes.get)
+            self.locked = leader
+            self.confidence = self.votes[leader] / sum(self.votes.values())
+            self.chunks_since_check = 0
+            self.strikes = 0
+            return leader
+
+    def take_announcement(self) -> Optional[str]:
+        """
+        Get a newly locked language, once per lock.
+
+        Returns:
+            Locked language not yet reported, or None
+        """
+        with self._lock:
+            if self.locked is None or self.locked == self.announced:
+                return None
+            self.announced = self.locked
+            return self.locked
+
+    def tick(self) -> bool:
+        """
+        Count a chunk decoded with the locked language.
+
+        Returns:
+            True if a background re-check is due
+        """
+        interval = settings.whisper.language_recheck_chunks
+        with self._lock:
+            if self.locked is None or interval <= 0:
+                return False
+            self.chunks_since_check += 1
+            if self.chunks_since_check < interval:
+                return False
+            self.chunks_since_check = 0
+            return True
+
+    def recheck(self, info: Any) -> bool:
+        """
+        Compare a background detection with the locked language.
+
+        Two confident disagreements in a row unlock it and restart the vote.
+
+        Args:
+            info: TranscriptionInfo from a detection-only pass
+
+        Returns:
+            True if the language was unlocked
+        """
+        language, probability = self.pick(info)
+        with self._lock:
+            self.checks += 1
+            if self.locked is None:
+                return False
+            if language == self.locked or probability < settings.whisper.language_switch_probability:
+                self.strikes = 0
+                return False
+
+            self.strikes += 1
+            if self.strikes < 2:
+                return False
+
+            logger.info(f"Speaker switched from {self.locked} to {language}, re-detecting")
+            self.locked = None
+            self.votes = {language: probability}
+            self.observed = 1
+            self.confidence = 0.0
+            self.strikes = 0
+            return True
+
+    def get_stats(self) -> dict:
+        """Get detection state"""
+        return {
+            "locked": self.locked,
+            "confidence": round(self.confidence, 3),
+            "votes": {lang: round(weight, 3) for lang, weight in self.votes.items()},
+            "observed": self.observed,
+            "checks": self.checks,
+        }
@@ -0,0 +1,114 @@
+"""
+Model replica pool for Bhasha Setu backend.
+Runs several Whisper replicas, each with its own intra-op thread budget,
+and hands each request to whichever replica is free.
+"""
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Tuple
+from config import settings
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def get_pool_layout(cores: int = 0) -> Tuple[int, int]:
+    """
+    Work out replica count and threads per replica.
+
+    Explicit settings win. Otherwise each replica gets up to four
+    threads (CTranslate2 scales poorly beyond that for small models) and
+    there are as many replicas as fit in the cores.
+
+    Args:
+        cores: Cores available for STT (defaults to all cores)
+
+    Returns:
+        Tuple of (replicas, cpu_threads per replica)
+    """
+    if cores <= 0:
+        cores = os.cpu_count() or 1
+
+    threads = settings.whisper.cpu_threads or min(4, cores)
+    replicas = settings.whisper.pool_size or max(1, cores // threads)
+    return replicas, threads
+
+
+class ModelPool:
+    """Fixed set of interchangeable model replicas"""
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[int], Any],
+        replicas: int,
+        cpu_threads: int
+    ):
+        """
+        Args:
+            name: Pool name for logging (e.g. model size)
+            factory: Creates one replica given its CPU thread budget
+            replicas: Number of replicas
+            cpu_threads: Intra-op threads per replica
+        """
+        self.name = name
+        self.cpu_threads = cpu_threads
+        self.replicas: List[Any] = []
+        self._free: "queue.Queue[Any]" = queue.Queue()
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.acquired_total = 0
+        self.waited_total = 0
+
+        for _ in range(replicas):
+            replica = factory(cpu_threads)
+            self.replicas.append(replica)
+            self._free.put(replica)
+
+        logger.info(
+            f"Model pool '{name}': {replicas} replica(s) x {cpu_threads} thread(s)"
+        )
+
+    @property
+    def size(self) -> int:
+        return len(self.replicas)
+
+    @contextmanager
+    def acquire(self) -> Iterator[Any]:
+        """
+        Borrow a free replica, blocking until one is available.
+
+        Yields:
+            Model replica, returned to the pool on exit
+        """
+        try:
+            replica = self._free.get_nowait()
+            waited = False
+        except queue.Empty:
+            replica = self._free.get()
+            waited = True
+
+        with self._lock:
+            self.in_use += 1
+            self.acquired_total += 1
+            if waited:
+                self.waited_total += 1
+
+        try:
+            yield replica
+        finally:
+            with self._lock:
+                self.in_use -= 1
+            self._free.put(replica)
+
+    def get_stats(self) -> dict:
+        """Get pool utilization"""
+        return {
+            "replicas": self.size,
+            "cpu_threads": self.cpu_threads,
+            "in_use": self.in_use,
+            "acquired_total": self.acquired_total,
+            "waited_total": self.waited_total,
+        }
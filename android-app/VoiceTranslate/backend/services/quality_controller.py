@@ -0,0 +1,150 @@
+"""
+Load-adaptive quality control for Bhasha Setu backend.
+Steps Whisper decoding down to cheaper tiers under load and back up once
+load falls, with hysteresis so it does not oscillate.
+"""
+import time
+from typing import List, Optional
+from config import settings
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class QualityTier:
+    """One decoding configuration, written as "model_size:beam_size" """
+    __slots__ = ("name", "model_size", "beam_size")
+
+    def __init__(self, model_size: str, beam_size: int):
+        self.model_size = model_size
+        self.beam_size = beam_size
+        self.name = f"{model_size}:{beam_size}"
+
+    @classmethod
+    def parse(cls, spec: str) -> "QualityTier":
+        """
+        Parse a tier spec.
+
+        Args:
+            spec: "model_size:beam_size", e.g. "small:5" or "tiny:1"
+
+        Returns:
+            QualityTier
+        """
+        model_size, _, beam = spec.partition(":")
+        if not model_size or not beam.isdigit() or int(beam) < 1:
+            raise ValueError(f"Invalid quality tier '{spec}', expected model_size:beam_size")
+        return cls(model_size.strip(), int(beam))
+
+    def __repr__(self) -> str:
+        return f"QualityTier({self.name})"
+
+
+def get_configured_tiers() -> List[QualityTier]:
+    """
+    Get the tiers the controller steps through, best first.
+
+    With adaptive quality disabled this is the single configured
+    Whisper model and beam size.
+
+    Returns:
+        List of QualityTier
+    """
+    if not settings.quality.enabled:
+        return [QualityTier(settings.whisper.model_size, settings.whisper.beam_size)]
+    return [QualityTier.parse(spec) for spec in settings.quality.tiers]
+
+
+class QualityController:
+    """Chooses the decoding tier from STT queue depth and latency"""
+
+    def __init__(self, tiers: Optional[List[QualityTier]] = None):
+        self.tiers = tiers or get_configured_tiers()
+        self.level = 0
+        # STT jobs submitted and not yet finished (queued or running)
+        self.pending = 0
+        # Exponentially weighted STT latency, including executor queueing
+        self.latency_ewma = 0.0
+        self.last_change = time.monotonic()
+        self.transitions = 0
+
+        if len(self.tiers) > 1:
+            logger.info(
+                f"Adaptive STT quality enabled: {' > '.join(t.name for t in self.tiers)}"
+            )
+
+    @property
+    def current_tier(self) -> QualityTier:
+        return self.tiers[self.level]
+
+    def begin(self) -> None:
+        """
+        Register a new STT job.
+
+        The job decodes at current_tier as read before this call, the
+        tier its cached result is keyed by; a tier change this job
+        triggers applies from the next job on.
+        """
+        self.pending += 1
+        self.evaluate()
+
+    def end(self, latency_seconds: float) -> None:
+        """
+        Register a finished STT job.
+
+        Args:
+            latency_seconds: Time from submission to completion
+        """
+        self.pending = max(0, self.pending - 1)
+        alpha = settings.quality.latency_smoothing
+        if self.latency_ewma == 0.0:
+            self.latency_ewma = latency_seconds
+        else:
+            self.latency_ewma = alpha * latency_seconds + (1 - alpha) * self.latency_ewma
+        self.evaluate()
+
+    def evaluate(self) -> None:
+        """Step the tier down under pressure, or back up once load falls"""
+        if len(self.tiers) < 2:
+            return
+
+        config = settings.quality
+        latency_ms = self.latency_ewma * 1000
+        overloaded = (
+            self.pending >= config.step_down_queue_depth
+            or latency_ms >= config.step_down_latency_ms
+        )
+        relaxed = (
+            self.pending <= config.step_up_queue_depth
+            and latency_ms <= config.step_up_latency_ms
+        )
+
+        now = time.monotonic()
+        if now - self.last_change < config.min_dwell_seconds:
+            return
+
+        if overloaded and self.level < len(self.tiers) - 1:
+            self._set_level(self.level + 1, now)
+        elif relaxed and self.level > 0:
+            self._set_level(self.level - 1, now)
+
+    def _set_level(self, level: int, now: float) -> None:
+        previous = self.current_tier
+        self.level = level
+        self.last_change = now
+        self.transitions += 1
+        logger.warning(
+            f"STT quality {previous.name} -> {self.current_tier.name} "
+            f"(pending={self.pending}, latency={self.latency_ewma * 1000:.0f}ms)"
+        )
+
+    def get_stats(self) -> dict:
+        """Get controller state"""
+        return {
+            "tier": self.current_tier.name,
+            "level": self.level,
+            "tiers": [t.name for t in self.tiers],
+            "pending": self.pending,
+            "latency_ms": round(self.latency_ewma * 1000, 1),
+            "transitions": self.transitions,
+        }
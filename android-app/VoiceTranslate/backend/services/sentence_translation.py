@@ -0,0 +1,263 @@
+"""
+Incremental sentence-level translation for Bhasha Setu backend.
+Reassembles sentences across STT chunk edges so MarianMT sees whole
+sentences, translates each completed sentence once and caches the result.
+"""
+import asyncio
+import re
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from config import settings
+
+# Sentence terminators, including the Devanagari danda and double danda
+SENTENCE_END = re.compile(r"(?<=[.?!।॥])\s+")
+_TERMINATORS = ".?!।॥"
+
+# MarianMT's SentencePiece vocabularies average about 1.3 pieces per word
+TOKENS_PER_WORD = 4 / 3
+
+TranslateBatch = Callable[[List[str]], Awaitable[List[str]]]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough MarianMT token count of a text"""
+    return int(len(text.split()) * TOKENS_PER_WORD) + 1
+
+
+def split_sentences(text: str) -> Tuple[List[str], str]:
+    """
+    Split text into completed sentences and an unfinished tail.
+
+    Args:
+        text: Text to split
+
+    Returns:
+        Tuple of (completed sentences, tail without a terminator)
+    """
+    parts = [p for p in SENTENCE_END.split(text.strip()) if p]
+    if not parts:
+        return [], ""
+    if parts[-1][-1] in _TERMINATORS:
+        return parts, ""
+    return parts[:-1], parts[-1]
+
+
+def split_long(sentence: str, max_tokens: int) -> List[str]:
+    """
+    Cut a sentence that exceeds the token limit into word windows.
+
+    Args:
+        sentence: Sentence to cut
+        max_tokens: Token limit per piece
+
+    Returns:
+        Pieces in order (the sentence itself if it fits)
+    """
+    if estimate_tokens(sentence) <= max_tokens:
+        return [sentence]
+    max_words = max(1, int((max_tokens - 1) / TOKENS_PER_WORD))
+    words = sentence.split()
+    return [" ".join(words[i:i + max_words]) for i in range(0, len(words), max_words)]
+
+
+def batch_sentences(sentences: List[str], max_tokens: int) -> List[List[str]]:
+    """
+    Group sentences into batches that stay under the token limit.
+
+    Args:
+        sentences: Sentences in order, each within the limit (see split_long)
+        max_tokens: Token limit per batch
+
+    Returns:
+        Batches of sentences in order
+    """
+    batches: List[List[str]] = []
+    current: List[str] = []
+    used = 0
+    for sentence in sentences:
+        tokens = estimate_tokens(sentence)
+        if current and used + tokens > max_tokens:
+            batches.append(current)
+            current, used = [], 0
+        current.append(sentence)
+        used += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+class IncrementalTranslator:
+    """
+    Per-session translation stage.
+
+    STT chunks of a session are transcribed concurrently; wait_turn() and
+    done() hand them to this stage in submission order so sentences are
+    reassembled correctly. emit_lock is held from feeding text until its
+    sentences are broadcast, by chunks and by a tail flush alike, so a
+    chunk arriving during a flush cannot overtake the flushed tail.
+    """
+    __slots__ = (
+        "tail", "tail_tier", "cache", "cache_size", "max_batch_tokens",
+        "next_seq", "flush_task", "emit_lock", "hits", "misses",
+        "_finished", "_waiters",
+    )
+
+    def __init__(
+        self,
+        cache_size: Optional[int] = None,
+        max_batch_tokens: Optional[int] = None
+    ):
+        config = settings.translation
+        self.cache_size = config.sentence_cache_size if cache_size is None else cache_size
+        self.max_batch_tokens = (
+            config.max_batch_tokens if max_batch_tokens is None else max_batch_tokens
+        )
+
+        # Words of the sentence still being spoken
+        self.tail = ""
+        self.tail_tier: Optional[str] = None
+        # Completed sentence -> translation, least recently used first
+        self.cache: "OrderedDict[str, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        # Pending flush of a held-back tail
+        self.flush_task: Optional[asyncio.Task] = None
+        # Serializes feed/take_tail and the broadcast that follows
+        self.emit_lock = asyncio.Lock()
+
+        # Chunk ordering: next chunk allowed in, and chunks finished early
+        self.next_seq = 0
+        self._finished: Set[int] = set()
+        self._waiters: Dict[int, asyncio.Future] = {}
+
+    async def wait_turn(self, seq: int) -> None:
+        """
+        Wait until every earlier chunk has passed through the stage.
+
+        Args:
+            seq: Submission index of the chunk
+        """
+        if seq <= self.next_seq:
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[seq] = future
+        try:
+            await future
+        finally:
+            self._waiters.pop(seq, None)
+
+    def done(self, seq: int) -> None:
+        """
+        Mark a chunk as finished, whether it produced text or not.
+
+        Args:
+            seq: Submission index of the chunk
+        """
+        self._finished.add(seq)
+        while self.next_seq in self._finished:
+            self._finished.discard(self.next_seq)
+            self.next_seq += 1
+
+        waiter = self._waiters.get(self.next_seq)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def busy(self, submitted: int) -> bool:
+        """Whether chunks are still in flight"""
+        return self.next_seq < submitted
+
+    def feed(self, text: str, tier: Optional[str] = None) -> List[str]:
+        """
+        Add transcribed text and collect the sentences it completes.
+
+        Args:
+            text: Text of the next chunk
+            tier: STT tier that produced the text
+
+        Returns:
+            Completed sentences; the unfinished rest is held back
+        """
+        combined = f"{self.tail} {text}" if self.tail else text
+        sentences, self.tail = split_sentences(combined)
+        self.tail_tier = tier
+
+        # Force a run-on without punctuation out before it outgrows the model
+        if estimate_tokens(self.tail) > self.max_batch_tokens:
+            sentences.append(self.tail)
+            self.tail = ""
+        return sentences
+
+    def take_tail(self) -> Tuple[str, Optional[str]]:
+        """
+        Remove and return the held-back tail.
+
+        Returns:
+            Tuple of (tail text, tier that produced it)
+        """
+        tail, self.tail = self.tail, ""
+        return tail, self.tail_tier
+
+    async def translate(self, sentences: List[str], translate_batch: TranslateBatch) -> List[str]:
+        """
+        Translate sentences, reusing cached translations.
+
+        Args:
+            sentences: Completed sentences
+            translate_batch: Translates a list of texts of this session's pair
+
+        Returns:
+            Translations in input order
+        """
+        translations: Dict[str, str] = {}
+        missing: List[str] = []
+        for sentence in sentences:
+            if sentence in translations:
+                continue
+            cached = self.cache.get(sentence)
+            if cached is not None:
+                self.cache.move_to_end(sentence)
+                translations[sentence] = cached
+                self.hits += 1
+            else:
+                translations[sentence] = ""
+                missing.append(sentence)
+                self.misses += 1
+
+        if missing:
+            pieces_of = {s: split_long(s, self.max_batch_tokens) for s in missing}
+            pieces = list(dict.fromkeys(p for s in missing for p in pieces_of[s]))
+
+            fresh: Dict[str, str] = {}
+            for batch in batch_sentences(pieces, self.max_batch_tokens):
+                fresh.update(zip(batch, await translate_batch(batch)))
+
+            for sentence in missing:
+                translated = " ".join(fresh[p] for p in pieces_of[sentence])
+                translations[sentence] = translated
+                self.cache[sentence] = translated
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+        return [translations[s] for s in sentences]
+
+    def clear(self) -> None:
+        """Drop all state"""
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+            self.flush_task = None
+        self.tail = ""
+        self.cache.clear()
+        for waiter in self._waiters.values():
+            if not waiter.done():
+                waiter.cancel()
+        self._waiters.clear()
+
+    def get_stats(self) -> dict:
+        """Get cache counters"""
+        return {
+            "cached_sentences": len(self.cache),
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "tail_words": len(self.tail.split()),
+        }
@@ -0,0 +1,438 @@
+"""
+Call session management for Bhasha Setu backend.
+Owns all per-connection state and guarantees it is reclaimed on disconnect
+or after an idle timeout.
+"""
+import asyncio
+import secrets
+import time
+from typing import Dict, Optional, Set, Tuple
+from fastapi import WebSocket
+from config import settings
+from services.admission_control import get_admission_controller
+from services.audio_service import VADStats
+from services.language_detector import AUTO_LANGUAGE, LanguageDetector
+from services.sentence_translation import IncrementalTranslator
+from utils.dedupe import TranscriptWindow
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class CallSession:
+    """State of one participant's connection to a call"""
+    __slots__ = (
+        "call_id", "user_id", "source_lang", "target_lang", "websocket",
+        "audio_buffer", "vad_stats", "transcript_window", "sentences", "language", "tasks",
+        "stream_position", "created_at", "last_activity", "frames_received", "bytes_received",
+        "chunks_submitted", "transcripts_sent", "closed", "cancelled",
+        "resume_token", "last_seq", "suspended_at", "resumes", "duplicate_frames",
+    )
+
+    def __init__(
+        self,
+        call_id: str,
+        user_id: str,
+        source_lang: str,
+        target_lang: str,
+        websocket: Optional[WebSocket] = None
+    ):
+        self.call_id = call_id
+        self.user_id = user_id
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self.websocket = websocket
+
+        # Audio accumulated towards the next STT chunk
+        self.audio_buffer = bytearray()
+        # Stream offset in bytes of the start of audio_buffer
+        self.stream_position = 0
+        # Adaptive VAD baseline for this speaker only
+        self.vad_stats = VADStats()
+        # Recent transcripts for duplicate suppression
+        self.transcript_window = TranscriptWindow(
+            settings.vad.duplicate_window_seconds,
+            max_entries=settings.vad.duplicate_max_entries,
+            near_threshold=settings.vad.near_duplicate_threshold,
+            shingle_size=settings.vad.near_duplicate_shingle_size
+        )
+        # Sentence reassembly across chunks (incremental translation only)
+        self.sentences: Optional[IncrementalTranslator] = (
+            IncrementalTranslator() if settings.translation.incremental else None
+        )
+        # Spoken-language detection for "auto" sessions
+        self.language: Optional[LanguageDetector] = (
+            LanguageDetector() if source_lang == AUTO_LANGUAGE else None
+        )
+        # In-flight background tasks (STT, translation, broadcast)
+        self.tasks: Set[asyncio.Task] = set()
+
+        now = time.monotonic()
+        self.created_at = now
+        self.last_activity = now
+        self.frames_received = 0
+        self.bytes_received = 0
+        self.chunks_submitted = 0
+        self.transcripts_sent = 0
+        self.closed = False
+        # Set when pending work must be abandoned; read from worker threads
+        self.cancelled = False
+
+        # Lets a reconnecting client take the session over
+        self.resume_token = secrets.token_urlsafe(16)
+        # Highest frame sequence number received (sequenced clients only)
+        self.last_seq = -1
+        # Time the connection dropped, while held for resumption
+        self.suspended_at: Optional[float] = None
+        self.resumes = 0
+        self.duplicate_frames = 0
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return (self.call_id, self.user_id)
+
+    def touch(self) -> None:
+        """Record activity on the session"""
+        self.last_activity = time.monotonic()
+
+    def accept_seq(self, seq: int) -> bool:
+        """
+        Check a sequenced frame against the frames already received.
+
+        Args:
+            seq: Sequence number of the frame
+
+        Returns:
+            False if the frame was received before and must be skipped
+        """
+        if seq <= self.last_seq:
+            self.duplicate_frames += 1
+            return False
+        if seq > self.last_seq + 1 and self.last_seq >= 0:
+            logger.debug(
+                "Frame gap on %s/%s: %d -> %d", self.call_id, self.user_id, self.last_seq, seq
+            )
+        self.last_seq = seq
+        return True
+
+    def add_frame(self, data: bytes) -> bool:
+        """
+        Append a received frame to the audio buffer.
+
+        Args:
+            data: Raw PCM frame
+
+        Returns:
+            False if the node's audio memory budget is exhausted and the
+            frame was dropped
+        """
+        self.last_activity = time.monotonic()
+        if not get_admission_controller().charge(len(data)):
+            return False
+        self.audio_buffer.extend(data)
+        self.frames_received += 1
+        self.bytes_received += len(data)
+        return True
+
+    def take_chunk(self, keep_bytes: int = 0) -> bytes:
+        """
+        Remove and return the buffered audio.
+
+        Args:
+            keep_bytes: Trailing bytes left in the buffer to start the next
+                chunk with, for overlapping STT windows
+
+        Returns:
+            Buffered PCM data
+        """
+        chunk = bytes(self.audio_buffer)
+        keep_bytes = min(keep_bytes, len(chunk))
+        if keep_bytes:
+            self.audio_buffer = bytearray(chunk[-keep_bytes:])
+        else:
+            self.audio_buffer.clear()
+        self.stream_position += len(chunk) - keep_bytes
+        self.chunks_submitted += 1
+        get_admission_controller().credit(len(chunk) - keep_bytes)
+        return chunk
+
+    def track_task(self, task: asyncio.Task) -> None:
+        """
+        Register a background task; it is forgotten once done.
+
+        Args:
+            task: Task working on this session's audio
+        """
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def cancel_tasks(self) -> int:
+        """
+        Cancel all in-flight and queued work of this session.
+
+        Queued tasks never start; work already running in a worker thread
+        sees the cancelled flag and stops at its next check.
+
+        Returns:
+            Number of tasks cancelled
+        """
+        self.cancelled = True
+        pending = [task for task in self.tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        if self.sentences is not None:
+            self.sentences.clear()
+        return len(pending)
+
+    def close(self) -> None:
+        """
+        Release all buffered state.
+
+        The sentence stage is kept: chunks already submitted still pass
+        through it and its tail is still flushed, for whoever remains in
+        the call. cancel_tasks() clears it once the call is over.
+        """
+        if self.closed:
+            return
+
+        self.closed = True
+        get_admission_controller().credit(len(self.audio_buffer))
+        self.audio_buffer = bytearray()
+        self.vad_stats = VADStats()
+        self.transcript_window.clear()
+        self.websocket = None
+
+    def get_stats(self) -> dict:
+        """Get session counters"""
+        return {
+            "call_id": self.call_id,
+            "user_id": self.user_id,
+            "age_seconds": round(time.monotonic() - self.created_at, 1),
+            "idle_seconds": round(time.monotonic() - self.last_activity, 1),
+            "frames_received": self.frames_received,
+            "bytes_received": self.bytes_received,
+            "stream_position": self.stream_position,
+            "buffered_bytes": len(self.audio_buffer),
+            "chunks_submitted": self.chunks_submitted,
+            "transcripts_sent": self.transcripts_sent,
+            "last_seq": self.last_seq,
+            "suspended": self.suspended_at is not None,
+            "resumes": self.resumes,
+            "duplicate_frames": self.duplicate_frames,
+            "tasks_in_flight": len(self.tasks),
+            "sentences": self.sentences.get_stats() if self.sentences is not None else None,
+            "language": self.language.get_stats() if self.language is not None else None,
+        }
+
+
+class SessionService:
+    """Registry of live call sessions"""
+
+    def __init__(self):
+        # sessions: {(call_id, user_id): CallSession}
+        self.sessions: Dict[Tuple[str, str], CallSession] = {}
+        # Live sessions per call: {call_id: count}
+        self.call_sizes: Dict[str, int] = {}
+        # Closed sessions whose work still serves the rest of the call
+        self.orphans: Dict[str, Set[CallSession]] = {}
+        # Sessions by resume token: {token: CallSession}
+        self.tokens: Dict[str, CallSession] = {}
+        self.tasks_cancelled = 0
+        logger.info("Session service initialized")
+
+    def open(
+        self,
+        call_id: str,
+        user_id: str,
+        source_lang: str,
+        target_lang: str,
+        websocket: Optional[WebSocket] = None
+    ) -> CallSession:
+        """
+        Create a session, replacing any stale one for the same participant.
+
+        Args:
+            call_id: Call identifier
+            user_id: User identifier
+            source_lang: Source language code
+            target_lang: Target language code
+            websocket: Connection the session belongs to
+
+        Returns:
+            New CallSession
+        """
+        key = (call_id, user_id)
+        stale = self.sessions.get(key)
+        if stale is not None:
+            logger.info(f"Replacing stale session {call_id}/{user_id}")
+            self.tokens.pop(stale.resume_token, None)
+            stale.close()
+            if stale.tasks:
+                self.orphans.setdefault(call_id, set()).add(stale)
+
+        session = CallSession(call_id, user_id, source_lang, target_lang, websocket)
+        self.sessions[key] = session
+        self.tokens[session.resume_token] = session
+        if stale is None:
+            self.call_sizes[call_id] = self.call_sizes.get(call_id, 0) + 1
+        logger.debug(f"Session opened: {call_id}/{user_id}")
+        return session
+
+    def get(self, call_id: str, user_id: str) -> Optional[CallSession]:
+        """Get a live session"""
+        return self.sessions.get((call_id, user_id))
+
+    def suspend(self, session: CallSession) -> None:
+        """
+        Hold a session whose connection dropped, for the resume grace period.
+
+        Its buffered audio, stream position and in-flight work are kept, and
+        it still counts as a participant of the call.
+
+        Args:
+            session: Session that lost its connection
+        """
+        session.websocket = None
+        session.suspended_at = time.monotonic()
+        logger.info(
+            f"Session {session.call_id}/{session.user_id} held for resumption "
+            f"({len(session.audio_buffer)} bytes buffered, last_seq={session.last_seq})"
+        )
+
+    def resume(
+        self,
+        token: str,
+        call_id: str,
+        websocket: WebSocket
+    ) -> Optional[CallSession]:
+        """
+        Attach a new connection to the session a resume token belongs to.
+
+        A session whose old connection has not noticed the drop yet is
+        taken over; the caller closes the old connection.
+
+        Args:
+            token: Resume token issued on connect
+            call_id: Call the client is reconnecting to
+            websocket: New connection
+
+        Returns:
+            Resumed CallSession, or None if the token is unknown or expired
+        """
+        session = self.tokens.get(token)
+        if session is None or session.closed or session.call_id != call_id:
+            return None
+
+        session.websocket = websocket
+        session.suspended_at = None
+        session.resumes += 1
+        session.touch()
+        logger.info(
+            f"Session {call_id}/{session.user_id} resumed at last_seq={session.last_seq}"
+        )
+        return session
+
+    def close(self, session: CallSession) -> None:
+        """
+        Close a session and remove it from the registry.
+
+        Only removes the registry entry if it still belongs to this session,
+        so a late close from a replaced connection is harmless.
+
+        Pending work is cancelled once nobody is left in the call to
+        receive its results. While other participants remain, the leaving
+        speaker's last utterances are still delivered to them.
+
+        Args:
+            session: Session to close
+        """
+        call_id = session.call_id
+        if self.tokens.get(session.resume_token) is session:
+            del self.tokens[session.resume_token]
+
+        if self.sessions.get(session.key) is session:
+            del self.sessions[session.key]
+            remaining = self.call_sizes.get(call_id, 1) - 1
+            if remaining > 0:
+                self.call_sizes[call_id] = remaining
+            else:
+                self.call_sizes.pop(call_id, None)
+
+        if not session.closed:
+            session.close()
+            logger.debug(f"Session closed: {session.call_id}/{session.user_id}")
+
+        if call_id in self.call_sizes:
+            if session.tasks and not session.cancelled:
+                self.orphans.setdefault(call_id, set()).add(session)
+            return
+
+        # Call is over: nothing produced from now on can be delivered
+        cancelled = session.cancel_tasks()
+        for orphan in self.orphans.pop(call_id, ()):
+            cancelled += orphan.cancel_tasks()
+
+        if cancelled:
+            self.tasks_cancelled += cancelled
+            logger.info(f"Cancelled {cancelled} pending task(s) for ended call {call_id}")
+
+    async def reap_idle(self, idle_timeout: Optional[float] = None) -> int:
+        """
+        Close sessions that have received nothing for too long.
+
+        Args:
+            idle_timeout: Idle time in seconds before a session is reclaimed
+
+        Returns:
+            Number of sessions reclaimed
+        """
+        if idle_timeout is None:
+            idle_timeout = settings.session.idle_timeout_seconds
+
+        now = time.monotonic()
+        grace = settings.session.resume_grace_seconds
+        idle = [
+            s for s in self.sessions.values()
+            if now - s.last_activity > idle_timeout
+            or (s.suspended_at is not None and now - s.suspended_at > grace)
+        ]
+
+        # Forget orphaned sessions whose work has finished
+        for call_id in list(self.orphans):
+            self.orphans[call_id] = {o for o in self.orphans[call_id] if o.tasks}
+            if not self.orphans[call_id]:
+                del self.orphans[call_id]
+
+        for session in idle:
+            logger.info(
+                f"Reclaiming idle session {session.call_id}/{session.user_id} "
+                f"(idle {now - session.last_activity:.0f}s)"
+            )
+            websocket = session.websocket
+            self.close(session)
+
+            if websocket is not None:
+                try:
+                    await websocket.close(code=1000, reason="Idle timeout")
+                except Exception as e:
+                    logger.debug(f"Failed to close idle websocket: {e}")
+
+        return len(idle)
+
+    async def run_reaper(self) -> None:
+        """Periodically reclaim idle sessions until cancelled"""
+        interval = settings.session.reap_interval_seconds
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reap_idle()
+            except Exception as e:
+                logger.error(f"Session reaper error: {e}", exc_info=True)
+
+    def get_active_count(self) -> int:
+        """Get number of live sessions"""
+        return len(self.sessions)
+
+    def get_suspended_count(self) -> int:
+        """Get number of sessions held for resumption"""
+        return sum(1 for s in self.sessions.values() if s.suspended_at is not None)
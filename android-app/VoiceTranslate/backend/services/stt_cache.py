@@ -0,0 +1,113 @@
+"""
+STT result cache for Bhasha Setu backend.
+Content-addressed cache of transcription results, so audio the client
+retransmits after a reconnect costs a hash lookup instead of a decode.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from config import settings
+from models import STTResult
+
+
+class STTResultCache:
+    """Bounded LRU of STT results keyed by audio content, with expiry"""
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        """
+        Args:
+            max_entries: Results kept (0 disables the cache)
+            ttl_seconds: Age after which a result is no longer served
+        """
+        config = settings.whisper
+        self.max_entries = config.result_cache_size if max_entries is None else max_entries
+        self.ttl_seconds = config.result_cache_ttl_seconds if ttl_seconds is None else ttl_seconds
+
+        # key -> (stored at, result), least recently used first
+        self._entries: "OrderedDict[bytes, Tuple[float, STTResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def make_key(
+        audio_data: bytes,
+        language: Optional[str],
+        tier: Optional[str],
+        window: Optional[Tuple[float, float]] = None
+    ) -> bytes:
+        """
+        Key of a chunk's transcription.
+
+        Everything that changes what Whisper returns for the chunk is part
+        of the key: the PCM, the decoding language, the tier and, with
+        overlapping chunks, the window the chunk owns.
+
+        Args:
+            audio_data: Raw PCM as received
+            language: Decoding language
+            tier: Quality tier name
+            window: Owned part of the chunk, if chunks overlap
+
+        Returns:
+            16-byte digest
+        """
+        digest = hashlib.blake2b(audio_data, digest_size=16)
+        digest.update(f"|{language}|{tier}|{window}".encode())
+        return digest.digest()
+
+    def get(self, key: bytes) -> Optional[STTResult]:
+        """
+        Look up a result.
+
+        Args:
+            key: Output of make_key
+
+        Returns:
+            Copy of the cached result, or None on a miss
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return entry[1].model_copy()
+
+    def put(self, key: bytes, result: STTResult) -> None:
+        """
+        Store a result.
+
+        Args:
+            key: Output of make_key
+            result: Transcription before per-session duplicate filtering
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result.model_copy())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_stats(self) -> dict:
+        """Get hit counters"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
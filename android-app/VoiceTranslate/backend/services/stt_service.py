@@ -3,18 +3,32 @@ Speech-to-text service for Bhasha Setu backend.
 Handles Whisper model management and transcription.
 """
 import os
-import time
-from typing import Dict, Optional
-from faster_whisper import WhisperModel
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple, Union
+import numpy as np
 from config import settings
 from models import STTResult
+from services.audio_service import OffsetMap
+from services.model_pool import ModelPool, get_pool_layout
+from services.quality_controller import QualityTier, get_configured_tiers
+from services.session_service import CallSession
+from services.stt_cache import STTResultCache
+from services.stub_backends import StubWhisperModel
+from utils.dedupe import TranscriptWindow
 from utils.logger import get_logger
+from utils.thread_budget import get_thread_budget, pin_current_thread, pinned_to
 
 os.environ['TRANSFORMERS_NO_TF'] = '1'
 
 logger = get_logger(__name__)
 
 
+class TranscriptionCancelled(Exception):
+    """Raised when a transcription is abandoned because its call ended"""
+
+
 class STTService:
     """Service for speech-to-text operations"""
     
@@ -40,147 +54,472 @@ class STTService:
         "um", "uh", "hmm", "mm", "ah", "oh", "eh"
     ]
     
+    # Regex patterns for whole-text hallucinations, per language.
+    # "*" applies to every language.
+    HALLUCINATION_PATTERNS: Dict[str, List[str]] = {
+        "*": [
+            r"(?:please\s+)?(?:like\s+(?:and|&)\s+)?subscribe(?:\s+to\s+(?:my|our|the)\s+channel)?",
+            r"thanks?\s+(?:you\s+)?(?:so\s+much\s+)?for\s+watching",
+            r"(?:subtitles?|captions?)\s+(?:by|from)\s+.*",
+            r"[\[(]?\s*(?:music|applause|laughter|silence|noise)\s*[\])]?",
+            r"[♪♫\s.]+",
+        ],
+        "hi": [
+            r"धन्यवाद",
+            r"शुक्रिया",
+            r"(?:चैनल\s+को\s+)?(?:लाइक\s+और\s+)?सब्सक्राइब\s*(?:करें|करो|कीजिए)?",
+            r"देखने\s+के\s+लिए\s+धन्यवाद",
+        ],
+        "mr": [
+            r"धन्यवाद",
+            r"(?:चॅनेल\s+)?सबस्क्राईब\s*(?:करा)?",
+        ],
+        "bn": [
+            r"ধন্যবাদ",
+        ],
+        "ta": [
+            r"நன்றி",
+        ],
+        "te": [
+            r"ధన్యవాదాలు",
+        ],
+    }
+    
     def __init__(self):
-        logger.info("Loading Whisper model...")
-        self.model = WhisperModel(
-            settings.whisper.model_size,
-            device=settings.whisper.device,
-            compute_type=settings.whisper.compute_type
+        # Replica pools by model size: {model_size: ModelPool}
+        self.pools: Dict[str, ModelPool] = {}
+        self._pools_lock = threading.Lock()
+        self.budget = get_thread_budget()
+        self.replicas, self.cpu_threads = get_pool_layout(self.budget.stt_cores)
+        
+        # One worker thread per replica: jobs beyond that wait in the
+        # executor queue instead of oversubscribing the cores
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.replicas,
+            thread_name_prefix="stt",
+            initializer=pin_current_thread,
+            initargs=(self.budget.stt_cpus,)
         )
-        logger.info(f"Whisper model '{settings.whisper.model_size}' loaded successfully")
         
-        # Track recent transcripts to suppress duplicates
-        self.recent_transcripts: Dict[str, Dict[str, float]] = {}
+        # Load every quality tier's model up front; loading one on demand
+        # would stall transcription exactly when the node is under load
+        for tier in get_configured_tiers():
+            self.get_pool(tier.model_size)
+        
+        # Compiled hallucination matcher per language
+        self._hallucination_matchers: Dict[str, Pattern] = {}
+        
+        # Results of recent chunks by content, for retransmitted audio
+        self.result_cache = STTResultCache()
+    
+    def get_pool(self, model_size: Optional[str] = None) -> ModelPool:
+        """
+        Get the replica pool for a model size, loading it on first use.
+        
+        Args:
+            model_size: Whisper model size (defaults to configured size)
+        
+        Returns:
+            ModelPool of models exposing faster-whisper's transcribe()
+        """
+        if model_size is None:
+            model_size = settings.whisper.model_size
+        
+        pool = self.pools.get(model_size)
+        if pool is not None:
+            return pool
+        
+        # CTranslate2 spawns its workers at load time; they inherit the
+        # loading thread's affinity
+        with self._pools_lock, pinned_to(self.budget.stt_cpus):
+            if model_size not in self.pools:
+                self.pools[model_size] = ModelPool(
+                    model_size,
+                    lambda cpu_threads: self.load_model(model_size, cpu_threads),
+                    self.replicas,
+                    self.cpu_threads
+                )
+            return self.pools[model_size]
+    
+    def load_model(self, model_size: Optional[str] = None, cpu_threads: int = 0) -> Any:
+        """
+        Load one model replica of the configured STT backend.
+        
+        Args:
+            model_size: Whisper model size (defaults to configured size)
+            cpu_threads: Intra-op threads for the replica (0 = library default)
+        
+        Returns:
+            Model exposing faster-whisper's transcribe() interface
+        """
+        if model_size is None:
+            model_size = settings.whisper.model_size
+        
+        backend = settings.whisper.backend
+        
+        if backend == "stub":
+            logger.info("Using stub STT backend")
+            return StubWhisperModel()
+        
+        if backend != "whisper":
+            raise ValueError(f"Unknown STT backend: {backend}")
+        
+        # Imported here so the stub backend works without faster-whisper installed
+        from faster_whisper import WhisperModel
+        
+        logger.info(f"Loading Whisper model '{model_size}'...")
+        model = WhisperModel(
+            model_size,
+            device=settings.whisper.device,
+            compute_type=settings.whisper.compute_type,
+            cpu_threads=cpu_threads,
+            num_workers=1
+        )
+        logger.info(f"Whisper model '{model_size}' loaded successfully")
+        return model
+    
+    def get_pool_stats(self) -> dict:
+        """Get utilization of every replica pool"""
+        return {size: pool.get_stats() for size, pool in self.pools.items()}
     
     def is_duplicate_transcript(
         self,
         text: str,
-        call_id: str,
-        window_seconds: Optional[int] = None
+        window: TranscriptWindow
     ) -> bool:
         """
-        Check if this transcript was recently seen for this call.
+        Check if this transcript, or a near copy of it, was recently seen.
         
         Args:
             text: Transcribed text
-            call_id: Call identifier
-            window_seconds: Time window for duplicate detection
+            window: Session's recent transcript window
         
         Returns:
             True if duplicate, False otherwise
         """
-        if window_seconds is None:
-            window_seconds = settings.vad.duplicate_window_seconds
+        match = window.check(text)
+        if match is not None:
+            logger.debug("Duplicate transcript suppressed (%s): '%s'", match, text)
+            return True
         
-        current_time = time.time()
+        return False
+    
+    def get_hallucination_matcher(self, language: Optional[str] = None) -> Pattern:
+        """
+        Get the compiled hallucination matcher for a language.
         
-        # Clean up old entries
-        if call_id in self.recent_transcripts:
-            self.recent_transcripts[call_id] = {
-                t: timestamp
-                for t, timestamp in self.recent_transcripts[call_id].items()
-                if current_time - timestamp < window_seconds
-            }
+        Exact filler phrases and all regex patterns for the language are
+        folded into one anchored alternation, so a check is a single match.
         
-        # Check if duplicate
-        if call_id in self.recent_transcripts and text in self.recent_transcripts[call_id]:
-            logger.debug(f"Duplicate transcript suppressed: '{text}'")
-            return True
+        Args:
+            language: Language code (None for language-independent patterns)
+        
+        Returns:
+            Compiled pattern that matches whole cleaned texts
+        """
+        key = language or "*"
+        matcher = self._hallucination_matchers.get(key)
+        if matcher is not None:
+            return matcher
         
-        # Store this transcript
-        if call_id not in self.recent_transcripts:
-            self.recent_transcripts[call_id] = {}
-        self.recent_transcripts[call_id][text] = current_time
+        alternatives = [re.escape(p) for p in self.HALLUCINATION_FILTERS if p.strip()]
+        alternatives += self.HALLUCINATION_PATTERNS["*"]
+        if language is not None:
+            alternatives += self.HALLUCINATION_PATTERNS.get(language, [])
         
-        return False
+        matcher = re.compile(
+            r"^(?:" + "|".join(f"(?:{a})" for a in alternatives) + r")$",
+            re.IGNORECASE
+        )
+        self._hallucination_matchers[key] = matcher
+        return matcher
     
-    def is_hallucination(self, text: str) -> bool:
+    def is_hallucination(self, text: str, language: Optional[str] = None) -> bool:
         """
         Check if text is likely a hallucination.
         
         Args:
             text: Text to check
+            language: Language code of the text, enables its patterns
         
         Returns:
             True if likely hallucination, False otherwise
         """
-        clean_text = text.lower().strip(" .?!")
+        clean_text = text.lower().strip(" .?!।")
         
         if not clean_text or len(clean_text) < 2:
             return True
         
-        if clean_text in self.HALLUCINATION_FILTERS:
-            logger.debug(f"Filtered hallucination: '{text}'")
+        if self.get_hallucination_matcher(language).match(clean_text):
+            logger.debug("Filtered hallucination: '%s'", text)
             return True
         
         return False
     
+    def get_rejection_reason(self, segment: Any) -> Optional[str]:
+        """
+        Check a Whisper segment's confidence metadata.
+        
+        As in Whisper's own silence rule, a segment counts as non-speech
+        only when it is both likely silent and decoded with low
+        confidence, so quiet real speech survives. Filler phrases are not
+        matched here: "thank you" inside a longer utterance is real speech,
+        and process() checks the joined text as a whole.
+        
+        Args:
+            segment: Segment from the model's transcribe()
+        
+        Returns:
+            Reason the segment should be dropped, or None to keep it
+        """
+        config = settings.whisper
+        if (
+            segment.no_speech_prob > config.segment_max_no_speech_prob
+            and segment.avg_logprob < config.segment_min_avg_logprob
+        ):
+            return f"no_speech_prob={segment.no_speech_prob:.2f}, avg_logprob={segment.avg_logprob:.2f}"
+        
+        if segment.compression_ratio > config.segment_max_compression_ratio:
+            return f"compression_ratio={segment.compression_ratio:.2f}"
+        
+        return None
+    
     def transcribe(
         self,
-        file_path: str,
-        source_lang: str
+        audio: Union[str, np.ndarray],
+        source_lang: Optional[str],
+        is_cancelled: Optional[Callable[[], bool]] = None,
+        tier: Optional[QualityTier] = None,
+        window: Optional[Tuple[float, float]] = None,
+        offset_map: Optional[OffsetMap] = None,
+        on_info: Optional[Callable[[Any], None]] = None
     ) -> str:
         """
-        Transcribe audio file using Whisper.
+        Transcribe audio using Whisper.
         
         Args:
-            file_path: Path to audio file
-            source_lang: Source language code
+            audio: Path to a WAV file, or float32 samples at 16 kHz
+            source_lang: Source language code (None = let Whisper detect it)
+            is_cancelled: Polled between segments; decoding stops early
+                once it returns True
+            tier: Quality tier to decode with (defaults to configured model)
+            window: (start, end) in seconds of the part of the audio this
+                chunk owns; words centred outside it belong to the
+                neighbouring overlapping chunk and are dropped
+            offset_map: Maps times in trimmed audio back to the chunk
+            on_info: Receives the TranscriptionInfo (detected language)
+                before segments are decoded
         
         Returns:
             Transcribed text
+        
+        Raises:
+            TranscriptionCancelled: If is_cancelled returned True
         """
         try:
-            segments, info = self.model.transcribe(
-                file_path,
-                language=source_lang,
-                beam_size=settings.whisper.beam_size,
-                condition_on_previous_text=False,
-                no_speech_threshold=settings.whisper.no_speech_threshold,
-                vad_filter=settings.whisper.vad_filter,
-                vad_parameters=dict(
-                    min_silence_duration_ms=settings.whisper.vad_min_silence_duration_ms
+            pool = self.get_pool(tier.model_size if tier else None)
+            
+            # Segments decode lazily, so the replica is held while iterating
+            with pool.acquire() as model:
+                segments, info = model.transcribe(
+                    audio,
+                    language=source_lang,
+                    beam_size=tier.beam_size if tier else settings.whisper.beam_size,
+                    condition_on_previous_text=False,
+                    word_timestamps=window is not None,
+                    no_speech_threshold=settings.whisper.no_speech_threshold,
+                    vad_filter=settings.whisper.vad_filter,
+                    vad_parameters=dict(
+                        min_silence_duration_ms=settings.whisper.vad_min_silence_duration_ms
+                    )
                 )
-            )
+                
+                if on_info is not None:
+                    on_info(info)
+                
+                # Stopping early here saves decoding the remaining segments
+                parts = []
+                for segment in segments:
+                    if is_cancelled is not None and is_cancelled():
+                        raise TranscriptionCancelled()
+                    
+                    # Drop likely silence and repetitive segments
+                    reason = self.get_rejection_reason(segment)
+                    if reason is not None:
+                        logger.debug("Dropped segment (%s): '%s'", reason, segment.text)
+                        continue
+                    
+                    if window is None:
+                        parts.append(segment.text)
+                    else:
+                        parts.append(self.words_in_window(segment, window, offset_map))
             
-            text = "".join([segment.text for segment in segments]).strip()
-            logger.debug(f"Transcribed: '{text}'")
+            text = "".join(parts).strip()
+            logger.debug("Transcribed: '%s'", text)
             return text
         
+        except TranscriptionCancelled:
+            raise
+        
         except Exception as e:
             logger.error(f"Transcription error: {e}")
             raise
     
+    def detect_language(self, audio: Union[str, np.ndarray], tier: Optional[QualityTier] = None) -> Any:
+        """
+        Run language identification only, without decoding any text.
+        
+        Args:
+            audio: Path to a WAV file, or float32 samples at 16 kHz
+            tier: Quality tier whose model to use
+        
+        Returns:
+            TranscriptionInfo with language and language_probability
+        """
+        pool = self.get_pool(tier.model_size if tier else None)
+        with pool.acquire() as model:
+            # Detection runs eagerly; the segment generator is never consumed
+            _, info = model.transcribe(audio, language=None)
+        return info
+    
+    @staticmethod
+    def words_in_window(
+        segment: Any,
+        window: Tuple[float, float],
+        offset_map: Optional[OffsetMap] = None
+    ) -> str:
+        """
+        Text of the words of a segment that fall inside a time window.
+        
+        A word belongs to the window its midpoint falls in, so a word
+        spanning the cut between two overlapping chunks is kept by exactly
+        one of them.
+        
+        Args:
+            segment: Segment decoded with word timestamps
+            window: (start, end) in seconds, relative to the chunk
+            offset_map: Maps decoded times back to the chunk if the audio
+                was trimmed before decoding
+        
+        Returns:
+            Text of the kept words
+        """
+        start, end = window
+        
+        def inside(t0: float, t1: float) -> bool:
+            midpoint = (t0 + t1) / 2
+            if offset_map is not None:
+                midpoint = offset_map.to_original(midpoint)
+            return start <= midpoint < end
+        
+        words = segment.words
+        if not words:
+            return segment.text if inside(segment.start, segment.end) else ""
+        return "".join(w.word for w in words if inside(w.start, w.end))
+    
+    def lookup_cached(self, cache_key: bytes, session: CallSession) -> Optional[STTResult]:
+        """
+        Get the result of an identical chunk transcribed before.
+        
+        Args:
+            cache_key: Result cache key of the chunk
+            session: Session the chunk was received on
+        
+        Returns:
+            STTResult with duplicate filtering applied, or None on a miss
+        """
+        result = self.result_cache.get(cache_key)
+        if result is None:
+            return None
+        
+        logger.debug("STT cache hit for %s/%s", session.call_id, session.user_id)
+        if result.source_text and self.is_duplicate_transcript(
+            result.source_text, session.transcript_window
+        ):
+            return STTResult(success=True, source_text="", translated_text="")
+        return result
+    
     def process(
         self,
-        file_path: str,
+        audio: Union[str, np.ndarray],
         source_lang: str,
-        call_id: str
+        session: CallSession,
+        tier: Optional[QualityTier] = None,
+        window: Optional[Tuple[float, float]] = None,
+        offset_map: Optional[OffsetMap] = None,
+        cache_key: Optional[bytes] = None
     ) -> STTResult:
         """
-        Process audio file for transcription with filtering.
+        Process audio for transcription with filtering.
         
         Args:
-            file_path: Path to audio file
+            audio: Path to a WAV file, or float32 samples at 16 kHz
             source_lang: Source language code
-            call_id: Call identifier
+            session: Session the audio belongs to
+            tier: Quality tier to decode with
+            window: Part of the chunk it owns when chunks overlap
+            offset_map: Maps times in trimmed audio back to the chunk
+            cache_key: Result cache key of the chunk (None = don't cache)
         
         Returns:
             STTResult with transcription
         """
+        if session.cancelled:
+            return STTResult(success=True, source_text="", translated_text="")
+        
+        # "auto" sessions let Whisper detect the language until it locks
+        detector = session.language
+        if detector is not None:
+            source_lang = detector.locked
+        detected: List[Any] = []
+        
         try:
             # Transcribe
-            source_text = self.transcribe(file_path, source_lang)
+            source_text = self.transcribe(
+                audio,
+                source_lang,
+                is_cancelled=lambda: session.cancelled,
+                tier=tier,
+                window=window,
+                offset_map=offset_map,
+                on_info=detected.append if source_lang is None else None
+            )
+            
+            if detected:
+                source_lang = detector.pick(detected[0])[0]
             
             # Filter hallucinations
-            if self.is_hallucination(source_text):
+            if self.is_hallucination(source_text, source_lang):
+                source_text = ""
+            
+            result = STTResult(
+                success=True,
+                source_text=source_text,
+                translated_text="",
+                tier=tier.name if tier else None,
+                language=source_lang
+            )
+            # Cached before duplicate filtering, which depends on the session
+            if cache_key is not None and not detected:
+                self.result_cache.put(cache_key, result)
+            
+            if not source_text:
                 return STTResult(success=True, source_text="", translated_text="")
             
+            # Only chunks with real speech take part in the language vote
+            if detected:
+                detector.observe(detected[0])
+                session.source_lang = detector.best_guess
+            
             # Check for duplicates
-            if self.is_duplicate_transcript(source_text, call_id):
+            if self.is_duplicate_transcript(source_text, session.transcript_window):
                 return STTResult(success=True, source_text="", translated_text="")
             
-            return STTResult(success=True, source_text=source_text, translated_text="")
+            return result
+        
+        except TranscriptionCancelled:
+            logger.debug(f"Transcription abandoned for ended call {session.call_id}")
+            return STTResult(success=True, source_text="", translated_text="")
         
         except Exception as e:
             logger.error(f"STT processing error: {e}")
@@ -0,0 +1,216 @@
+"""
+Deterministic stub backends for Bhasha Setu backend.
+Stand-ins for Whisper and MarianMT that need no models or network access,
+so the server's own overhead can be benchmarked and tested in isolation.
+"""
+import hashlib
+import time
+import wave
+from typing import Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from config import settings
+
+# Vocabulary for generated transcripts
+STUB_VOCABULARY = [
+    "hello", "how", "are", "you", "today", "the", "weather", "is", "nice",
+    "please", "call", "me", "tomorrow", "morning", "we", "will", "meet",
+    "at", "station", "market", "price", "of", "rice", "has", "gone", "up",
+    "my", "brother", "lives", "in", "pune", "train", "was", "late", "again",
+    "thank", "doctor", "said", "rest", "for", "two", "days", "school",
+]
+
+# Words generated per second of audio, roughly conversational speed
+STUB_WORDS_PER_SECOND = 2.5
+
+_BURN_SIZE = 64
+
+
+def burn_cpu(milliseconds: float) -> None:
+    """
+    Keep a core busy for the given time.
+
+    Uses small matrix products, which release the GIL like real inference
+    kernels do, so concurrent burns scale across cores.
+
+    Args:
+        milliseconds: CPU time to burn
+    """
+    if milliseconds <= 0:
+        return
+
+    deadline = time.perf_counter() + milliseconds / 1000
+    a = np.full((_BURN_SIZE, _BURN_SIZE), 0.5, dtype=np.float32)
+    while time.perf_counter() < deadline:
+        a = np.tanh(a @ a)
+
+
+def simulate_work(latency_ms: float, cpu_ms: float) -> None:
+    """Burn cpu_ms of CPU, then wait out the rest of latency_ms"""
+    started = time.perf_counter()
+    burn_cpu(cpu_ms)
+    remaining = latency_ms / 1000 - (time.perf_counter() - started)
+    if remaining > 0:
+        time.sleep(remaining)
+
+
+class StubWord:
+    """Word with timestamps, shaped like faster_whisper.transcribe.Word"""
+    __slots__ = ("start", "end", "word", "probability")
+
+    def __init__(self, start: float, end: float, word: str, probability: float = 0.9):
+        self.start = start
+        self.end = end
+        self.word = word
+        self.probability = probability
+
+
+class StubSegment:
+    """Transcribed segment, shaped like faster_whisper.transcribe.Segment"""
+    __slots__ = (
+        "id", "start", "end", "text", "avg_logprob",
+        "compression_ratio", "no_speech_prob", "words",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        start: float,
+        end: float,
+        text: str,
+        words: Optional[List[StubWord]] = None
+    ):
+        self.id = id
+        self.start = start
+        self.end = end
+        self.text = text
+        self.avg_logprob = -0.2
+        self.compression_ratio = 1.2
+        self.no_speech_prob = 0.01
+        self.words = words
+
+
+class StubTranscriptionInfo:
+    """Transcription info, shaped like faster_whisper.transcribe.TranscriptionInfo"""
+    __slots__ = ("language", "language_probability", "duration")
+
+    def __init__(self, language: str, language_probability: float, duration: float):
+        self.language = language
+        self.language_probability = language_probability
+        self.duration = duration
+
+
+class StubWhisperModel:
+    """
+    Drop-in replacement for faster_whisper.WhisperModel.
+
+    The transcript is derived from a hash of the audio, so the same audio
+    always produces the same text and different audio almost never does.
+    """
+
+    def __init__(
+        self,
+        latency_ms: Optional[float] = None,
+        cpu_ms: Optional[float] = None,
+        seed: Optional[int] = None
+    ):
+        self.latency_ms = settings.stub.stt_latency_ms if latency_ms is None else latency_ms
+        self.cpu_ms = settings.stub.stt_cpu_ms if cpu_ms is None else cpu_ms
+        self.seed = settings.stub.seed if seed is None else seed
+
+    def _read_audio(self, audio: Union[str, np.ndarray]) -> Tuple[bytes, float]:
+        if isinstance(audio, np.ndarray):
+            data = np.asarray(audio, dtype=np.float32).tobytes()
+            return data, len(audio) / settings.audio.sample_rate
+
+        with wave.open(audio, 'rb') as wf:
+            frames = wf.readframes(wf.getnframes())
+            return frames, wf.getnframes() / float(wf.getframerate())
+
+    def _generate_words(self, data: bytes, duration: float) -> List[str]:
+        digest = hashlib.blake2b(data, digest_size=8, salt=self.seed.to_bytes(8, "little"))
+        rng = np.random.default_rng(int.from_bytes(digest.digest(), "little"))
+        count = max(1, int(round(duration * STUB_WORDS_PER_SECOND)))
+        indices = rng.integers(0, len(STUB_VOCABULARY), size=count)
+        return [STUB_VOCABULARY[i] for i in indices]
+
+    def transcribe(
+        self,
+        audio: Union[str, np.ndarray],
+        language: Optional[str] = None,
+        word_timestamps: bool = False,
+        **kwargs
+    ) -> Tuple[Iterator[StubSegment], StubTranscriptionInfo]:
+        """
+        Produce a deterministic transcript for the audio.
+
+        Accepts and ignores the decoding options of the real model.
+
+        Returns:
+            Lazy segment iterator and transcription info, like faster-whisper
+        """
+        data, duration = self._read_audio(audio)
+        info = StubTranscriptionInfo(language or "en", 1.0, duration)
+
+        def segments() -> Iterator[StubSegment]:
+            simulate_work(self.latency_ms, self.cpu_ms)
+            words = self._generate_words(data, duration)
+            step = duration / len(words) if duration > 0 else 0.0
+            stub_words = [
+                StubWord(i * step, (i + 1) * step, f" {word}")
+                for i, word in enumerate(words)
+            ]
+            yield StubSegment(
+                0,
+                0.0,
+                duration,
+                " " + " ".join(words),
+                words=stub_words if word_timestamps else None
+            )
+
+        return segments(), info
+
+
+class StubTranslator:
+    """Deterministic translator that tags text with the target language"""
+
+    def __init__(
+        self,
+        latency_ms: Optional[float] = None,
+        cpu_ms: Optional[float] = None
+    ):
+        self.latency_ms = (
+            settings.stub.translation_latency_ms if latency_ms is None else latency_ms
+        )
+        self.cpu_ms = settings.stub.translation_cpu_ms if cpu_ms is None else cpu_ms
+
+    def translate(self, text: str, from_lang: str, to_lang: str) -> str:
+        """
+        Translate text.
+
+        Args:
+            text: Text to translate
+            from_lang: Source language code
+            to_lang: Target language code
+
+        Returns:
+            Text prefixed with the target language code
+        """
+        simulate_work(self.latency_ms, self.cpu_ms)
+        return f"[{to_lang}] {text}"
+
+    def translate_batch(self, texts: List[str], from_lang: str, to_lang: str) -> List[str]:
+        """
+        Translate several texts in one simulated model call.
+
+        Args:
+            texts: Texts to translate
+            from_lang: Source language code
+            to_lang: Target language code
+
+        Returns:
+            Translations in input order
+        """
+        simulate_work(self.latency_ms, self.cpu_ms)
+        return [f"[{to_lang}] {text}" for text in texts]
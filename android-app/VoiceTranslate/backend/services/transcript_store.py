@@ -0,0 +1,257 @@
+"""
+Transcript history for Bhasha Setu backend.
+Transcripts are queued in memory as they are broadcast and written to
+SQLite (WAL mode) in batches by a background task, so live calls never
+wait on disk.
+"""
+import asyncio
+import os
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, List, Optional, Tuple
+from config import settings
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    call_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    source_lang TEXT NOT NULL,
+    target_lang TEXT NOT NULL,
+    source_text TEXT NOT NULL,
+    translated_text TEXT NOT NULL,
+    tier TEXT,
+    utterance_id TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transcripts_call ON transcripts (call_id, id);
+"""
+
+_INSERT = (
+    "INSERT INTO transcripts (call_id, user_id, source_lang, target_lang, "
+    "source_text, translated_text, tier, utterance_id, created_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+_COLUMNS = (
+    "id", "call_id", "user_id", "source_lang", "target_lang",
+    "source_text", "translated_text", "tier", "utterance_id", "created_at"
+)
+
+# call_id, user_id, source_lang, target_lang, source, translated, tier,
+# utterance_id, created_at
+Row = Tuple[str, str, str, str, str, str, Optional[str], Optional[str], float]
+
+
+class TranscriptStore:
+    """
+    Write-behind transcript store.
+
+    record() only appends to an in-memory queue. A background task writes
+    the queue in one transaction every TRANSCRIPTS__FLUSH_INTERVAL_SECONDS,
+    or sooner once TRANSCRIPTS__BATCH_SIZE rows are waiting, on a single
+    writer thread that owns the connection. Reads open their own
+    connection; in WAL mode they do not block the writer.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Args:
+            db_path: SQLite database file (None = TRANSCRIPTS__DB_PATH)
+        """
+        config = settings.transcripts
+        self.db_path = db_path or config.db_path
+        self.batch_size = config.batch_size
+        self.flush_interval = config.flush_interval_seconds
+
+        self._pending: Deque[Row] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        # One thread owns the write connection
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="transcripts")
+
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.errors = 0
+        self.last_flush_ms: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.db_path)
+
+    def _open(self) -> None:
+        """Create the database and schema (writer thread)"""
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL with NORMAL sync survives a process crash; only an OS crash
+        # can lose the last transactions
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def _write(self, rows: List[Row]) -> None:
+        """Insert a batch in one transaction (writer thread)"""
+        with self._conn:
+            self._conn.executemany(_INSERT, rows)
+
+    def _close(self) -> None:
+        """Close the write connection (writer thread)"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def start(self) -> None:
+        """Open the database and start the flush task"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._writer, self._open)
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self.run())
+        logger.info(f"Transcript store at {self.db_path}")
+
+    async def stop(self) -> None:
+        """Write what is still queued and close the database"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._writer, self._close)
+        self._writer.shutdown(wait=True)
+
+    def record(
+        self,
+        call_id: str,
+        user_id: str,
+        source_lang: str,
+        target_lang: str,
+        source_text: str,
+        translated_text: str,
+        tier: Optional[str] = None,
+        utterance_id: Optional[str] = None
+    ) -> None:
+        """
+        Queue a transcript for writing. Never blocks.
+
+        Once TRANSCRIPTS__MAX_PENDING rows are queued (e.g. the disk has
+        stalled) the oldest are dropped.
+
+        Args:
+            call_id: Call identifier
+            user_id: Participant who spoke
+            source_lang: Language spoken
+            target_lang: Language translated to
+            source_text: Transcription
+            translated_text: Translation
+            tier: STT tier that produced the transcription
+            utterance_id: Archived audio of the transcript
+        """
+        if self._task is None:
+            return
+        if len(self._pending) >= settings.transcripts.max_pending:
+            self._pending.popleft()
+            self.dropped += 1
+        self._pending.append((
+            call_id, user_id, source_lang, target_lang,
+            source_text, translated_text, tier, utterance_id, time.time()
+        ))
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        """Write every queued transcript"""
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            count = min(len(self._pending), self.batch_size)
+            rows = [self._pending.popleft() for _ in range(count)]
+            started = time.perf_counter()
+            try:
+                await loop.run_in_executor(self._writer, self._write, rows)
+            except sqlite3.Error as e:
+                self.errors += 1
+                logger.error(f"Failed to write {len(rows)} transcript(s): {e}")
+                # Put the batch back for the next flush, behind the limit
+                room = settings.transcripts.max_pending - len(self._pending)
+                self.dropped += max(0, len(rows) - room)
+                self._pending.extendleft(reversed(rows[:max(0, room)]))
+                return
+            self.written += len(rows)
+            self.batches += 1
+            self.last_flush_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    async def run(self) -> None:
+        """Flush on an interval, or early when a batch fills up"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def _read_page(self, call_id: str, after: int, limit: int) -> List[dict]:
+        """Read one page of a call's transcripts (any thread)"""
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM transcripts "
+                "WHERE call_id = ? AND id > ? ORDER BY id LIMIT ?",
+                (call_id, after, limit)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [dict(zip(_COLUMNS, row)) for row in rows]
+
+    async def query(self, call_id: str, after: int = 0, limit: Optional[int] = None) -> dict:
+        """
+        Page through a call's stored transcripts in spoken order.
+
+        Transcripts still queued for writing are not included yet.
+
+        Args:
+            call_id: Call identifier
+            after: Return transcripts with an id greater than this
+                (the previous page's next_after)
+            limit: Page size (capped at TRANSCRIPTS__MAX_PAGE_SIZE)
+
+        Returns:
+            Dict with the transcripts and the cursor of the next page
+            (None on the last page)
+        """
+        config = settings.transcripts
+        limit = max(1, min(limit or config.page_size, config.max_page_size))
+        # Fetch one extra row to know whether another page follows
+        rows = await asyncio.get_running_loop().run_in_executor(
+            None, self._read_page, call_id, after, limit + 1
+        )
+        more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "call_id": call_id,
+            "transcripts": rows,
+            "next_after": rows[-1]["id"] if more else None,
+        }
+
+    def get_stats(self) -> dict:
+        """Get write-behind queue and flush counters"""
+        return {
+            "pending": len(self._pending),
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "errors": self.errors,
+            "last_flush_ms": self.last_flush_ms,
+        }
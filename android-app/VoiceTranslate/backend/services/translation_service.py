@@ -3,11 +3,12 @@ Translation service for Bhasha Setu backend.
 Handles translation model management and text translation.
 """
 import os
-import torch
-from typing import Dict, Tuple, Optional
-from transformers import MarianMTModel, MarianTokenizer
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple, Optional
 from config import settings
+from services.stub_backends import StubTranslator
 from utils.logger import get_logger
+from utils.thread_budget import configure_torch_threads, get_thread_budget, pin_current_thread
 
 os.environ['TRANSFORMERS_NO_TF'] = '1'
 
@@ -18,14 +19,33 @@ class TranslationService:
     """Service for translation operations"""
     
     def __init__(self):
-        self.model_cache: Dict[str, Tuple[MarianMTModel, MarianTokenizer]] = {}
+        self.model_cache: Dict[str, Tuple[Any, Any]] = {}
+        self.stub: Optional[StubTranslator] = None
+        
+        # A single worker keeps concurrent generate() calls from each
+        # claiming the MT cores; torch parallelizes within the call
+        budget = get_thread_budget()
+        self.executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="mt",
+            initializer=pin_current_thread,
+            initargs=(budget.mt_cpus,)
+        )
+        
+        backend = settings.translation.backend
+        if backend == "stub":
+            self.stub = StubTranslator()
+            logger.info("Using stub translation backend")
+        elif backend != "marian":
+            raise ValueError(f"Unknown translation backend: {backend}")
+        
         logger.info("Translation service initialized")
     
     def get_model_and_tokenizer(
         self,
         from_lang: str,
         to_lang: str
-    ) -> Optional[Tuple[MarianMTModel, MarianTokenizer]]:
+    ) -> Optional[Tuple[Any, Any]]:
         """
         Get or load translation model and tokenizer.
         
@@ -47,6 +67,10 @@ class TranslationService:
         logger.info(f"Loading translation model: {model_name}")
         
         try:
+            from transformers import MarianMTModel, MarianTokenizer
+            
+            configure_torch_threads()
+            
             tokenizer = MarianTokenizer.from_pretrained(model_name)
             model = MarianMTModel.from_pretrained(model_name)
             
@@ -81,27 +105,67 @@ class TranslationService:
         if not text or from_lang == to_lang:
             return text
         
+        return self.translate_batch([text], from_lang, to_lang)[0]
+    
+    def translate_batch(
+        self,
+        texts: List[str],
+        from_lang: str,
+        to_lang: str
+    ) -> List[str]:
+        """
+        Translate several texts of one language pair in a single generate call.
+        
+        Args:
+            texts: Texts to translate
+            from_lang: Source language code
+            to_lang: Target language code
+        
+        Returns:
+            Translated texts in input order
+        """
+        if not texts or from_lang == to_lang:
+            return list(texts)
+        
+        if self.stub is not None:
+            return self.stub.translate_batch(texts, from_lang, to_lang)
+        
         # Get model and tokenizer
         result = self.get_model_and_tokenizer(from_lang, to_lang)
         if result is None:
             logger.error(f"Translation model unavailable for {from_lang}-{to_lang}")
-            return "[Translation Model Unavailable]"
+            return ["[Translation Model Unavailable]"] * len(texts)
         
         model, tokenizer = result
         
         try:
+            import torch
+            
             # Translate
-            batch = tokenizer([text], return_tensors="pt", padding=True)
+            batch = tokenizer(texts, return_tensors="pt", padding=True)
             with torch.no_grad():
                 generated_ids = model.generate(**batch)
-            translated = tokenizer.batch_decode(generated_ids, skip_special_tokens=True)[0]
+            translated = tokenizer.batch_decode(generated_ids, skip_special_tokens=True)
             
-            logger.debug(f"Translated '{text}' -> '{translated}' ({from_lang}-{to_lang})")
+            logger.debug(f"Translated {len(texts)} text(s) ({from_lang}-{to_lang})")
             return translated
         
         except Exception as e:
             logger.error(f"Translation error: {e}")
-            return "[Translation Failed]"
+            return ["[Translation Failed]"] * len(texts)
+    
+    def evict(self, from_lang: str, to_lang: str) -> bool:
+        """
+        Drop a cached model, e.g. after its pair moved to another worker.
+        
+        Args:
+            from_lang: Source language code
+            to_lang: Target language code
+        
+        Returns:
+            True if a model was dropped
+        """
+        return self.model_cache.pop(f"{from_lang}-{to_lang}", None) is not None
     
     def clear_cache(self) -> None:
         """Clear all cached models"""
@@ -0,0 +1,535 @@
+"""
+Translation worker processes for Bhasha Setu backend.
+Runs MarianMT outside the API process so translation never competes with
+request handling for the GIL. Each worker owns a subset of language pairs
+and loads only those models; requests are routed by pair over a private
+socket, batched per worker, and pairs are reassigned as traffic shifts.
+"""
+import asyncio
+import itertools
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pipe
+from multiprocessing.connection import Connection
+from typing import Dict, List, Optional, Set, Tuple
+from config import settings
+from utils.logger import get_logger
+from utils.thread_budget import get_thread_budget
+
+logger = get_logger(__name__)
+
+Pair = Tuple[str, str]
+
+# Directory containing config.py, so workers import the same modules
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Pairs are moved only if the busiest worker carries this much more load
+# than the best assignment found, since every move costs a model load
+REBALANCE_TOLERANCE = 1.25
+
+# Weight kept by past load at each rebalancing pass
+LOAD_DECAY = 0.5
+
+TRANSLATION_FAILED = "[Translation Failed]"
+
+
+class WorkerFailed(Exception):
+    """Raised for requests lost because their worker process exited"""
+
+
+class WorkerHandle:
+    """API-process side of one translation worker"""
+
+    def __init__(self, worker_id: int, threads: int, cpus: List[int]):
+        self.worker_id = worker_id
+        self.threads = threads
+        self.cpus = cpus
+        self.process: Optional[subprocess.Popen] = None
+        self.conn: Optional[Connection] = None
+        self.alive = False
+        # Pipe writes block while the worker is busy and the OS buffer is
+        # full, so they run on their own thread, in order
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"mt-writer-{worker_id}")
+
+        # Requests and control messages waiting to be batched
+        self.queue: "asyncio.Queue[tuple]" = asyncio.Queue()
+        # Requests sent and not yet answered: {request_id: future}
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.pairs: Set[Pair] = set()
+        self.batcher: Optional[asyncio.Task] = None
+        self.restarter: Optional[asyncio.Task] = None
+        self.started_at = 0.0
+        # Delay before the next restart; grows while the worker keeps crashing
+        self.backoff = 0.0
+
+        self.requests = 0
+        self.batches = 0
+        self.restarts = 0
+
+    def get_stats(self, load: Dict[Pair, float]) -> dict:
+        """Get worker state"""
+        return {
+            "worker_id": self.worker_id,
+            "pid": self.process.pid if self.process else None,
+            "alive": self.alive,
+            "threads": self.threads,
+            "pairs": sorted(f"{src}-{tgt}" for src, tgt in self.pairs),
+            "queued": self.queue.qsize(),
+            "in_flight": len(self.pending),
+            "requests": self.requests,
+            "batches": self.batches,
+            "restarts": self.restarts,
+            "restart_backoff_seconds": self.backoff,
+            "load_seconds": round(sum(load.get(p, 0.0) for p in self.pairs), 3),
+        }
+
+
+class TranslationWorkerPool:
+    """Routes translation requests to worker processes by language pair"""
+
+    def __init__(self, workers: int):
+        """
+        Args:
+            workers: Number of worker processes
+        """
+        # Each worker gets an equal slice of the MT tier's cores
+        budget = get_thread_budget()
+        threads = max(1, budget.mt_cores // workers)
+        self.workers: List[WorkerHandle] = []
+        for i in range(workers):
+            cpus = budget.mt_cpus[i * threads:(i + 1) * threads] if budget.pinned else []
+            self.workers.append(WorkerHandle(i, threads, cpus))
+
+        self.assignment: Dict[Pair, WorkerHandle] = {}
+        # Worker seconds spent per pair, decayed at each rebalancing pass
+        self.load: Dict[Pair, float] = {}
+        self.rebalances = 0
+        self.pairs_moved = 0
+
+        self._ids = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._rebalancer: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    async def start(self) -> None:
+        """Launch the worker processes"""
+        self._loop = asyncio.get_running_loop()
+        for worker in self.workers:
+            self._spawn(worker)
+            worker.batcher = asyncio.create_task(self._run_batcher(worker))
+        self._rebalancer = asyncio.create_task(self._run_rebalancer())
+        logger.info(
+            f"Started {len(self.workers)} translation worker(s) "
+            f"x {self.workers[0].threads} thread(s)"
+        )
+
+    async def stop(self) -> None:
+        """Stop the worker processes"""
+        self._stopping = True
+        if self._rebalancer is not None:
+            self._rebalancer.cancel()
+
+        for worker in self.workers:
+            if worker.batcher is not None:
+                worker.batcher.cancel()
+            if worker.restarter is not None:
+                worker.restarter.cancel()
+            if worker.alive:
+                worker.writer.submit(self._send_quietly, worker.conn, ("stop",))
+            worker.writer.shutdown(wait=False)
+            self._fail_pending(worker)
+
+        loop = asyncio.get_running_loop()
+        for worker in self.workers:
+            if worker.process is not None:
+                await loop.run_in_executor(None, self._reap, worker.process)
+
+    @staticmethod
+    def _send_quietly(conn: Connection, message: tuple) -> None:
+        try:
+            conn.send(message)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _reap(process: subprocess.Popen) -> None:
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def _spawn(self, worker: WorkerHandle) -> None:
+        parent_conn, child_conn = Pipe()
+
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            path for path in (BACKEND_DIR, env.get("PYTHONPATH")) if path
+        )
+        # Workers use this process's effective settings, which may have
+        # been changed after the environment was read (e.g. benchmarks)
+        env["TRANSLATION__BACKEND"] = settings.translation.backend
+        env["TRANSLATION__MODEL_PREFIX"] = settings.translation.model_prefix
+        env["TRANSLATION__CACHE_MODELS"] = str(settings.translation.cache_models)
+        env["STUB__TRANSLATION_LATENCY_MS"] = str(settings.stub.translation_latency_ms)
+        env["STUB__TRANSLATION_CPU_MS"] = str(settings.stub.translation_cpu_ms)
+
+        fd = child_conn.fileno()
+        worker.process = subprocess.Popen(
+            [
+                sys.executable, "-m", "services.translation_workers",
+                str(fd), str(worker.worker_id), str(worker.threads),
+                ",".join(str(cpu) for cpu in worker.cpus),
+            ],
+            env=env,
+            pass_fds=(fd,)
+        )
+        child_conn.close()
+
+        worker.conn = parent_conn
+        worker.alive = True
+        worker.started_at = time.monotonic()
+        threading.Thread(
+            target=self._read_results,
+            args=(worker, parent_conn),
+            name=f"mt-reader-{worker.worker_id}",
+            daemon=True
+        ).start()
+
+    def _read_results(self, worker: WorkerHandle, conn: Connection) -> None:
+        """Receive results from one worker (runs in a reader thread)"""
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                break
+            self._loop.call_soon_threadsafe(self._deliver, worker, message[1], message[2])
+
+        try:
+            self._loop.call_soon_threadsafe(self._on_exit, worker, conn)
+        except RuntimeError:
+            # Event loop already closed during shutdown
+            pass
+
+    def _deliver(
+        self,
+        worker: WorkerHandle,
+        results: List[Tuple[int, str]],
+        busy: Dict[Pair, float]
+    ) -> None:
+        for request_id, text in results:
+            future = worker.pending.pop(request_id, None)
+            if future is not None and not future.done():
+                future.set_result(text)
+        for pair, seconds in busy.items():
+            self.load[pair] = self.load.get(pair, 0.0) + seconds
+
+    def _fail_pending(self, worker: WorkerHandle) -> None:
+        for future in worker.pending.values():
+            if not future.done():
+                future.set_exception(WorkerFailed(f"Translation worker {worker.worker_id} exited"))
+        worker.pending.clear()
+
+    def _on_exit(self, worker: WorkerHandle, conn: Connection) -> None:
+        if worker.conn is not conn:
+            return
+        worker.alive = False
+        self._fail_pending(worker)
+
+        if self._stopping:
+            # The writer is shut down and the stop message already sent
+            conn.close()
+            return
+        # Behind any write still in progress on the writer thread
+        worker.writer.submit(conn.close)
+
+        # Live workers take over the pairs until this one is back, so a
+        # crash-looping worker cannot keep its pairs down
+        live = self._live_workers()
+        if live:
+            for pair in list(worker.pairs):
+                self._assign(pair, min(live, key=lambda w: (self._worker_load(w), len(w.pairs))))
+        worker.restarter = asyncio.create_task(self._restart(worker))
+
+    async def _restart(self, worker: WorkerHandle) -> None:
+        """Reap an exited worker and start it again, backing off while it keeps crashing"""
+        config = settings.translation
+        if worker.process is not None:
+            # Waiting for the exit status can block; keep it off the loop
+            await asyncio.get_running_loop().run_in_executor(None, self._reap, worker.process)
+        code = worker.process.returncode if worker.process else None
+
+        # A worker that ran for a while restarts at once; one that crashes
+        # again soon after starting (bad model, import error) waits longer
+        # each time, up to the cap
+        if time.monotonic() - worker.started_at >= config.worker_restart_max_backoff_seconds:
+            worker.backoff = 0.0
+        delay = worker.backoff
+        worker.backoff = min(
+            config.worker_restart_max_backoff_seconds,
+            max(config.worker_restart_backoff_seconds, worker.backoff * 2)
+        )
+
+        logger.error(
+            f"Translation worker {worker.worker_id} exited (code {code}), "
+            f"restarting in {delay:.1f}s"
+        )
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self._stopping:
+            return
+        worker.restarts += 1
+        self._spawn(worker)
+
+    async def translate(self, text: str, from_lang: str, to_lang: str) -> str:
+        """
+        Translate text on the worker that owns the language pair.
+
+        Args:
+            text: Text to translate
+            from_lang: Source language code
+            to_lang: Target language code
+
+        Returns:
+            Translated text
+        """
+        if not text or from_lang == to_lang:
+            return text
+
+        worker = self._route((from_lang, to_lang))
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        worker.pending[request_id] = future
+        worker.queue.put_nowait(("translate", request_id, (from_lang, to_lang), text))
+        worker.requests += 1
+
+        try:
+            return await asyncio.wait_for(future, settings.translation.request_timeout_seconds)
+        except asyncio.TimeoutError:
+            logger.error(f"Translation timed out on worker {worker.worker_id} ({from_lang}-{to_lang})")
+            return TRANSLATION_FAILED
+        except WorkerFailed as e:
+            logger.error(f"Translation error: {e}")
+            return TRANSLATION_FAILED
+        finally:
+            worker.pending.pop(request_id, None)
+
+    async def translate_batch(self, texts: List[str], from_lang: str, to_lang: str) -> List[str]:
+        """
+        Translate several texts of one pair; the worker batches them.
+
+        Args:
+            texts: Texts to translate
+            from_lang: Source language code
+            to_lang: Target language code
+
+        Returns:
+            Translations in input order
+        """
+        return list(await asyncio.gather(
+            *(self.translate(text, from_lang, to_lang) for text in texts)
+        ))
+
+    def _worker_load(self, worker: WorkerHandle) -> float:
+        return sum(self.load.get(pair, 0.0) for pair in worker.pairs)
+
+    def _live_workers(self) -> List[WorkerHandle]:
+        return [worker for worker in self.workers if worker.alive]
+
+    def _route(self, pair: Pair) -> WorkerHandle:
+        worker = self.assignment.get(pair)
+        if worker is None or not worker.alive:
+            candidates = self._live_workers()
+            if not candidates:
+                # Every worker is restarting; the request fails or waits
+                # on the one the pair already has
+                return worker or self.workers[0]
+            worker = min(candidates, key=lambda w: (self._worker_load(w), len(w.pairs)))
+            self._assign(pair, worker)
+        return worker
+
+    def _assign(self, pair: Pair, worker: WorkerHandle) -> None:
+        previous = self.assignment.get(pair)
+        if previous is worker:
+            return
+        if previous is not None:
+            previous.pairs.discard(pair)
+            # Queued behind the pair's remaining requests on the old worker
+            previous.queue.put_nowait(("evict", pair))
+        self.assignment[pair] = worker
+        worker.pairs.add(pair)
+        logger.debug(f"Pair {pair[0]}-{pair[1]} assigned to translation worker {worker.worker_id}")
+
+    def rebalance(self) -> int:
+        """
+        Reassign pairs to even out observed load.
+
+        Heaviest pairs are placed first, each on the least-loaded worker,
+        preferring the current worker on ties to avoid model reloads.
+
+        Returns:
+            Number of pairs moved
+        """
+        moved = 0
+        live = self._live_workers()
+        if len(live) > 1 and self.load:
+            planned = {worker: 0.0 for worker in live}
+            plan: Dict[Pair, WorkerHandle] = {}
+            for pair in sorted(self.assignment, key=lambda p: self.load.get(p, 0.0), reverse=True):
+                current = self.assignment[pair]
+                best = min(live, key=lambda w: (planned[w], w is not current))
+                plan[pair] = best
+                planned[best] += self.load.get(pair, 0.0)
+
+            current_peak = max(self._worker_load(w) for w in live)
+            planned_peak = max(planned.values())
+            if current_peak > planned_peak * REBALANCE_TOLERANCE:
+                for pair, worker in plan.items():
+                    if self.assignment[pair] is not worker:
+                        self._assign(pair, worker)
+                        moved += 1
+                self.rebalances += 1
+                self.pairs_moved += moved
+                logger.info(
+                    f"Rebalanced translation workers: moved {moved} pair(s), "
+                    f"peak load {current_peak:.2f}s -> {planned_peak:.2f}s"
+                )
+
+        for pair in list(self.load):
+            self.load[pair] *= LOAD_DECAY
+        return moved
+
+    async def _run_rebalancer(self) -> None:
+        interval = settings.translation.rebalance_interval_seconds
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.rebalance()
+            except Exception as e:
+                logger.error(f"Translation rebalancer error: {e}", exc_info=True)
+
+    async def _run_batcher(self, worker: WorkerHandle) -> None:
+        """Collect queued requests into batches and send them to the worker"""
+        config = settings.translation
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await worker.queue.get()]
+            deadline = loop.time() + config.batch_wait_ms / 1000
+            while batch[-1][0] == "translate" and len(batch) < config.batch_size:
+                if worker.queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(worker.queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(worker.queue.get_nowait())
+
+            # Drop requests that timed out while queued
+            requests = [
+                (m[1], m[2], m[3]) for m in batch
+                if m[0] == "translate" and m[1] in worker.pending
+            ]
+            controls = [m for m in batch if m[0] != "translate"]
+
+            try:
+                if requests:
+                    await loop.run_in_executor(worker.writer, worker.conn.send, ("translate", requests))
+                    worker.batches += 1
+                for control in controls:
+                    await loop.run_in_executor(worker.writer, worker.conn.send, control)
+            except (OSError, AttributeError):
+                # Worker is gone; its reader thread restarts it
+                for request_id, _, _ in requests:
+                    future = worker.pending.pop(request_id, None)
+                    if future is not None and not future.done():
+                        future.set_exception(WorkerFailed(f"Translation worker {worker.worker_id} unavailable"))
+
+    def get_stats(self) -> dict:
+        """Get worker pool state"""
+        return {
+            "workers": [worker.get_stats(self.load) for worker in self.workers],
+            "rebalances": self.rebalances,
+            "pairs_moved": self.pairs_moved,
+        }
+
+
+def worker_main(fd: int, worker_id: int, threads: int, cpus: List[int]) -> None:
+    """
+    Serve translation batches over a connection until told to stop.
+
+    Args:
+        fd: File descriptor of the connection to the API process
+        worker_id: Worker index, for logging
+        threads: torch intra-op threads
+        cpus: Cores to pin the process to (empty = no pinning)
+    """
+    from services.translation_service import TranslationService
+    from utils.logger import configure_logging, get_logger
+    from utils.thread_budget import configure_torch_threads
+
+    configure_logging(
+        settings.server.log_level,
+        settings.logging.format,
+        settings.logging.levels,
+        settings.logging.queue_size
+    )
+    log = get_logger(f"mt-worker-{worker_id}")
+    conn = Connection(fd)
+
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+
+    service = TranslationService()
+    if service.stub is None:
+        configure_torch_threads(threads)
+    log.info(f"Translation worker {worker_id} ready (pid {os.getpid()})")
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        kind = message[0]
+        if kind == "stop":
+            break
+
+        if kind == "evict":
+            src, tgt = message[1]
+            if service.evict(src, tgt):
+                log.info(f"Evicted translation model {src}-{tgt}")
+            continue
+
+        # Group the batch by pair; each group is one generate call
+        groups: Dict[Pair, List[Tuple[int, str]]] = {}
+        for request_id, pair, text in message[1]:
+            groups.setdefault(tuple(pair), []).append((request_id, text))
+
+        results: List[Tuple[int, str]] = []
+        busy: Dict[Pair, float] = {}
+        for pair, items in groups.items():
+            started = time.perf_counter()
+            translated = service.translate_batch([text for _, text in items], *pair)
+            busy[pair] = time.perf_counter() - started
+            results.extend(zip((request_id for request_id, _ in items), translated))
+
+        conn.send(("results", results, busy))
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    worker_main(
+        int(sys.argv[1]),
+        int(sys.argv[2]),
+        int(sys.argv[3]),
+        [int(cpu) for cpu in sys.argv[4].split(",") if cpu]
+    )
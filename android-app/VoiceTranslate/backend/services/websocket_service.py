@@ -2,12 +2,14 @@
 WebSocket service for Bhasha Setu backend.
 Handles WebSocket connections, rooms, and message broadcasting.
 """
-from typing import Dict
+from typing import Dict, Optional
 from fastapi import WebSocket
 from models import TranscriptionMessage, ErrorMessage, StatusMessage
-from utils.logger import get_logger
+from utils.logger import get_logger, LogSampler
 
 logger = get_logger(__name__)
+# Relay failures repeat for every frame until the peer is removed
+relay_log = LogSampler(logger)
 
 
 class WebSocketService:
@@ -22,7 +24,8 @@ class WebSocketService:
         self,
         websocket: WebSocket,
         call_id: str,
-        user_id: str
+        user_id: str,
+        details: Optional[dict] = None
     ) -> None:
         """
         Accept WebSocket connection and add to room.
@@ -31,6 +34,7 @@ class WebSocketService:
             websocket: WebSocket connection
             call_id: Call identifier
             user_id: User identifier
+            details: Extra details for the connect status message
         """
         await websocket.accept()
         
@@ -44,19 +48,51 @@ class WebSocketService:
         await self.send_status(
             websocket,
             f"Connected to call {call_id}",
-            {"user_id": user_id, "room_size": len(self.rooms[call_id])}
+            {"user_id": user_id, "room_size": len(self.rooms[call_id]), **(details or {})}
         )
     
-    def disconnect(self, call_id: str, user_id: str) -> None:
+    async def reject(
+        self,
+        websocket: WebSocket,
+        error_message: str,
+        error_code: str,
+        close_code: int
+    ) -> None:
+        """
+        Turn away a connection with an error message it can show.
+        
+        Args:
+            websocket: WebSocket connection (not yet accepted)
+            error_message: Reason shown to the client
+            error_code: Error code for the client
+            close_code: WebSocket close code
+        """
+        try:
+            await websocket.accept()
+            message = ErrorMessage(message=error_message, code=error_code)
+            await websocket.send_json(message.model_dump())
+            await websocket.close(code=close_code, reason=error_message[:120])
+        except Exception as e:
+            logger.debug(f"Failed to reject connection: {e}")
+    
+    def disconnect(
+        self,
+        call_id: str,
+        user_id: str,
+        websocket: Optional[WebSocket] = None
+    ) -> None:
         """
         Remove user from room.
         
         Args:
             call_id: Call identifier
             user_id: User identifier
+            websocket: Only remove the user if this is still their connection
+                (a resumed session may already have replaced it)
         """
         if call_id in self.rooms:
-            if user_id in self.rooms[call_id]:
+            current = self.rooms[call_id].get(user_id)
+            if current is not None and (websocket is None or current is websocket):
                 del self.rooms[call_id][user_id]
                 logger.info(f"User {user_id} left room {call_id}")
             
@@ -70,7 +106,9 @@ class WebSocketService:
         call_id: str,
         source: str,
         translated: str,
-        sender: str
+        sender: str,
+        tier: str = None,
+        utterance_id: str = None
     ) -> None:
         """
         Broadcast transcription to all users in a room.
@@ -80,6 +118,8 @@ class WebSocketService:
             source: Original transcribed text
             translated: Translated text
             sender: Language code of sender
+            tier: Optional STT quality tier
+            utterance_id: Optional ID of the archived audio
         """
         if call_id not in self.rooms:
             logger.warning(f"Attempted to broadcast to non-existent room: {call_id}")
@@ -88,11 +128,13 @@ class WebSocketService:
         message = TranscriptionMessage(
             source=source,
             translated=translated,
-            sender=sender
+            sender=sender,
+            tier=tier,
+            utterance_id=utterance_id
         )
         
         await self._broadcast_json(call_id, message.model_dump())
-        logger.debug(f"Broadcasted transcription to room {call_id}: {source}")
+        logger.debug("Broadcasted transcription to room %s: %s", call_id, source)
     
     async def broadcast_error(
         self,
@@ -157,7 +199,9 @@ class WebSocketService:
                 try:
                     await ws.send_bytes(data)
                 except Exception as e:
-                    logger.error(f"Failed to relay audio to user {uid}: {e}")
+                    relay_log.error(
+                        f"relay:{call_id}/{uid}", "Failed to relay audio to user %s: %s", uid, e
+                    )
     
     async def _broadcast_json(self, call_id: str, data: dict) -> None:
         """
@@ -0,0 +1,163 @@
+"""
+Transcript duplicate suppression for Bhasha Setu backend.
+Bounded per-session window with O(1) exact lookup and expiry, plus
+near-duplicate detection on normalized tokens and character shingles.
+"""
+import sys
+import threading
+import time
+import unicodedata
+from collections import deque
+from typing import Deque, Dict, FrozenSet, Optional, Tuple
+
+# Maps every punctuation character to a space. Built once; str.translate
+# is far cheaper than a per-character category check on every transcript.
+_PUNCTUATION_TABLE = {
+    cp: " "
+    for cp in range(min(sys.maxunicode, 0xFFFF) + 1)
+    if unicodedata.category(chr(cp)).startswith("P")
+}
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize a transcript for comparison.
+
+    Case-folds, drops punctuation (including the Devanagari danda) and
+    collapses whitespace, so "How are you?" and "how are you" compare equal.
+    Combining vowel signs are kept.
+
+    Args:
+        text: Transcribed text
+
+    Returns:
+        Normalized text
+    """
+    return " ".join(text.casefold().translate(_PUNCTUATION_TABLE).split())
+
+
+def shingles(normalized: str, size: int) -> FrozenSet[str]:
+    """
+    Character shingles of normalized text.
+
+    Args:
+        normalized: Output of normalize_text
+        size: Shingle length in characters
+
+    Returns:
+        Set of shingles (the whole text if shorter than size)
+    """
+    if len(normalized) <= size:
+        return frozenset((normalized,))
+    return frozenset(normalized[i:i + size] for i in range(len(normalized) - size + 1))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Jaccard similarity of two sets"""
+    if not a or not b:
+        return 0.0
+    intersection = len(a & b)
+    return intersection / (len(a) + len(b) - intersection)
+
+
+class TranscriptWindow:
+    """
+    Recent transcripts of one session, ordered by time.
+
+    Entries live in a ring ordered by insertion time, so expiry only ever
+    pops from the left. A hash index over normalized text gives O(1)
+    exact-duplicate lookup. The near-duplicate scan is bounded by
+    max_entries.
+
+    Thread-safe: chunks of one session are checked concurrently from STT
+    replica threads and, on cache hits, from the event loop.
+    """
+    __slots__ = (
+        "window_seconds", "max_entries", "near_threshold", "shingle_size",
+        "_ring", "_index", "_lock",
+    )
+
+    def __init__(
+        self,
+        window_seconds: float,
+        max_entries: int = 32,
+        near_threshold: float = 0.8,
+        shingle_size: int = 3
+    ):
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self.near_threshold = near_threshold
+        self.shingle_size = shingle_size
+
+        # (timestamp, normalized text, token set, shingle set)
+        self._ring: Deque[Tuple[float, str, FrozenSet[str], FrozenSet[str]]] = deque()
+        # Normalized text -> number of live ring entries with that text
+        self._index: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ring)
+
+    def _evict_oldest(self) -> None:
+        _, key, _, _ = self._ring.popleft()
+        count = self._index[key] - 1
+        if count:
+            self._index[key] = count
+        else:
+            del self._index[key]
+
+    def expire(self, now: Optional[float] = None) -> None:
+        """Drop entries older than the window"""
+        if now is None:
+            now = time.time()
+        with self._lock:
+            self._expire(now)
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._ring and self._ring[0][0] <= cutoff:
+            self._evict_oldest()
+
+    def check(self, text: str, now: Optional[float] = None) -> Optional[str]:
+        """
+        Check a transcript against the window and record it if new.
+
+        Args:
+            text: Transcribed text
+            now: Current time (defaults to time.time())
+
+        Returns:
+            "exact" or "near" if the text is a duplicate, None otherwise
+        """
+        if now is None:
+            now = time.time()
+
+        # Normalizing and shingling need no lock
+        key = normalize_text(text)
+        tokens = frozenset(key.split())
+        grams = shingles(key, self.shingle_size)
+
+        with self._lock:
+            self._expire(now)
+            if key in self._index:
+                return "exact"
+
+            if self.near_threshold < 1.0:
+                for _, _, other_tokens, other_grams in self._ring:
+                    # Token overlap is cheap and rules out most candidates
+                    if jaccard(tokens, other_tokens) < self.near_threshold / 2:
+                        continue
+                    if jaccard(grams, other_grams) >= self.near_threshold:
+                        return "near"
+
+            if len(self._ring) >= self.max_entries:
+                self._evict_oldest()
+            self._ring.append((now, key, tokens, grams))
+            self._index[key] = self._index.get(key, 0) + 1
+            return None
+
+    def clear(self) -> None:
+        """Forget all entries"""
+        with self._lock:
+            self._ring.clear()
+            self._index.clear()
@@ -1,9 +1,28 @@
 """
 Centralized logging configuration for Bhasha Setu backend.
+
+Records are handed to a queue in the calling thread and formatted and
+written by a listener thread, so a slow stdout never stalls the event
+loop. Hot paths use %-style arguments so messages below the active level
+are never built, and LogSampler caps per-frame events to one record per
+interval.
 """
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
 import sys
-from typing import Optional
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+# Attributes every LogRecord has; anything else came in through `extra`
+_RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional["DroppingQueueHandler"] = None
 
 
 class ColoredFormatter(logging.Formatter):
@@ -19,9 +38,189 @@ class ColoredFormatter(logging.Formatter):
     RESET = '\033[0m'
     
     def format(self, record):
+        # Color a copy: the record is shared with every other handler
         log_color = self.COLORS.get(record.levelname, self.RESET)
-        record.levelname = f"{log_color}{record.levelname}{self.RESET}"
-        return super().format(record)
+        colored = logging.makeLogRecord(record.__dict__)
+        colored.levelname = f"{log_color}{record.levelname}{self.RESET}"
+        return super().format(colored)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including fields passed through `extra`"""
+    
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records instead of blocking when full"""
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def prepare(self, record):
+        # Merge the arguments now, since they may change after this call
+        # returns, but leave timestamps and layout to the listener thread
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+    
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogSampler:
+    """
+    Rate-limits a hot-path log event to one record per interval per key.
+    
+    Suppressed occurrences are counted and reported with the next record.
+    """
+    
+    def __init__(self, logger: logging.Logger, interval_seconds: float = 5.0):
+        """
+        Args:
+            logger: Logger to emit through
+            interval_seconds: Minimum time between records of one key
+        """
+        self.logger = logger
+        self.interval = interval_seconds
+        # key -> (last emitted at, suppressed since)
+        self._state: Dict[str, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+    
+    def log(self, level: int, key: str, msg: str, *args) -> None:
+        """
+        Log unless the key was logged within the interval.
+        
+        Args:
+            level: Logging level
+            key: Event identity, e.g. "relay-failed:<call_id>"
+            msg: %-style message
+            *args: Message arguments
+        """
+        if not self.logger.isEnabledFor(level):
+            return
+        now = time.monotonic()
+        with self._lock:
+            last, suppressed = self._state.get(key, (0.0, 0))
+            if now - last < self.interval:
+                self._state[key] = (last, suppressed + 1)
+                return
+            self._state[key] = (now, 0)
+            # Forget stale keys so per-call keys do not accumulate
+            if len(self._state) > 1024:
+                cutoff = now - self.interval
+                self._state = {k: v for k, v in self._state.items() if v[0] >= cutoff}
+        if suppressed:
+            msg = f"{msg} (+%d suppressed)"
+            args = args + (suppressed,)
+        self.logger.log(level, msg, *args)
+    
+    def debug(self, key: str, msg: str, *args) -> None:
+        self.log(logging.DEBUG, key, msg, *args)
+    
+    def info(self, key: str, msg: str, *args) -> None:
+        self.log(logging.INFO, key, msg, *args)
+    
+    def warning(self, key: str, msg: str, *args) -> None:
+        self.log(logging.WARNING, key, msg, *args)
+    
+    def error(self, key: str, msg: str, *args) -> None:
+        self.log(logging.ERROR, key, msg, *args)
+
+
+def make_formatter(fmt: str = "text", format_string: Optional[str] = None) -> logging.Formatter:
+    """
+    Build the output formatter.
+    
+    Args:
+        fmt: "text" (colored) or "json"
+        format_string: Custom format string for text output (optional)
+    
+    Returns:
+        Formatter
+    """
+    if fmt == "json":
+        return JsonFormatter()
+    if fmt != "text":
+        raise ValueError(f"Unknown log format: {fmt}")
+    if format_string is None:
+        format_string = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    return ColoredFormatter(format_string, datefmt="%Y-%m-%d %H:%M:%S")
+
+
+def configure_logging(
+    level: str = "INFO",
+    fmt: str = "text",
+    levels: Optional[Dict[str, str]] = None,
+    queue_size: int = 10000
+) -> None:
+    """
+    Route all logging through a queue to a background writer thread.
+    
+    Configures the root logger, so module loggers from get_logger() and
+    library loggers (uvicorn, fastapi) share one pipeline. Safe to call
+    more than once; only the first call installs handlers.
+    
+    Args:
+        level: Root logging level
+        fmt: Output format, "text" or "json"
+        levels: Per-logger level overrides, e.g. {"services.stt_service": "DEBUG"}
+        queue_size: Records buffered before new ones are dropped
+    """
+    global _listener, _queue_handler
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, level.upper()))
+    for name, logger_level in (levels or {}).items():
+        logging.getLogger(name).setLevel(getattr(logging, logger_level.upper()))
+    
+    if _listener is not None:
+        return
+    
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(make_formatter(fmt))
+    
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    _queue_handler = DroppingQueueHandler(log_queue)
+    root.handlers = [_queue_handler]
+    
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Write out queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_logging_stats() -> dict:
+    """Get queue depth and records dropped because the queue was full"""
+    if _queue_handler is None:
+        return {"queued": 0, "dropped": 0}
+    return {
+        "queued": _queue_handler.queue.qsize(),
+        "dropped": _queue_handler.dropped,
+    }
 
 
 def setup_logger(
@@ -32,6 +231,10 @@ def setup_logger(
     """
     Setup a logger with the given name and level.
     
+    Once configure_logging() has run, the logger just propagates to the
+    queued root handler; otherwise it gets a direct console handler (e.g.
+    in translation worker processes).
+    
     Args:
         name: Logger name (usually __name__)
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
@@ -44,19 +247,13 @@ def setup_logger(
     logger.setLevel(getattr(logging, level.upper()))
     
     # Avoid duplicate handlers
-    if logger.handlers:
+    if logger.handlers or _listener is not None:
         return logger
     
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(getattr(logging, level.upper()))
-    
-    # Format
-    if format_string is None:
-        format_string = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    
-    formatter = ColoredFormatter(format_string, datefmt="%Y-%m-%d %H:%M:%S")
-    console_handler.setFormatter(formatter)
+    console_handler.setFormatter(make_formatter("text", format_string))
     
     logger.addHandler(console_handler)
     
@@ -0,0 +1,111 @@
+"""
+Pipeline stage metrics for Bhasha Setu backend.
+Tracks in-flight jobs and recent latency percentiles per stage (STT, MT)
+over a sliding time window.
+"""
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, Optional, Tuple
+
+
+def percentile(sorted_values: list, q: float) -> Optional[float]:
+    """
+    Nearest-rank percentile of pre-sorted values.
+
+    Args:
+        sorted_values: Values in ascending order
+        q: Percentile in [0, 100]
+
+    Returns:
+        Percentile, or None if there are no values
+    """
+    if not sorted_values:
+        return None
+    rank = math.ceil(q / 100 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(len(sorted_values) - 1, rank))]
+
+
+class StageMetrics:
+    """In-flight counts and windowed latency samples per stage"""
+
+    def __init__(self, window_seconds: float = 60.0, max_samples: int = 2048):
+        """
+        Args:
+            window_seconds: Age of the oldest sample used for percentiles
+            max_samples: Samples kept per stage
+        """
+        self.window_seconds = window_seconds
+        self.max_samples = max_samples
+        # stage -> (finished at, seconds)
+        self._samples: Dict[str, Deque[Tuple[float, float]]] = {}
+        self._in_flight: Dict[str, int] = {}
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """
+        Count a job as in flight and record its latency when it ends.
+
+        Args:
+            stage: Stage name
+        """
+        self._in_flight[stage] = self._in_flight.get(stage, 0) + 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._in_flight[stage] -= 1
+            self.record(stage, time.perf_counter() - started)
+
+    def record(self, stage: str, seconds: float) -> None:
+        """
+        Record one latency sample.
+
+        Args:
+            stage: Stage name
+            seconds: Latency including queueing
+        """
+        samples = self._samples.get(stage)
+        if samples is None:
+            samples = self._samples[stage] = deque(maxlen=self.max_samples)
+        samples.append((time.monotonic(), seconds))
+
+    def in_flight(self, stage: str) -> int:
+        """Jobs of a stage submitted and not yet finished"""
+        return self._in_flight.get(stage, 0)
+
+    def percentiles(self, stage: str) -> Dict[str, Optional[float]]:
+        """
+        Latency percentiles of a stage over the window.
+
+        Args:
+            stage: Stage name
+
+        Returns:
+            Dict with count, p50, p95 and p99 in seconds (None if no samples)
+        """
+        samples = self._samples.get(stage, ())
+        cutoff = time.monotonic() - self.window_seconds
+        values = sorted(seconds for finished, seconds in samples if finished >= cutoff)
+        return {
+            "count": len(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+        }
+
+    def get_stats(self) -> dict:
+        """Get every stage's in-flight count and percentiles in ms"""
+        stats = {}
+        for stage in sorted(set(self._samples) | set(self._in_flight)):
+            latency = self.percentiles(stage)
+            stats[stage] = {
+                "in_flight": self.in_flight(stage),
+                "count": latency["count"],
+                **{
+                    key: round(value * 1000, 1) if value is not None else None
+                    for key, value in latency.items() if key != "count"
+                },
+            }
+        return stats
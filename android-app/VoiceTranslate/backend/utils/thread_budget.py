@@ -0,0 +1,195 @@
+"""
+CPU thread budget for Bhasha Setu backend.
+
+torch (MarianMT), CTranslate2 (faster-whisper), NumPy/BLAS and the asyncio
+executors each size their thread pools to all cores by default, which
+oversubscribes the CPU under concurrent calls. This module divides the
+cores between the STT, MT and web tiers once at startup and applies the
+split to every pool.
+"""
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+from config import settings
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Thread-count variables honoured by the common BLAS/OpenMP runtimes
+BLAS_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+
+_budget: Optional["ThreadBudget"] = None
+_torch_configured = False
+_torch_lock = threading.Lock()
+
+
+def _available_cpus() -> List[int]:
+    """CPUs this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+class ThreadBudget:
+    """Division of CPU cores between the STT, MT and web tiers"""
+
+    def __init__(self, cpus: List[int], stt_share: float, mt_share: float):
+        total = len(cpus)
+        self.cpus = cpus
+        self.total_cores = total
+
+        stt = max(1, round(total * stt_share))
+        mt = max(1, round(total * mt_share))
+        if stt + mt >= total:
+            # Too few cores to keep the tiers apart: let MT and web share
+            stt = max(1, min(stt, total - 1)) if total > 1 else 1
+            mt = max(1, total - stt)
+        web = max(1, total - stt - mt)
+
+        self.stt_cores = stt
+        self.mt_cores = mt
+        self.web_cores = web
+
+        # Core sets used for affinity; tiers overlap only on tiny machines
+        self.stt_cpus = cpus[:stt]
+        self.mt_cpus = cpus[stt:stt + mt] or cpus[-mt:]
+        self.web_cpus = cpus[stt + mt:] or self.mt_cpus
+
+        self.blas_threads = settings.threads.blas_threads
+        self.mt_threads = self.mt_cores
+        self.web_threads = max(2, self.web_cores * 2)
+        self.pinned = False
+
+    def to_dict(self) -> Dict:
+        """Get the allocation for reporting"""
+        return {
+            "total_cores": self.total_cores,
+            "stt_cores": self.stt_cores,
+            "mt_cores": self.mt_cores,
+            "web_cores": self.web_cores,
+            "mt_threads": self.mt_threads,
+            "web_threads": self.web_threads,
+            "blas_threads": self.blas_threads,
+            "pinned": self.pinned,
+            "stt_cpus": self.stt_cpus if self.pinned else None,
+            "mt_cpus": self.mt_cpus if self.pinned else None,
+            "web_cpus": self.web_cpus if self.pinned else None,
+        }
+
+
+def get_thread_budget() -> ThreadBudget:
+    """
+    Get the process-wide thread budget, computing it on first use.
+
+    Returns:
+        ThreadBudget
+    """
+    global _budget
+    if _budget is None:
+        cpus = _available_cpus()
+        if settings.threads.total_cores > 0:
+            cpus = cpus[:settings.threads.total_cores]
+        _budget = ThreadBudget(cpus, settings.threads.stt_share, settings.threads.mt_share)
+    return _budget
+
+
+def apply_thread_budget() -> ThreadBudget:
+    """
+    Apply the budget to BLAS/OpenMP and, optionally, process affinity.
+
+    Must run before NumPy, torch or CTranslate2 are imported, because the
+    BLAS runtimes read their thread count only once at load time.
+
+    Returns:
+        Applied ThreadBudget
+    """
+    budget = get_thread_budget()
+
+    for var in BLAS_ENV_VARS:
+        os.environ[var] = str(budget.blas_threads)
+
+    if settings.threads.pin_affinity:
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, budget.cpus)
+            budget.pinned = True
+        else:
+            logger.warning("CPU affinity pinning is not supported on this platform")
+
+    logger.info(
+        f"Thread budget: {budget.total_cores} cores -> stt={budget.stt_cores}, "
+        f"mt={budget.mt_cores}, web={budget.web_cores}, blas={budget.blas_threads}"
+        f"{' (pinned)' if budget.pinned else ''}"
+    )
+    return budget
+
+
+def pin_current_thread(cpus: List[int]) -> None:
+    """
+    Pin the calling thread to a core set if affinity pinning is enabled.
+
+    Threads spawned afterwards (e.g. CTranslate2 or OpenMP workers)
+    inherit the mask.
+
+    Args:
+        cpus: Cores the thread may run on
+    """
+    budget = get_thread_budget()
+    if budget.pinned and cpus:
+        os.sched_setaffinity(0, cpus)
+
+
+@contextmanager
+def pinned_to(cpus: List[int]) -> Iterator[None]:
+    """
+    Temporarily pin the calling thread, e.g. while a model spawns its
+    worker threads, then restore the previous mask.
+
+    Args:
+        cpus: Cores the thread may run on
+    """
+    budget = get_thread_budget()
+    if not (budget.pinned and cpus):
+        yield
+        return
+
+    previous = os.sched_getaffinity(0)
+    os.sched_setaffinity(0, cpus)
+    try:
+        yield
+    finally:
+        os.sched_setaffinity(0, previous)
+
+
+def configure_torch_threads(threads: int = 0) -> None:
+    """
+    Limit torch to the MT tier's threads.
+
+    Safe to call repeatedly; only the first call has an effect, since torch
+    rejects changes to its inter-op pool once it has been used.
+
+    Args:
+        threads: Intra-op threads (0 = the MT tier's share)
+    """
+    global _torch_configured
+    with _torch_lock:
+        if _torch_configured:
+            return
+        _torch_configured = True
+
+        import torch
+
+        if threads <= 0:
+            threads = get_thread_budget().mt_threads
+        torch.set_num_threads(threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass
+        logger.info(f"torch limited to {threads} intra-op thread(s)")
@@ -0,0 +1,176 @@
+"""
+Traffic capture for Bhasha Setu backend.
+Records inbound WebSocket frames with arrival timestamps to a compact
+per-connection binary log that benchmarks/replay.py can play back.
+
+File layout:
+    magic        6 bytes   b"BSCAP\\x01"
+    header_len   uint32    little endian
+    header       JSON      call_id, user_id, source_lang, target_lang, ...
+    records      repeated  uint64 offset_us, uint32 length, payload
+"""
+import json
+import os
+import re
+import struct
+import time
+from typing import Dict, List, Optional, Tuple
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CAPTURE_MAGIC = b"BSCAP\x01"
+CAPTURE_EXTENSION = ".bscap"
+
+_RECORD = struct.Struct("<QI")
+_HEADER_LEN = struct.Struct("<I")
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class CaptureWriter:
+    """Writes the inbound frames of one connection to a capture log"""
+
+    def __init__(
+        self,
+        directory: str,
+        call_id: str,
+        user_id: str,
+        source_lang: str,
+        target_lang: str,
+        sample_rate: int
+    ):
+        os.makedirs(directory, exist_ok=True)
+
+        started_at = time.time()
+        filename = "{}_{}_{}{}".format(
+            _UNSAFE_CHARS.sub("_", call_id),
+            _UNSAFE_CHARS.sub("_", user_id),
+            int(started_at * 1000),
+            CAPTURE_EXTENSION
+        )
+        self.path = os.path.join(directory, filename)
+        self.frames = 0
+        self._started = time.monotonic()
+        self._file = open(self.path, "wb")
+
+        header = json.dumps({
+            "call_id": call_id,
+            "user_id": user_id,
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "sample_rate": sample_rate,
+            "started_at": started_at,
+        }).encode("utf-8")
+
+        self._file.write(CAPTURE_MAGIC)
+        self._file.write(_HEADER_LEN.pack(len(header)))
+        self._file.write(header)
+
+        logger.info(f"Capturing connection {call_id}/{user_id} to {self.path}")
+
+    def write(self, data: bytes, received_at: Optional[float] = None) -> None:
+        """
+        Append a frame, stamped with its arrival time.
+
+        A failed write (e.g. disk full) is logged once and stops the
+        capture; the call itself carries on.
+
+        Args:
+            data: Frame payload as received
+            received_at: time.monotonic() when the frame arrived
+                (None = now)
+        """
+        if self._file is None:
+            return
+
+        if received_at is None:
+            received_at = time.monotonic()
+        offset_us = max(0, int((received_at - self._started) * 1_000_000))
+        try:
+            self._file.write(_RECORD.pack(offset_us, len(data)) + data)
+        except OSError as e:
+            logger.error(f"Traffic capture to {self.path} failed, capture stopped: {e}")
+            self.close()
+            return
+        self.frames += 1
+
+    def close(self) -> None:
+        """Flush and close the log"""
+        if self._file is None:
+            return
+
+        file, self._file = self._file, None
+        try:
+            file.close()
+        except OSError as e:
+            logger.error(f"Failed to close capture {self.path}: {e}")
+            return
+        logger.info(f"Capture closed: {self.path} ({self.frames} frames)")
+
+
+def open_capture(
+    directory: Optional[str],
+    call_id: str,
+    user_id: str,
+    source_lang: str,
+    target_lang: str,
+    sample_rate: int
+) -> Optional[CaptureWriter]:
+    """
+    Start capturing a connection if capture is enabled.
+
+    Args:
+        directory: Capture directory, or None when capture is disabled
+        call_id: Call identifier
+        user_id: User identifier
+        source_lang: Source language code
+        target_lang: Target language code
+        sample_rate: Audio sample rate in Hz
+
+    Returns:
+        CaptureWriter, or None if disabled or the log could not be opened
+    """
+    if not directory:
+        return None
+
+    try:
+        return CaptureWriter(directory, call_id, user_id, source_lang, target_lang, sample_rate)
+    except OSError as e:
+        logger.error(f"Failed to start traffic capture: {e}")
+        return None
+
+
+def read_capture(path: str) -> Tuple[Dict, List[Tuple[float, bytes]]]:
+    """
+    Read a capture log.
+
+    A truncated final record (e.g. after a crash) is ignored.
+
+    Args:
+        path: Path to capture file
+
+    Returns:
+        Tuple of (header, [(offset_seconds, payload), ...])
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if not data.startswith(CAPTURE_MAGIC):
+        raise ValueError(f"{path} is not a capture file")
+
+    pos = len(CAPTURE_MAGIC)
+    (header_len,) = _HEADER_LEN.unpack_from(data, pos)
+    pos += _HEADER_LEN.size
+    header = json.loads(data[pos:pos + header_len].decode("utf-8"))
+    pos += header_len
+
+    frames: List[Tuple[float, bytes]] = []
+    while pos + _RECORD.size <= len(data):
+        offset_us, length = _RECORD.unpack_from(data, pos)
+        pos += _RECORD.size
+        if pos + length > len(data):
+            break
+        frames.append((offset_us / 1_000_000, data[pos:pos + length]))
+        pos += length
+
+    return header, frames
@@ -0,0 +1,49 @@
+"""
+WAV decoding for Bhasha Setu backend and benchmarks.
+Kept free of backend configuration so the load generator can use it.
+"""
+import io
+import wave
+
+import numpy as np
+
+
+def decode_wav(data: bytes, sample_rate: int) -> bytes:
+    """
+    Decode WAV file contents to mono 16-bit PCM at a given sample rate.
+
+    Multi-channel audio is downmixed to the first channel and other
+    sample rates are resampled linearly.
+
+    Args:
+        data: WAV file contents
+        sample_rate: Sample rate of the returned PCM
+
+    Returns:
+        Raw PCM bytes
+
+    Raises:
+        ValueError: If the data is not 16-bit PCM WAV
+    """
+    try:
+        with wave.open(io.BytesIO(data), 'rb') as wf:
+            sample_width = wf.getsampwidth()
+            channels = wf.getnchannels()
+            rate = wf.getframerate()
+            frames = wf.readframes(wf.getnframes())
+    except (wave.Error, EOFError) as e:
+        raise ValueError(f"Not a valid WAV file: {e}")
+
+    if sample_width != 2:
+        raise ValueError(f"Expected 16-bit PCM, got {sample_width * 8}-bit")
+
+    audio = np.frombuffer(frames, dtype=np.int16)
+    if channels > 1:
+        audio = audio[::channels]
+
+    if rate != sample_rate and len(audio) > 0:
+        target_len = int(len(audio) * sample_rate / rate)
+        positions = np.linspace(0, len(audio) - 1, target_len)
+        audio = np.interp(positions, np.arange(len(audio)), audio).astype(np.int16)
+
+    return audio.tobytes()